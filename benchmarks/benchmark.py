@@ -0,0 +1,391 @@
+import logging
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from fringes import Fringes
+
+
+def timeit(func, *args, repeat: int = 5, **kwargs) -> float:
+    """Return the fastest of `repeat` executions of `func`, in seconds."""
+
+    func(*args, **kwargs)  # warm up
+
+    T = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args, **kwargs)
+        T = min(T, time.perf_counter() - t0)
+
+    return T
+
+
+def bench_decode():
+    """Decoding speed of the default configuration, compared to the pure NumPy decoder as the baseline."""
+
+    f = Fringes()
+    I = f.encode()
+
+    T0 = timeit(f.decode, I, backend="numpy")
+    T = timeit(f.decode, I)
+    print(f"decode: {1000 * T:.0f}ms for {f.Y}x{f.X} pixels, D = {f.D}, K = {f.K}, N = {f.N.tolist()}")
+    print(f"baseline (numpy backend): {1000 * T0:.0f}ms, i.e. speedup {T0 / T:.1f}x")
+
+
+def bench_remap():
+    """Speed of the remapping kernel which writes into a preallocated source, compared to the legacy one."""
+
+    from fringes.decoder import _remap_legacy, remap_kernel  # compiled, i.e. they require numba
+
+    f = Fringes()
+    dec = f.decode(f.encode())
+    reg = dec.registration.astype(np.float32)
+    mod = dec.modulation.astype(np.float32)
+    B = np.mean(mod, axis=0)
+
+    T0 = timeit(_remap_legacy, reg, mod, 1, f.Y, f.X, f.C)
+    _remap = remap_kernel(B.dtype)
+    T = timeit(lambda: _remap(np.zeros((f.Y, f.X, f.C), np.float32), reg, B))
+    print(f"remap: {1000 * T:.0f}ms, legacy: {1000 * T0:.0f}ms, i.e. speedup {T0 / T:.1f}x")
+
+
+def bench_layout():
+    """Decoding speed of frame-major, pixel-major and deinterlaced data."""
+
+    f = Fringes()
+    I = f.encode()
+
+    T = timeit(f.decode, I)
+    print(f"frame-major (T, Y, X, C): {1000 * T:.0f}ms")
+
+    Ip = np.ascontiguousarray(np.moveaxis(I, 0, 2))
+    T = timeit(f.decode, Ip, pixelmajor=True)
+    print(f"pixel-major (Y, X, T, C): {1000 * T:.0f}ms")
+
+    Ii = I.swapaxes(0, 1).reshape(-1, f.T, f.X, f.C).copy()  # interlaced, i.e. as acquired by a line scan camera
+    T = timeit(lambda: f.decode(f.deinterlace(Ii)))
+    print(f"deinterlaced: {1000 * T:.0f}ms")
+
+
+def bench_precision():
+    """Decoding speed and accuracy of single precision compared to double precision."""
+
+    f = Fringes()
+    f.v = 9, 10, 11
+    f.V = 0.8
+    I = f._simulate(f.encode(), PSF=0)
+    x = f.coordinates()[:, :, :, None]
+
+    dec = {}
+    for precision in ("float64", "float32"):
+        T = timeit(f.decode, I, precision=precision)
+        dec[precision] = f.decode(I, precision=precision)
+        e = np.abs(dec[precision].registration - x)
+        print(
+            f"{precision}: {1000 * T:.0f}ms, "
+            f"registration error: median {np.nanmedian(e):.4f}px, outliers (> 1px) {np.mean(e > 1):.2%}"
+        )
+
+    for field in dec["float64"]._fields:
+        d = np.abs(getattr(dec["float32"], field) - getattr(dec["float64"], field))
+        print(f"float32 vs. float64: {field} differs by median {np.nanmedian(d):.2e}, > 0.01 at {np.mean(d > 0.01):.2%}")
+
+
+def bench_mask():
+    """Decoding speed depending on the fraction of the camera frame covered by the mask."""
+
+    f = Fringes()
+    I = f.encode()
+
+    for coverage in (1, 0.4, 0.2):
+        mask = np.zeros((f.Y, f.X), bool)
+        mask[: int(coverage * f.Y + 0.5)] = True
+        T = timeit(f.decode, I, mask=mask)
+        print(f"mask covering {coverage:.0%}: {1000 * T:.0f}ms")
+
+
+def bench_closedform():
+    """Temporal demodulation of 3 and 4 shifts in closed form compared to the generic complex filter."""
+
+    for N in (3, 4):
+        f = Fringes()
+        f.N = N
+        I = f.encode()
+
+        for closedform in (True, False):
+            T = timeit(f._demodulate, I, outputs=("brightness", "modulation", "phase"), closedform=closedform)
+            print(f"N = {N}, {'closed-form' if closedform else 'generic'}: {1000 * T:.0f}ms")
+
+
+def bench_integer():
+    """Temporal demodulation of integer-valued data accumulated in the integer domain compared to floating point."""
+
+    for N in (4, 5):
+        f = Fringes()
+        f.N = N
+        I = f.encode()
+
+        for integer in (True, False):
+            T = timeit(f._demodulate, I, outputs=("brightness", "modulation", "phase"), integer=integer)
+            print(f"{I.dtype}, N = {N}, {'integer' if integer else 'floating point'}: {1000 * T:.0f}ms")
+
+
+def bench_crt():
+    """Temporal phase unwrapping with the Chinese Remainder Theorem compared to the search of fringe orders."""
+
+    for K in (2, 3, 4, 5):
+        f = Fringes()
+        f.K = K
+        f.l = "close"  # integer wavelengths
+        f.V = 0.8
+        I = f._simulate(f.encode(), PSF=0)
+        x = f.coordinates()[:, :, :, None]
+
+        for crt in (True, False):
+            T = timeit(f.decode, I, crt=crt)
+            e = np.abs(f.decode(I, crt=crt).registration - x)
+            print(
+                f"K = {K}, l = {f.l.tolist()}, {'CRT' if crt else 'search'}: {1000 * T:.0f}ms, "
+                f"registration error: median {np.nanmedian(e):.4f}px, outliers (> 1px) {np.mean(e > 1):.2%}"
+            )
+
+
+def bench_lut():
+    """Temporal phase unwrapping with candidate fringe orders from a lookup table compared to their search."""
+
+    for K in (2, 3, 4):
+        f = Fringes()
+        f.K = K
+        f.V = 0.8
+        I = f._simulate(f.encode(), PSF=0)
+        x = f.coordinates()[:, :, :, None]
+
+        for lut in (True, False):
+            T = timeit(f.decode, I, lut=lut)
+            e = np.abs(f.decode(I, lut=lut).registration - x)
+            print(
+                f"K = {K}, v = {f.v.tolist()}, {'lookup' if lut else 'search'}: {1000 * T:.0f}ms, "
+                f"registration error: median {np.nanmedian(e):.4f}px, outliers (> 1px) {np.mean(e > 1):.2%}"
+            )
+
+
+def bench_rmin():
+    """Early termination of the search for the fringe orders, with a noise model matching the simulated camera,
+    with and without starting at the fringe orders of the previous pixel."""
+
+    class Evaluated(logging.Handler):
+        def emit(self, record):
+            if "candidates" in record.getMessage():
+                self.message = record.getMessage()
+
+    handler = Evaluated(logging.DEBUG)
+    logger = logging.getLogger("fringes.fringes")
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+
+    for K in (2, 3, 4):
+        f = Fringes()
+        f.K = K
+        f.gain = 0.038
+        f.dark = 13.7
+        f.y0 = 3.64
+        I = f._simulate(f.encode(), PSF=0)
+        x = f.coordinates()[:, :, :, None]
+
+        for rmin, warm in (("auto", True), ("auto", False), (1.0, False)):
+            T = timeit(lambda: f.decode(I.copy(), rmin=rmin, warm=warm))
+            e = np.abs(f.decode(I.copy(), rmin=rmin, warm=warm).registration - x)
+            print(
+                f"K = {K}, rmin = {rmin}, {'warm' if warm else 'cold'} start: {1000 * T:.0f}ms, {handler.message} "
+                f"Outliers (> 1px) {np.mean(e > 1):.2%}"
+            )
+
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+def bench_prior():
+    """Starting the search for the fringe orders at a prior registration, e.g. of a previous measurement."""
+
+    f = Fringes()
+    f.gain = 0.038
+    f.dark = 13.7
+    f.y0 = 3.64
+    I = f._simulate(f.encode(), PSF=0)
+    x = f.coordinates()[:, :, :, None]
+    prior = f.decode(I.copy()).registration
+
+    for p in (prior, None):
+        T = timeit(lambda: f.decode(I.copy(), rmin="auto", prior=p))
+        e = np.abs(f.decode(I.copy(), rmin="auto", prior=p).registration - x)
+        print(f"{'with' if p is not None else 'without'} prior: {1000 * T:.0f}ms, outliers (> 1px) {np.mean(e > 1):.2%}")
+
+
+def bench_verbose():
+    """Overhead of the verbose outputs, which are computed in the same pass as the plain ones."""
+
+    f = Fringes()
+    I = f.encode()
+
+    T = timeit(f.decode, I)
+    Tv = timeit(f.decode, I, verbose=True)
+    print(f"plain: {1000 * T:.0f}ms, verbose: {1000 * Tv:.0f}ms")
+
+    dec = f.decode(I)  # the verbose outputs as derived from the plain ones in further passes
+    Tp = timeit(f._verbose_, I, dec.brightness, dec.modulation, dec.registration)
+    print(f"separate verbose pass: {1000 * Tp:.0f}ms")
+
+
+def bench_compact():
+    """Memory and speed of the verbose outputs in compact encodings."""
+
+    f = Fringes()
+    I = f.encode()
+    dtypes = {"registration": "uint16", "modulation": "float16", "orders": "uint8", "visibility": "float16"}
+
+    for dt in (None, dtypes):
+        T = timeit(f.decode, I, verbose=True, dtypes=dt)
+        size = sum(a.nbytes for a in f.decode(I, verbose=True, dtypes=dt))
+        print(f"{'compact' if dt else 'default'}: {1000 * T:.0f}ms, {size / 2**20:.0f}MiB")
+
+
+def bench_batch():
+    """Decoding several sequences (e.g. of multiple cameras) in one batch instead of one after another."""
+
+    f = Fringes(Y=480, X=640)
+    I = f.encode()
+    Is = np.stack([I] * 6)
+
+    T = timeit(lambda: [f.decode(Ib) for Ib in Is])
+    print(f"one after another: {1000 * T:.0f}ms")
+
+    T = timeit(f.decode, Is)
+    print(f"batch: {1000 * T:.0f}ms")
+
+
+def bench_backend():
+    """Decoding speed of the compiled decoder and of the pure NumPy one."""
+
+    f = Fringes()
+    I = f.encode()
+
+    for backend in ("numba", "numpy"):
+        T = timeit(f.decode, I, backend=backend)
+        print(f"{backend}: {1000 * T:.0f}ms")
+
+
+def bench_stream():
+    """Latency after the last frame of the streaming decoder, compared to decoding the whole sequence."""
+
+    f = Fringes()
+    I = f.encode()
+
+    T = timeit(f.decode, I, backend="numpy")
+    print(f"whole sequence: {1000 * T:.0f}ms")
+
+    stream = f.decoder()
+    t0 = time.perf_counter()
+    for frame in I:
+        stream.feed(frame)
+    t1 = time.perf_counter()
+    T = timeit(stream.result)
+    print(f"streaming: {1000 * (t1 - t0) / len(I):.0f}ms per frame, {1000 * T:.0f}ms after the last one")
+
+
+def bench_large():
+    """Decoding a memory-mapped sequence in bands of rows, compared to decoding it in memory."""
+
+    f = Fringes(Y=2000)
+    I = f.encode()
+
+    T = timeit(f.decode, I, repeat=1)
+    print(f"in memory: {1000 * T:.0f}ms")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fname = os.path.join(tempdir, "I.npy")
+        np.save(fname, I)
+        T = timeit(f.decode_large, fname, path=os.path.join(tempdir, "out"), budget=2**24, repeat=1)
+        print(f"in bands (16 MiB): {1000 * T:.0f}ms")
+
+
+def bench_linescan():
+    """Throughput of the line-scan decoder, depending on the number of rows decoded at once."""
+
+    f = Fringes(Y=200)
+    I = f.encode()
+    lines = I.swapaxes(0, 1).reshape(-1, f.X, f.C)
+
+    for rows in (1, 16):
+        stream = f.line_decoder(rows=rows)
+        t0 = time.perf_counter()
+        for i in range(0, len(lines), 8):  # blocks of 8 lines
+            stream.feed(lines[i : i + 8])
+        T = time.perf_counter() - t0
+        print(f"rows={rows}: {len(lines) / T:.0f} lines/s, {1000 * T / stream.y:.1f}ms per row")
+
+
+def bench_files():
+    """Loading a sequence of PNG files on a thread pool, compared to loading it serially."""
+
+    f = Fringes(X=1920, Y=1200)
+    I = f.encode()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fnames = [os.path.join(tempdir, f"{t:02d}.png") for t in range(f.T)]
+        for fname, It in zip(fnames, I):
+            cv2.imwrite(fname, It)
+
+        T = timeit(lambda: [cv2.imread(fname, cv2.IMREAD_UNCHANGED) for fname in fnames], repeat=3)
+        print(f"serial: {f.T / T:.0f} frames/s")
+        T = timeit(f.load_sequence, fnames, repeat=3)
+        print(f"thread pool: {f.T / T:.0f} frames/s")
+        T = timeit(f.load_sequence, fnames, pixelmajor=True, repeat=3)
+        print(f"thread pool, pixel-major: {f.T / T:.0f} frames/s")
+
+
+def bench_archive():
+    """Size and speed of the compressed archive of the verbose outputs, compared to saving them with NumPy."""
+
+    f = Fringes()
+    dec = f.decode(f.encode(), verbose=True)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fname = os.path.join(tempdir, "decoded.npz")
+        T = timeit(np.savez, fname, **dec._asdict(), repeat=1)
+        print(f"np.savez: {os.path.getsize(fname) / 2**20:.1f}MiB in {1000 * T:.0f}ms")
+
+        for compression, level in (("zlib", 6), ("lzma", 1)):
+            fname = os.path.join(tempdir, f"decoded.{compression}")
+            T = timeit(f.save_decoded, fname, dec, compression=compression, level=level, repeat=1)
+            print(f"{compression}: {os.path.getsize(fname) / 2**20:.1f}MiB in {1000 * T:.0f}ms", end=", ")
+            T = timeit(f.load_decoded, fname, repeat=1)
+            print(f"loading all: {1000 * T:.0f}ms", end=", ")
+            T = timeit(f.load_decoded, fname, outputs={"registration"}, roi=(100, 100, 64, 64))
+            print(f"loading a ROI of the registration: {1000 * T:.1f}ms")
+
+
+if __name__ == "__main__":
+    bench_decode()
+    bench_remap()
+    bench_layout()
+    bench_precision()
+    bench_mask()
+    bench_closedform()
+    bench_integer()
+    bench_crt()
+    bench_lut()
+    bench_rmin()
+    bench_prior()
+    bench_verbose()
+    bench_compact()
+    bench_batch()
+    bench_backend()
+    bench_stream()
+    bench_large()
+    bench_linescan()
+    bench_files()
+    bench_archive()
@@ -6,10 +6,11 @@ import glob
 import webbrowser
 import argparse
 
+logger = logging.getLogger(__name__)
+
 from .fringes import Fringes
 from .util import vshape, curvature, height
-
-logger = logging.getLogger(__name__)
+from .archive import Archive
 
 # use verion string in pyproject.toml as the single source of truth
 try:
@@ -22,12 +23,12 @@ except KeyError:
 except FileNotFoundError:
     __version__ = importlib.metadata.version("fringes")  # installed version
 
-flist = glob.glob(os.path.join(os.path.dirname(__file__), "__pycache__", "decoder*decode*.nbc"))
-if not flist or os.path.getmtime(__file__) > max(os.path.getmtime(file) for file in flist):
-    logging.warning(
-        "The 'decode()'-function has not been compiled yet. "
-        "This will take a few minutes (the time depends on your CPU and energy settings)."
-    )
+
+def warmup() -> None:
+    """Compile the decoder for all data types and precisions ahead of its first use, cf. `decoder.warmup()`."""
+    from . import decoder  # numba is an optional dependency, so it is only imported when it is used
+
+    decoder.warmup()
 
 
 def documentation():
@@ -0,0 +1,204 @@
+import json
+import lzma
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+# file format for archiving the outputs of `Fringes.decode()`:
+# each output is split into chunks of rows which are compressed one by one and written one after another;
+# they are followed by the index, a JSON header with the parameters, the data type and shape of each output
+# and the offset and size of each of its chunks, and a footer with the size of the index;
+# so a reader only reads the index and decompresses the chunks of the rows and outputs which are requested
+
+_MAGIC = b"FRNGARC1"
+_FOOTER = struct.Struct("<Q8s")  # size of the index, magic
+_CODECS = {
+    "none": (lambda b, level: b, lambda b: b),
+    "zlib": (lambda b, level: zlib.compress(b, level), zlib.decompress),
+    "lzma": (lambda b, level: lzma.compress(b, preset=level), lzma.decompress),
+}
+
+
+def write(
+    fname: str,
+    dec: namedtuple,
+    params: dict = None,
+    rows: int = 64,
+    compression: str = "zlib",
+    level: int = 6,
+) -> None:
+    """Write the outputs of `Fringes.decode()` to a chunked, compressed archive file.
+
+    Parameters
+    ----------
+    fname : str
+        File name of the archive.
+
+    dec : namedtuple
+        Outputs as returned by `Fringes.decode()`, each in shape (..., height `Y`, width `X`, color channels `C`).
+
+    params : dict, optional
+        Parameters of the `Fringes` instance, which are embedded as metadata.
+
+    rows : int, optional
+        Number of rows of each chunk. The default is 64.
+        Smaller chunks are read more selectively, larger ones compress better.
+
+    compression : str, optional
+        Compression of the chunks: 'zlib' (the default), 'lzma' or 'none'.
+
+    level : int, optional
+        Compression level, i.e. 0 to 9. The default is 6.
+    """
+
+    assert compression in _CODECS, f"Compression must be one of {tuple(_CODECS.keys())}."
+    assert rows > 0, "Number of rows must be positive."
+    compress = _CODECS[compression][0]
+
+    index = {"params": params or {}, "compression": compression, "rows": int(rows), "fields": {}}
+    with open(fname, "wb") as file:
+        file.write(_MAGIC)
+
+        for name, a in zip(dec._fields, dec):
+            a = np.asarray(a)
+            Y = a.shape[-3] if a.ndim >= 3 else 1
+            chunks = []
+            for y0 in range(0, Y, rows):
+                chunk = a[..., y0 : y0 + rows, :, :] if a.ndim >= 3 else a
+                buf = compress(np.ascontiguousarray(chunk).tobytes(), level)
+                chunks.append((file.tell(), len(buf)))
+                file.write(buf)
+            index["fields"][name] = {"dtype": a.dtype.str, "shape": a.shape, "chunks": chunks}
+
+        buf = json.dumps(index, default=_default).encode()
+        file.write(buf)
+        file.write(_FOOTER.pack(len(buf), _MAGIC))
+
+
+def _default(obj):
+    """Convert NumPy types of the parameters, which `json` can't serialize."""
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type '{type(obj).__name__}' is not JSON serializable.")
+
+
+class Archive:
+    """Reader of an archive file written by `write()`, resp. `Fringes.save_decoded()`.
+
+    Opening it only reads the index, i.e. the parameters and the layout of the outputs;
+    outputs are read when they are accessed, and of a region of interest only the chunks which it overlaps.
+
+    Examples
+    --------
+    >>> import fringes as frng
+    >>> f = frng.Fringes()
+    >>> f.save_decoded("decoded.frng", f.decode(f.encode()))
+
+    >>> arc = frng.Archive("decoded.frng")
+    >>> f.params = arc.params
+    >>> x = arc.read("registration", roi=(100, 200, 50, 50))
+    """
+
+    def __init__(self, fname: str):
+        self.fname = fname
+
+        with open(fname, "rb") as file:
+            assert file.read(len(_MAGIC)) == _MAGIC, f"File '{fname}' is not an archive of decoded outputs."
+            file.seek(-_FOOTER.size, os.SEEK_END)
+            size, magic = _FOOTER.unpack(file.read(_FOOTER.size))
+            assert magic == _MAGIC, f"Archive '{fname}' is incomplete."
+            file.seek(-_FOOTER.size - size, os.SEEK_END)
+            index = json.loads(file.read(size))
+
+        self.params = index["params"]  # parameters of the `Fringes` instance
+        self._decompress = _CODECS[index["compression"]][1]
+        self._rows = index["rows"]
+        self._fields = index["fields"]
+
+    @property
+    def fields(self) -> tuple:
+        """Names of the archived outputs."""
+        return tuple(self._fields.keys())
+
+    def shape(self, name: str) -> tuple:
+        """Shape of the output `name`."""
+        return tuple(self._fields[name]["shape"])
+
+    def read(self, name: str, roi: tuple = None) -> np.ndarray:
+        """Read an output, or a region of interest of it.
+
+        Parameters
+        ----------
+        name : str
+            Name of the output, e.g. 'registration'.
+
+        roi : tuple, optional
+            Region of interest (x, y, width, height), in pixels.
+            The default is None, i.e. the whole output is read.
+
+        Returns
+        -------
+        a : np.ndarray
+            Output, resp. its region of interest in shape (..., height, width, color channels `C`).
+
+        Raises
+        ------
+        AssertionError
+            If there is no output `name` in the archive.
+        """
+
+        assert name in self._fields, f"Archive contains no output '{name}', only {self.fields}."
+        field = self._fields[name]
+        dtype = np.dtype(field["dtype"])
+        shape = tuple(field["shape"])
+
+        if len(shape) < 3:  # not in rows
+            with open(self.fname, "rb") as file:
+                offset, size = field["chunks"][0]
+                file.seek(offset)
+                return np.frombuffer(self._decompress(file.read(size)), dtype).reshape(shape).copy()
+
+        Y, X = shape[-3:-1]
+        x, y, w, h = (0, 0, X, Y) if roi is None else roi
+        x0, x1 = max(0, x), min(X, x + w)
+        y0, y1 = max(0, y), min(Y, y + h)
+        out = np.empty(shape[:-3] + (max(0, y1 - y0), max(0, x1 - x0), shape[-1]), dtype)
+
+        with open(self.fname, "rb") as file:
+            for i in range(y0 // self._rows, -(-y1 // self._rows) if y1 > y0 else 0):  # chunks overlapping the rows
+                offset, size = field["chunks"][i]
+                file.seek(offset)
+                c0 = i * self._rows
+                rows = min(self._rows, Y - c0)
+                chunk = np.frombuffer(self._decompress(file.read(size)), dtype)
+                chunk = chunk.reshape(shape[:-3] + (rows,) + shape[-2:])
+                a, b = max(y0, c0), min(y1, c0 + rows)
+                out[..., a - y0 : b - y0, :, :] = chunk[..., a - c0 : b - c0, x0:x1, :]
+
+        return out
+
+    def load(self, outputs: tuple | set = None, roi: tuple = None) -> namedtuple:
+        """Read several outputs, or a region of interest of them.
+
+        Parameters
+        ----------
+        outputs : tuple or set, optional
+            Names of the outputs to read. The default is None, i.e. all outputs in the archive.
+
+        roi : tuple, optional
+            Region of interest (x, y, width, height), cf. `read()`.
+
+        Returns
+        -------
+        decoded : namedtuple
+            Outputs as returned by `Fringes.decode()`.
+        """
+
+        fields = [o for o in self.fields if outputs is None or o in outputs]
+        return namedtuple("decoded", fields)(*(self.read(o, roi) for o in fields))
@@ -1,59 +1,167 @@
+import logging
+import math
+import platform
+
 import numpy as np
 import numba as nb
+from numba.core import cgutils
+from llvmlite import ir
 
+logger = logging.getLogger(__name__)
 
-# @nb.jit(
-#     [
-#         nb.types.UniTuple(nb.float32[:, :, :, :], 5)(
-#             nb.uint8[:, :, :, :],
-#             nb.int_[:, :],
-#             nb.float64[:, :],
-#             nb.float64[:, :],
-#             nb.int_[:],
-#             nb.int_[:],
-#             nb.float64[:],
-#             nb.float64[:],
-#             nb.float64,
-#             nb.float64,
-#             nb.types.unicode_type,
-#             nb.float64,
-#             nb.bool_,
-#         ),
-#         nb.types.UniTuple(nb.float32[:, :, :, :], 5)(
-#             nb.uint16[:, :, :, :],
-#             nb.int_[:, :],
-#             nb.float64[:, :],
-#             nb.float64[:, :],
-#             nb.int_[:],
-#             nb.int_[:],
-#             nb.float64[:],
-#             nb.float64[:],
-#             nb.float64,
-#             nb.float64,
-#             nb.types.unicode_type,
-#             nb.float64,
-#             nb.bool_,
-#         ),
-#         nb.types.UniTuple(nb.float32[:, :, :, :], 5)(
-#             nb.float_[:, :, :, :],
-#             nb.int_[:, :],
-#             nb.float64[:, :],
-#             nb.float64[:, :],
-#             nb.int_[:],
-#             nb.int_[:],
-#             nb.float64[:],
-#             nb.float64[:],
-#             nb.float64,
-#             nb.float64,
-#             nb.types.unicode_type,
-#             nb.float64,
-#             nb.bool_,
-#         ),
-#     ],
-#     cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
+
+# input dtypes as allowed by 'Fringes.values["dtype"]'
+_dtypes = (nb.uint8, nb.uint16, nb.float32, nb.float64)
+
+# floating point types in which the computations can be performed
+_precisions = (nb.float32, nb.float64)
+
+
+def _signature(dtype: nb.types.Number, precision: nb.types.Float) -> nb.core.typing.templates.Signature:
+    """Explicit signature of `decode()` for fringe pattern sequences of type `dtype`
+    which are decoded with floating point type `precision`."""
+    return nb.void(
+        nb.types.Array(dtype, 4, "A", readonly=True),  # I (writable arrays are accepted as well)
+        nb.int_[:, :],  # N
+        nb.float64[:, :],  # v
+        nb.float64[:, :],  # f
+        nb.int_[:],  # R
+        nb.float64[:],  # UMR
+        nb.float64,  # x0
+        nb.float64,  # p0
+        nb.float64,  # Vmin
+        nb.float32[:, :, :, :],  # bri
+        nb.float32[:, :, :, :],  # mod
+        nb.float32[:, :, :, :],  # phi
+        nb.float32[:, :, :, :],  # reg
+        nb.float32[:, :, :, :],  # res
+        nb.types.Tuple(
+            (
+                nb.float32[:, :, :, :],  # unc
+                nb.int_[:, :, :, :],  # fid
+                nb.float32[:, :, :, :],  # vis
+                nb.float32[:, :, :, :],  # exp
+                nb.uint16[:, :, :, :],  # regq16
+                nb.uint32[:, :, :, :],  # regq32
+                nb.uint16[:, :, :, :],  # modh
+                nb.uint16[:, :, :, :],  # vish
+                nb.uint8[:, :, :, :],  # fid8
+                nb.int16[:, :, :, :],  # fid16
+                nb.int64[:, :],  # stats
+                nb.int64[:, :],  # hist
+            )
+        ),  # buffers
+        nb.int_[:, :],  # tiles
+        nb.bool_,  # closedform
+        nb.bool_,  # integer
+        nb.bool_,  # crt
+        nb.int_[:, :, :, :],  # lut
+        nb.int_[:, :, :],  # count
+        nb.int_[:],  # pair
+        nb.float64[:],  # rlut
+        nb.float64[:],  # rmin
+        nb.bool_,  # warm
+        nb.int_[:, :, :, :],  # prior
+        nb.float64[:, :],  # wu
+        nb.float64[:],  # noise
+        nb.float64,  # scale
+        nb.types.NumberClass(precision),  # precision
+    )
+
+
+# CPU architecture, which determines the counter that is readable from user mode
+_machine = platform.machine().lower()
+
+
+@nb.extending.intrinsic
+def _cycles(typingctx) -> (nb.core.typing.templates.Signature, callable):
+    """Cycle counter of the CPU, for instrumenting `decode()`: the time stamp counter on x86
+    resp. the virtual counter of the generic timer on ARM64 (whereas 'llvm.readcyclecounter' reads
+    the performance monitors cycle counter there, which raises SIGILL from user mode by default);
+    zero on other architectures, i.e. no times are measured."""
+
+    def codegen(context, builder, signature, args):
+        fnty = ir.FunctionType(ir.IntType(64), [])
+        if _machine in ("x86_64", "amd64", "i386", "i686", "x86"):
+            fn = cgutils.get_or_insert_function(builder.module, fnty, "llvm.readcyclecounter")
+            return builder.call(fn, [])
+        if _machine in ("aarch64", "arm64"):
+            return builder.asm(fnty, "mrs $0, cntvct_el0", "=r", [], True)
+        return ir.Constant(ir.IntType(64), 0)
+
+    return nb.int64(), codegen
+
+
+@nb.njit(cache=True)
+def cycles() -> int:
+    """Cycle counter of the CPU, in the same units as the ones counted by `decode()`."""
+    return _cycles()
+
+
+@nb.njit(nb.int64(nb.int64, nb.int64), cache=True)
+def _gcd(a: int, b: int) -> int:
+    """Greatest common divisor of `a` and `b`."""
+    while b:
+        a, b = b, a % b
+    return a
+
+
+@nb.njit(nb.int64(nb.int64, nb.int64), cache=True)
+def _inverse(a: int, m: int) -> int:
+    """Modular multiplicative inverse of `a` modulo `m`, with `a` and `m` being coprime."""
+    t, t1 = 0, 1
+    r, r1 = m, a % m
+    while r1:  # extended Euclidean algorithm
+        k = r // r1
+        t, t1 = t1, t - k * t1
+        r, r1 = r1, r - k * r1
+    return t % m if m > 1 else 0
+
+
+@nb.njit(nb.uint16(nb.float64), cache=True)
+def _half(x: float) -> int:
+    """Bits of `x` in half precision (IEEE 754 binary16, i.e. `np.float16`), rounded to nearest even.
+    Numba doesn't support `np.float16` on the CPU, so the outputs are written as `np.uint16`
+    into a view of the half precision array."""
+    sign = 0x8000 if x < 0 or (x == 0 and math.copysign(1.0, x) < 0) else 0
+    ax = abs(x)
+
+    if not ax < 65520:  # overflow (values from 65520 on round to infinity), infinity or NaN
+        return sign | (0x7C00 if ax >= 65520 else 0x7E00)
+
+    if ax < 2.0**-14:  # subnormal or zero
+        return sign | np.int_(np.rint(ax * 2.0**24))
+
+    m, e = math.frexp(ax)  # ax = m * 2**e with m in [0.5, 1)
+    q = np.int_(np.rint(m * 2048))  # implicit leading one and 10 bits mantissa, in [1024, 2048]
+    return sign | ((e + 14) << 10) + q - 1024  # rounding up to 2048 carries into the exponent
+
+
+@nb.njit(cache=True, fastmath=True)
+def _phasor(k0: int, p: np.ndarray, w: np.ndarray, v: np.ndarray, iref: int, PI2: float) -> (float, float):
+    """Weighted sum of the unit phasors of the coordinates of all sets (real and imaginary part),
+    whose fringe orders are derived from the fringe order `k0` of the reference set `iref`."""
+    arg0 = (k0 * PI2 + p[iref]) / v[iref]  # reference angle
+    zr = w[iref] * np.cos(arg0)
+    zi = w[iref] * np.sin(arg0)
+
+    for i in range(iref):
+        ki = np.rint((arg0 * v[i] - p[i]) / PI2)  # fringe order of i-th set
+        ai = (ki * PI2 + p[i]) / v[i]
+        zr += w[i] * np.cos(ai)
+        zi += w[i] * np.sin(ai)
+
+    # leaving out reference set 'iref'
+
+    for i in range(iref + 1, len(p)):
+        ki = np.rint((arg0 * v[i] - p[i]) / PI2)  # fringe order of i-th set
+        ai = (ki * PI2 + p[i]) / v[i]
+        zr += w[i] * np.cos(ai)
+        zi += w[i] * np.sin(ai)
+
+    return zr, zi
 
 
-@nb.jit(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
 def decode(
     I: np.ndarray,
     N: np.ndarray,
@@ -61,20 +169,54 @@ def decode(
     f: np.ndarray,
     R: np.ndarray,
     UMR: np.ndarray,
-    x0: float = 0,
-    p0: float = np.pi,
-    Vmin: float = 0.0,
-    verbose: bool = False,
-) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+    x0: float,
+    p0: float,
+    Vmin: float,
+    bri: np.ndarray,
+    mod: np.ndarray,
+    phi: np.ndarray,
+    reg: np.ndarray,
+    res: np.ndarray,
+    buffers: tuple,
+    tiles: np.ndarray,
+    closedform: bool = True,
+    integer: bool = False,
+    crt: bool = False,
+    lut: np.ndarray = None,
+    count: np.ndarray = None,
+    pair: np.ndarray = None,
+    rlut: np.ndarray = None,
+    rmin: np.ndarray = None,
+    warm: bool = False,
+    prior: np.ndarray = None,
+    wu: np.ndarray = None,
+    noise: np.ndarray = None,
+    scale: float = 1.0,
+    precision: type = np.float64,
+) -> None:
     """Temporal demodulation and spatial demodulation
     by virtue of generalized temporal phase uwrapping
     using directional statistics.
 
+    The results are written into the output arrays `bri`, `mod`, `phi`, `reg` and `res`,
+    which are of type `np.float32` (its precision is usually better than quantization noise
+    in the phase shifting sequence), and the verbose outputs are derived from them in the same pass
+    into `unc`, `fid`, `vis` and `exp`, so they don't require any further passes over the images.
+    Outputs which are not requested are passed as empty arrays:
+    then they are neither allocated nor filled,
+    and if `reg` is empty, spatial demodulation is skipped altogether.
+
+    A batch of `B` sequences (e.g. of several cameras) is decoded at once, in one parallel region:
+    they are concatenated along the frames of `I`, the work items in `tiles` refer to their sequence
+    and the first axis of the outputs is `B` times as long, i.e. it is the one of the outputs of each sequence
+    one after another.
+
     Parameters
     ----------
     I : np.ndarray
         Fringe pattern sequence.
-        Must be in videoshape (frames `T`, height `Y`, width `X`, color channels `C`).
+        Must be in videoshape (frames `T`, height `Y`, width `X`, color channels `C`),
+        resp. in shape (`B` * `T`, `Y`, `X`, `C`) for a batch of `B` sequences.
 
     N : np.ndarray
         Number of phase shifts.
@@ -95,531 +237,816 @@ def decode(
     UMR : np.ndarray
         Unambiguous measurement range.
 
-    x0 : float, default=0
+    x0 : float
         Coordinate offset.
 
-    p0 : np.ndarray, default=np.pi
+    p0 : float
         Phase offset.
 
-    Vmin : float, default=0
+    Vmin : float
         Minimum visibility for measurement to be valid.
         If 'Vmin' isn't reached at a pixel, spatial unwrapping is skipped for this very pixel.
 
-    verbose : bool, default=False
-        Flag for additionally returning intermediate and verbose results: Phase maps 'phi' and residuals 'res'.
-
-    Returns
-    -------
     bri : np.ndarray
-        Brightness.
+        Output array for the brightness, in shape (`D`, `Y`, `X`, `C`), or empty.
+        Brightness should be identical for all sets, therefore they are averaged.
 
     mod : np.ndarray
-        Modulation.
+        Output array for the modulation, in shape (`D` * `K`, `Y`, `X`, `C`), or empty.
 
     phi : np.ndarray
-        Phase.
+        Output array for the phase, in shape (`D` * `K`, `Y`, `X`, `C`), or empty.
 
     reg : np.ndarray
-        Registration.
+        Output array for the registration, in shape (`D`, `Y`, `X`, `C`), or empty.
 
     res : np.ndarray
-        Residuals.
+        Output array for the residuals, in shape (`D`, `Y`, `X`, `C`), or empty.
+        It is only filled if `reg` is requested as well.
+
+    buffers : tuple
+        Output arrays of the verbose outputs, of the compact outputs and of the statistics, each of them possibly empty:
+
+        - `unc`: uncertainty of positional decoding in pixel units, in shape (`D`, `Y`, `X`, `C`).
+        - `fid`: fringe orders, in shape (`D` * `K`, `Y`, `X`, `C`); -1 where the registration is invalid.
+          It is only filled if `reg` is requested as well.
+        - `vis`: visibility, in shape (`D` * `K`, `Y`, `X`, `C`).
+        - `exp`: exposure, in shape (`D`, `Y`, `X`, `C`).
+        - `regq16`: registration in fixed point, i.e. in units of 1 / `scale` pixels, in shape (`D`, `Y`, `X`, `C`);
+          the maximal value marks invalid pixels and coordinates out of range are clipped.
+          Spatial demodulation is performed if any of `reg`, `regq16` and `regq32` is requested.
+        - `regq32`: same as `regq16`, for 32 bits.
+        - `modh`: modulation in half precision (i.e. the bits of `np.float16` values).
+        - `vish`: visibility in half precision (i.e. the bits of `np.float16` values).
+        - `fid8`: fringe orders as 8 bit unsigned integers; 255 marks invalid pixels.
+        - `fid16`: fringe orders as 16 bit integers; -1 marks invalid pixels.
+        - `stats`: statistics of each work item, in shape (`D` * number of tiles, 5):
+          the number of candidate combinations of fringe orders which have been evaluated,
+          the number of pixels which have been unwrapped, the number of pixels which have been skipped
+          because `Vmin` isn't reached, and the CPU cycles spent in temporal and in spatial demodulation.
+          The cycles are only counted if `hist` isn't empty, and only on x86 and ARM64 (cf. `_cycles()`).
+        - `hist`: histogram of the number of evaluated candidates per pixel, for each work item,
+          in shape (`D` * number of tiles, number of bins); the last bin counts all larger numbers as well.
+          If it isn't empty, the decoding is instrumented, i.e. the CPU cycles are counted as well.
+
+    tiles : np.ndarray
+        Work items of the parallel loop, in shape (number of tiles, 4),
+        each consisting of a row, the first and last (exclusive) pixel of a run of pixels within this row
+        and the index of the sequence within the batch, as returned by `util.tiles()`.
+        Only these pixels are decoded, the others in the output arrays are left untouched.
+
+    closedform : bool, default=True
+        Flag for using the classic closed-form phase shifting formulas,
+        which need additions and subtractions only, for sets with 3 or 4 shifts (and matching frequencies)
+        instead of correlating with the discrete complex filter.
+
+    integer : bool, default=False
+        Flag for accumulating the samples of integer-valued fringe pattern sequences (i.e. `uint8` or `uint16`)
+        in the integer domain, with filter coefficients scaled to fixed point integers;
+        they are converted to floating point once per pixel and set instead of once per sample.
+
+    crt : bool, default=False
+        Flag for determining the fringe orders with the Chinese Remainder Theorem in constant time per pixel,
+        which is applicable if all wavelengths `l` = `L` / `v` of a direction are integers.
+        Where the residues are too noisy for a reliable solution, the fringe orders are searched for instead.
+
+    lut : np.ndarray
+        Candidate fringe orders of the reference set for the quantized phases of the reference set
+        and of the set `pair`, as returned by `util.candidates()`, or empty.
+        If given, only the candidates of the bins a pixel falls into are tried
+        instead of all fringe orders of the reference set, unless none of them reaches `rlut`.
+
+    count : np.ndarray
+        Number of candidates in `lut`; if it is zero or negative, the fringe orders are searched for instead.
+
+    pair : np.ndarray
+        Index of the set whose phase is quantized along with the one of the reference set.
+
+    rlut : np.ndarray
+        Minimal phasor length for each direction, as returned by `util.threshold()`,
+        at which the best of the looked up candidates is accepted;
+        else (e.g. if noise moved the phases beyond the neighboring bins) all candidates are searched for.
+
+    rmin : np.ndarray
+        Minimal phasor length for each direction, as returned by `util.threshold()`:
+        as soon as a candidate combination of fringe orders reaches it,
+        it is the correct one within the noise bound and the search stops.
+        If it is one, all candidates are tried.
+
+    warm : bool, default=False
+        Flag for starting the search for the fringe orders of each pixel
+        at the fringe order of the previous pixel within its tile and its two neighbors.
+        They are accepted if the phasor reaches `rmin`, else all candidates are tried;
+        if `rmin` is one, they aren't tried first.
+
+    prior : np.ndarray
+        Fringe orders of the reference sets of a prior registration, e.g. of a previous measurement,
+        in shape (`D`, `Y`, `X`, `C`), or empty; -1 where there is none (e.g. where the prior is NaN,
+        which can't be tested for here because of 'fastmath').
+        If given, the search for the fringe orders of each pixel starts at its prior fringe order
+        and its two neighbors (instead of the ones of the previous pixel).
+        They are accepted if the phasor reaches `rmin`, else all candidates are tried.
+
+    wu : np.ndarray
+        Inverse variances of the positional uncertainties of the sets, relative to the squared modulation
+        and to the inverse intensity noise variance, in shape (`D`, `K`), or empty if `unc` is empty.
+
+    noise : np.ndarray
+        Parameters of the noise model, i.e. the gain, the variance of the dark and quantization noise
+        and the dark signal, followed by the maximal intensity value of the data type of `I`.
+
+    scale : float, default=1.0
+        Subpixel scale of the fixed point registration `regq16` resp. `regq32`, i.e. units per pixel.
+
+    precision : type, default=np.float64
+        Floating point type in which temporal demodulation and unwrapping are computed.
+        With `np.float32`, the memory traffic is halved and twice as many values fit into a SIMD register.
+        The outputs are of type `np.float32` in either case.
     """
 
-    PI2 = 2 * np.pi
+    PI2 = precision(2 * np.pi)
 
     T, Y, X, C = I.shape
-    # I = I.reshape(Y * X * C)  # only possible for continuous arrays, but we have multiplexing and deinterlacing
+    Ts = np.sum(N)  # number of frames of each sequence of a batch
     D, K = N.shape
 
     L = np.max(R) + 2 * x0  # coding range
     l = L / v  # lambda i.e. period lengths in [px]
 
-    # allocate return values
-    dt = np.float32  # float32's precision is usually better than quantization noise in the phase shifting sequence
-    bri = np.empty((D, Y, X, C), dt)  # brightness should be identical for all sets, therefore we arverage them
-    mod = np.empty((D, K, Y, X, C), dt)
-    phi = np.empty((D, K, Y, X, C), dt)
-    reg = np.empty((D, Y, X, C), dt)
-    res = np.empty((D, Y, X, C), dt)
+    unc, fid, vis, exp, regq16, regq32, modh, vish, fid8, fid16, stats, hist = buffers
+
+    # requested outputs
+    fill_bri = bri.size > 0
+    fill_mod = mod.size > 0
+    fill_phi = phi.size > 0
+    fill_reg = reg.size > 0
+    fill_res = res.size > 0
+    fill_unc = unc.size > 0
+    fill_fid = fid.size > 0
+    fill_vis = vis.size > 0
+    fill_exp = exp.size > 0
+    fill_regq = regq16.size > 0 or regq32.size > 0
+    fill_modh = modh.size > 0
+    fill_vish = vish.size > 0
+    fill_fidi = fid8.size > 0 or fid16.size > 0
+    spatial = fill_reg or fill_regq  # flag indicating whether spatial demodulation is required
+
+    # compact outputs
+    qmax = np.float64(65535 if regq16.size > 0 else 4294967295)  # marks invalid pixels of fixed point registration
+    FID8MAX = 255  # marks invalid pixels of 8 bit fringe orders
+
+    # noise model for the uncertainty and exposure
+    gain = noise[0]  # system gain
+    var0 = noise[1]  # variance of dark and quantization noise
+    y0 = noise[2]  # dark signal
+    Imax = noise[3]  # maximal intensity value
+
+    # lookup table of candidate fringe orders
+    use_lut = lut.size > 0
+
+    # prior registration to start the search for the fringe orders from
+    use_prior = prior.size > 0
+
+    # instrumentation
+    instrument = hist.size > 0
+    H = hist.shape[1]  # number of bins
+    Q = count.shape[1]  # number of phase bins
+
+    # if the time series of the pixels aren't contiguous in memory (i.e. frames are stored one after another),
+    # each tile is transposed into pixel-major order first, so the samples of a pixel are read consecutively
+    gather = I.strides[0] > I.strides[2]
+
+    # constants of each direction
+    T0 = np.empty(D, np.int_)  # first frame of each direction
+    Nd = np.empty(D, np.int_)  # number of frames of each direction
+    t_start = np.empty((D, K), np.int_)  # first frame of each set, relative to first frame of its direction
+    cfr = np.empty((D, K, np.max(N)), precision)  # discrete complex filters (real part)
+    cfi = np.empty((D, K, np.max(N)), precision)  # discrete complex filters (imaginary part)
+
+    # sets for which the complex filter reduces to 1, i, -1, -i (`N` = 4) resp. to 120° weights (`N` = 3),
+    # so the phasor is computed in closed form, i.e. with additions and subtractions only;
+    # its sign of the imaginary part depends on the sign of the temporal frequency,
+    # and the phase offset is added afterward
+    cls = np.zeros((D, K), np.int_)  # number of shifts of the closed-form formula, 0 for none
+    sgn = np.ones((D, K), precision)  # sign of the imaginary part of the phasor
+    poff = np.zeros((D, K), precision)  # phase offset
+    HALF = precision(0.5)
+    SQRT3_2 = precision(np.sqrt(3) / 2)
+
+    # discrete complex filters as fixed point integers, for accumulating integer-valued samples;
+    # with `QBITS` fractional bits, the sums of `uint16` samples fit into `int64` for up to 2**17 shifts
+    QBITS = 30
+    cqr = np.empty((D, K, np.max(N)), np.int64)  # real part
+    cqi = np.empty((D, K, np.max(N)), np.int64)  # imaginary part
+    QSCALE = precision(2.0**-QBITS)
+
+    # coefficients for the Chinese Remainder Theorem, cf. below
+    crtd = np.empty(D, np.bool_)  # flag indicating whether CRT is applicable
+    cg_ = np.ones(D, np.int64)  # greatest common divisor of the wavelengths
+    m = np.ones((D, K), np.int64)  # moduli
+    cM = np.ones((D, K), np.int64)  # least common multiples of the preceding moduli
+    cg = np.ones((D, K), np.int64)  # greatest common divisors of 'cM' and 'm'
+    cinv = np.zeros((D, K), np.int64)  # modular multiplicative inverses of 'cM / cg' modulo 'm / cg'
+    CRTTOL = precision(0.25)  # maximal deviation of the residues from their integer parts
+
+    # initial weights of phase averaging are their inverse variances
+    # (must be multiplied with b**2 later on)
+    w0 = (N * v**2).astype(precision)
+    vf = v.astype(precision)
+
+    # reference phases, i.e. that v from which the other fringe orders of the remaining sets are derived
+    irefs = np.empty(D, np.int_)
+
+    # usually, camera sees only the central part of the screen
+    # -> try central fringe orders first and move outwards
+    # (this only accelerates if a break criterion is used and reached)
+    vmax = np.ceil(v * ((R + 2 * x0) / L).reshape((D, 1))).astype(np.int_)
+    kout = np.empty((D, K, np.max(vmax)), np.int_)  # indices for traversing v from the center outwards
 
-    # looping
     for d in range(D):
         # time/frame indices (for when decoding shifts of each set)
         t_end = np.cumsum(N)[d * K : (d + 1) * K]
-        t_start = t_end - N[d]
+        t_start[d] = t_end - N[d]
+        T0[d] = t_start[d, 0]
+        t_start[d] -= T0[d]
+        Nd[d] = np.sum(N[d])
 
         # complex filter coefficients
-        cf = np.empty((K, np.max(N[d])), np.complex_)  # discrete complex filter
         for i in range(K):
             for n in range(N[d, i]):
                 t = n / N[d, i]  # temporal sampling points
-                cf[i, n] = np.exp(1j * (PI2 * f[d, i] * t + p0))  # complex filter
-
-        # initial weights of phase averaging are their inverse variances
-        # (must be multiplied with b**2 later on)
-        w0 = N[d] * v[d] ** 2
-
-        # choose reference phase, i.e. that v from which the other fringe orders of the remaining sets are derived
-        iref = np.argmin(v[d])  # fast
-        # iref = np.argmax(w0)  # precise  # todo: iref
-
-        # usually, camera sees only the central part of the screen
-        # -> try central fringe orders first and move outwards
-        # (this only accelerates if a break criterion is used and reached)
-        Rx0 = R[d] + x0
-        R2x0 = Rx0 + x0
-        vmax = np.ceil(v[d] * R2x0 / L).astype(np.int_)
-        kout = np.empty((K, np.max(vmax)), np.int_)  # indices for traversing v from the center outwards
+                cf = np.exp(1j * (PI2 * f[d, i] * t + p0))  # complex filter
+                cfr[d, i, n] = cf.real
+                cfi[d, i, n] = cf.imag
+                cqr[d, i, n] = np.int64(np.rint(cf.real * 2**QBITS))
+                cqi[d, i, n] = np.int64(np.rint(cf.imag * 2**QBITS))
+
+            fm = f[d, i] % N[d, i]  # temporal frequency modulo number of shifts
+            if closedform and (N[d, i] == 3 or N[d, i] == 4) and (fm == 1 or fm == N[d, i] - 1):
+                cls[d, i] = N[d, i]
+                sgn[d, i] = 1 if fm == 1 else -1
+                poff[d, i] = p0
+
+        irefs[d] = np.argmin(v[d])  # fast
+
         for i in range(K):
-            kc = (vmax[i] - 1) // 2  # central fringe order
-            for k in range(vmax[i]):
+            kc = (vmax[d, i] - 1) // 2  # central fringe order
+            for k in range(vmax[d, i]):
                 if k % 2 == 0:
-                    kout[i, k] = kc - (k + 1) // 2
+                    kout[d, i, k] = kc - (k + 1) // 2
                 else:
-                    kout[i, k] = kc + (k + 1) // 2
-
-        # # coefficients for CRT
-        # precision = 13
-        # atol = 10**-precision
-        #
-        # m = np.empty((D, K), np.int_)  # correction factor for when extending CRT to rational numbers
-        # lcm = np.empty(D, np.int_)
-        # CRT = np.empty(D, np.bool_)  # flag indicating whether CRT is applicable
-        # # MM_ = np.empty((D, K), np.int_)  # Solution of multiple congruences, derived with the Chinese Remainder Theorem.
-        # MM_ = np.zeros((D, K), np.int_)
-        # for d in range(D):
-        #     # find moduli
-        #     if np.all(l[d] % 1 == 0):  # all l are integers
-        #         m_ = l[d].astype(np.int_)
-        #         gcd = np.gcd.reduce(m_)
-        #         m[d] = m_ / gcd
-        #         lcm[d] = np.lcm.reduce(m[d])
-        #     elif np.all(v[d] % 1 == 0):  # all v are integers
-        #         m_ = v[d].astype(np.int_)
-        #         lcm[d] = np.lcm.reduce(m_)
-        #         m[d] = lcm[d] / m_  # changes order of m_
-        #     elif np.allclose(l[d], np.rint(l[d]), rtol=0, atol=atol):
-        #         m_ = np.rint(l[d]).astype(np.int_)
-        #         gcd = np.gcd.reduce(m_)
-        #         m[d] = m_ / gcd
-        #         lcm[d] = np.lcm.reduce(m[d])
-        #     elif np.allclose(v[d], np.rint(v[d]), rtol=0, atol=atol):
-        #         m_ = v[d].astype(np.int_)
-        #         lcm[d] = np.lcm.reduce(m_)
-        #         m[d] = lcm[d] / m_  # changes order of m_
-        #     else:
-        #         ml = l[d]
-        #         mv = v[d]
-        #
-        #         # # mutual divisibility test
-        #         # for i in range(K - 1):
-        #         #     for j in range(i + 1, K):
-        #         #         if l[d, i] % l[d, j] < atol or 1 - atol < l[d, i] % l[d, j] < 1:
-        #         #             ml[j] = 1
-        #         #         elif l[d, j] % l[d, i] < atol or 1 - atol < l[d, j] % l[d, i] < 1:
-        #         #             ml[i] = 1
-        #         # ml = ml[ml != 1]
-        #         # mv = mv[ml != 1]
-        #
-        #         # estimate whether elements are rational or irrational
-        #         Dl = max(str(i)[::-1].find(".") for i in ml)
-        #         Dv = max(str(i)[::-1].find(".") for i in mv)
-        #         # Dl = max(len(str(i)) - len(str(int(i))) - 1 for i in ml)  # -1: dot
-        #         # Dv = max(len(str(i)) - len(str(int(i))) - 1 for i in mv)  # -1: dot
-        #
-        #         if (
-        #             Dl < precision or Dv < precision
-        #         ):  # rational numbers without integers (i.e. not covered by isclose(atol))
-        #             # extend lcm/gcd to rational numbers
-        #
-        #             if Dl <= Dv:
-        #                 m_ = (ml * 10**Dl).astype(np.int_)  # wavelengths scaled
-        #                 gcd = np.gcd.reduce(m_)
-        #                 m[d] = m_ / gcd
-        #                 lcm[d] = np.lcm.reduce(m[d])
-        #             else:
-        #                 m_ = (mv * 10**Dv).astype(np.int_)  # spatial frequencies scaled
-        #                 lcm[d] = np.lcm.reduce(m_)
-        #                 m[d] = lcm[d] / m_
-        #         else:  # irrational numbers or rational numbers with more digits than "precision"
-        #             # round and extend lcm to rational numbers
-        #             m[d] = np.nan  # todo: int?
-        #             lcm[d] = np.prod(l)  # todo: int?
-        #
-        #     # find coefficients
-        #     # todo: equal m -> weighted average of p
-        #     CRT[d] = np.gcd.reduce(m[d]) == 1
-        #     if CRT[d]:
-        #         # todo: v = 9, 10, 11
-        #         for i in range(K):
-        #             M = int(lcm[d] / m[d, i])
-        #             for M_ in range(1, m[d, i]):
-        #                 MM = M * M_
-        #                 if MM % m[d, i] == 1:  # M_ is modular multiplicative inverse element of M
-        #                     if not np.any(
-        #                         MM_[d, :i] % m[d, i] == 1
-        #                     ):  # assure no existing coefficient also equals 1 modulo m[i]
-        #                         MM_[d, i] = MM
-        #             #         else:
-        #             #             MM_[d, i] = 0
-        #             #
-        #             #         break
-        #             # else:  # else clause executes only after the loop completes normally, i.e. did not encounter a break, i.e. no MMIE found
-        #             #     MM_[d, i] = 0  # no solution found
-        #
-        # gcd = np.mean(l / m[d, :], axis=1)
-        # S = UMR / gcd  # number of steps (intervals) for unwrapping
-        # dev = np.exp(1j * np.pi / S)  # unit deviation vector
-
-        # # fringe order combinations
-        # gcd = np.ones(D, np.int_)  # todo: from CRT?!
-        # # xi = np.arange(R[d], step=gcd[d])  # todo: x0
-        # xi = np.arange(x0, Rx0[d], gcd[d])
-        # kp = (xi[None, :] // l[d, :, None]).astype(np.int_)
-        # Kp = set(tuple(k) for k in kp.T)  # matching combinations
-        #
-        # Kn = set()  # neighbouring combinations (to account for noise)
-        # for i in range(K):
-        #     for j in (-1, +1):
-        #         kn = kp.copy()
-        #         kn[i] = np.roll(kn[i], j)
-        #         Kn.update(tuple(k) for k in kn.T)
-        # Kn -= Kp  # neighbouring without matching combinations
-        #
-        # args = (range(int(np.ceil(vmax[i]))) for i in range(K))
-        # pools = (tuple(pool) for pool in args)
-        # Ka = [()]
-        # for pool in pools:  # combinatorial product
-        #     Ka = [x + (y,) for x in Ka for y in pool]
-        # Kr = set(Ka) - Kn - Kp  # remaining combinations, i.e. all without neighbouring and also without matching one
-        #
-        # Kp = np.array(sorted(Kp))
-        # Kn = np.array(sorted(Kn))
-        # Kr = np.array(sorted(Kr))
-
-        for x in nb.prange(X):  # numba's prange affects only outer prange-loop, so we put largest direction first
-            for y in nb.prange(Y):
-                # aa01_crt_tried = 0
-                # aa02_der_tried = 0
-                # aa03_der_tried = 0
-                # aa04_nei_tried = 0
-                # aa05_nei_tried = 0
-                # aa06_exh_tried = 0
-                #
-                # aa01_crt_corr = 0
-                # aa02_der_corr = 0
-                # aa03_der_corr = 0
-                # aa04_nei_corr = 0
-                # aa05_nei_corr = 0
-                # aa06_exh_corr = 0
-                #
-                # aa0_all_tried = X
-                # aa0_all_corr = 0
-                #
-                # false = []
-                for c in nb.prange(C):
-                    # temporal demodulation
-                    zp = np.zeros(K, np.complex_)  # complex phasor
-                    for i in range(K):
-                        I_ = I[t_start[i] : t_end[i], y, x, c]
-                        zp[i] = np.sum(I_ * cf[i])
+                    kout[d, i, k] = kc + (k + 1) // 2
+
+        # coefficients of the Chinese Remainder Theorem (CRT), which is applicable if all wavelengths are integers:
+        # in units of their greatest common divisor 'g', they are the moduli 'm' of the congruences
+        # which are solved by successive substitution (moduli don't need to be pairwise coprime);
+        # 'cM' are the least common multiples of the preceding moduli,
+        # 'cg' their greatest common divisors with the current modulus
+        # and 'cinv' the modular multiplicative inverses of 'cM / cg' modulo 'm / cg'
+        crtd[d] = crt
+        for i in range(K):
+            if abs(l[d, i] - np.rint(l[d, i])) > 1e-9 * l[d, i]:
+                crtd[d] = False  # wavelength isn't an integer
+        if crtd[d]:
+            g = np.int64(np.rint(l[d, 0]))
+            for i in range(1, K):
+                g = _gcd(g, np.int64(np.rint(l[d, i])))
+            cg_[d] = g
+            lcm = np.int64(1)
+            for i in range(K):
+                m[d, i] = np.int64(np.rint(l[d, i])) // g
+                cM[d, i] = lcm
+                cg[d, i] = _gcd(lcm, m[d, i])
+                cinv[d, i] = _inverse(lcm // cg[d, i], m[d, i] // cg[d, i])
+                lcm = lcm // cg[d, i] * m[d, i]
+                if lcm > 2**31:  # avoid integer overflow
+                    crtd[d] = False
+                    break
+
+    # directions and tiles (i.e. chunks of pixels within a row) are flattened into one parallel iteration space,
+    # which is traversed in row-major order; this keeps all threads busy
+    # even for tall-narrow images, line-scan data (with `Y` = 1) or small regions of interest;
+    # as the tiles are a compacted list of the pixels to decode, the work scales with their number
+    nt = tiles.shape[0]  # number of tiles
+    for j in nb.prange(D * nt):  # numba's prange affects only outer prange-loop
+        d = j // nt
+        y = tiles[j % nt, 0]
+        xa = tiles[j % nt, 1]  # first pixel of tile
+        xb = tiles[j % nt, 2]  # last pixel of tile (exclusive)
+        do = tiles[j % nt, 3] * D + d  # index of the direction in the outputs
+        t0 = tiles[j % nt, 3] * Ts + T0[d]  # first frame of the direction in `I`
+        iref = irefs[d]
+
+        # scratch buffers for modulation 'b', phase 'p', weights 'w' and CRT residues 'q' of the current pixel;
+        # they are allocated once per tile and reused for each of its pixels,
+        # so the per-pixel loop doesn't allocate any memory
+        b, p, w, q = np.empty((4, K), precision)
+
+        # pixel-major tile, i.e. in shape (width `xb - xa`, color channels `C`, frames `Nd`)
+        if gather:
+            J = np.empty((xb - xa, C, Nd[d]), I.dtype)
+            for t in range(Nd[d]):
+                for x in range(xa, xb):  # each frame row is read consecutively
+                    for c in range(C):
+                        J[x - xa, c, t] = I[t0 + t, y, x, c]
+        else:
+            J = I[t0 : t0 + Nd[d], y, xa:xb].transpose(1, 2, 0)  # view, i.e. no copy
+
+        kp = np.full(C, -1, np.int_)  # fringe orders of the reference set of the previous pixel, -1 for none
+        ne = 0  # number of evaluated candidates
+        nu = 0  # number of unwrapped pixels
+        ns = 0  # number of skipped pixels
+        ct = 0  # cycles spent in temporal demodulation
+        cs = 0  # cycles spent in spatial demodulation
+        for x in range(xa, xb):
+            for c in nb.prange(C):
+                c0 = c1 = np.int64(0)  # cycle counts
+                npx = 0  # number of evaluated candidates of this pixel
+                if instrument:
+                    c0 = _cycles()
+
+                # temporal demodulation
+                a = precision(0)  # accumulated intensity
+                ai = np.int64(0)  # accumulated intensity of integer-valued samples
+                for i in range(K):
+                    t = t_start[d, i]
+                    if integer:  # accumulate in the integer domain, convert to floating point once per set
+                        if cls[d, i] == 4:
+                            K0 = np.int64(J[x - xa, c, t])
+                            K1 = np.int64(J[x - xa, c, t + 1])
+                            K2 = np.int64(J[x - xa, c, t + 2])
+                            K3 = np.int64(J[x - xa, c, t + 3])
+                            zr = precision(K0 - K2)  # complex phasor (real part)
+                            zi = sgn[d, i] * precision(K1 - K3)  # complex phasor (imaginary part)
+                            ai += K0 + K1 + K2 + K3
+                        elif cls[d, i] == 3:
+                            K0 = np.int64(J[x - xa, c, t])
+                            K1 = np.int64(J[x - xa, c, t + 1])
+                            K2 = np.int64(J[x - xa, c, t + 2])
+                            zr = HALF * precision(2 * K0 - K1 - K2)  # complex phasor (real part)
+                            zi = sgn[d, i] * SQRT3_2 * precision(K1 - K2)  # complex phasor (imaginary part)
+                            ai += K0 + K1 + K2
+                        else:
+                            zri = np.int64(0)  # complex phasor (real part), in fixed point
+                            zii = np.int64(0)  # complex phasor (imaginary part), in fixed point
+                            for n in range(N[d, i]):
+                                K_ = np.int64(J[x - xa, c, t + n])
+                                zri += K_ * cqr[d, i, n]
+                                zii += K_ * cqi[d, i, n]
+                                ai += K_
+                            zr = precision(zri) * QSCALE
+                            zi = precision(zii) * QSCALE
+                    elif cls[d, i] == 4:
+                        I0 = precision(J[x - xa, c, t])
+                        I1 = precision(J[x - xa, c, t + 1])
+                        I2 = precision(J[x - xa, c, t + 2])
+                        I3 = precision(J[x - xa, c, t + 3])
+                        zr = I0 - I2  # complex phasor (real part)
+                        zi = sgn[d, i] * (I1 - I3)  # complex phasor (imaginary part)
+                        a += I0 + I1 + I2 + I3
+                    elif cls[d, i] == 3:
+                        I0 = precision(J[x - xa, c, t])
+                        I1 = precision(J[x - xa, c, t + 1])
+                        I2 = precision(J[x - xa, c, t + 2])
+                        zr = I0 - HALF * (I1 + I2)  # complex phasor (real part)
+                        zi = sgn[d, i] * SQRT3_2 * (I1 - I2)  # complex phasor (imaginary part)
+                        a += I0 + I1 + I2
+                    else:
+                        zr = precision(0)  # complex phasor (real part)
+                        zi = precision(0)  # complex phasor (imaginary part)
+                        for n in range(N[d, i]):
+                            I_ = precision(J[x - xa, c, t + n])
+                            zr += I_ * cfr[d, i, n]
+                            zi += I_ * cfi[d, i, n]
+                            a += I_
+
+                    # * 2: also add amplitudes of frequencies with opposite sign
+                    b[i] = np.sqrt(zr**2 + zi**2) / N[d, i] * 2
+                    # arctan2 maps to [-PI, PI], but we need [0, 2PI)
+                    p[i] = (np.arctan2(zi, zr) + poff[d, i]) % PI2
+
+                if integer:
+                    a = precision(ai)
 
-                    a = np.mean(I_)
-                    b = np.abs(zp) / N[d] * 2  # * 2: also add amplitudes of frequencies with opposite sign
-                    p = np.arctan2(zp.imag, zp.real) % PI2  # arctan2 maps to [-PI, PI], but we need [0, 2PI)
-                    # p = np.angle(zp) % PI2  # arctan2 maps to [-PI, PI], but we need [0, 2PI)
+                a /= precision(Nd[d])  # mean over all sets
 
-                    bri[d, y, x, c] = a
-                    mod[d, :, y, x, c] = b
+                if instrument:
+                    c1 = _cycles()
+                    ct += c1 - c0
 
-                    if verbose:
-                        phi[d, :, y, x, c] = p
+                if fill_bri:
+                    bri[do, y, x, c] = a
 
-                    V = np.minimum(1, b / np.maximum(np.finfo(np.float_).eps, a))  # avoid division by zero
-                    if Vmin > 0 and np.any(V < Vmin):
-                        reg[d, y, x, c] = np.nan
-                        if verbose:
-                            res[d, y, x, c] = np.nan
+                if fill_exp:
+                    exp[do, y, x, c] = a / Imax  # relative average intensity
 
-                        continue  # skip spatial demodulation because signal is too weak for a reliable result
+                Vlow = False
+                wb = 0.0  # sum of the inverse variances of the positional uncertainties, without noise
+                for i in range(K):
+                    if fill_mod:
+                        mod[do * K + i, y, x, c] = b[i]
+                    if fill_modh:
+                        modh[do * K + i, y, x, c] = _half(b[i])
 
-                    # spatial demodulation i.e. unwrapping
-                    if K == 1:
-                        if v[d, 0] == 0:  # no spatial modulation
-                            if R[d] == 1:
-                                # the only possible value; however it makes no senso to encode a single coordinate only
-                                reg[d, y, x, c] = 0
+                    if fill_phi:
+                        phi[do * K + i, y, x, c] = p[i]
 
-                                if verbose:
-                                    res[d, y, x, c] = 0
+                    # visibility (avoid division by zero)
+                    Vi = b[i] / max(np.finfo(np.float_).eps, a)
+                    if fill_vis:
+                        vis[do * K + i, y, x, c] = Vi
+                    if fill_vish:
+                        vish[do * K + i, y, x, c] = _half(Vi)
+                    if min(1, Vi) < Vmin:
+                        Vlow = True
+
+                    if fill_unc:
+                        wb += wu[d, i] * np.float64(b[i]) ** 2
+
+                if fill_unc:
+                    # intensity noise variance: shot noise (gain * brightness) and dark and quantization noise;
+                    # the positional uncertainty follows by inverse variance weighting of the ones of the sets
+                    ui2 = gain * max(np.float64(a) - y0, 0.0) + var0
+                    unc[do, y, x, c] = np.sqrt(ui2 / wb) if wb > 0 else np.inf
+
+                if not spatial:
+                    continue  # skip spatial demodulation because registration isn't requested
+
+                if Vlow:
+                    ns += 1
+                    kp[c] = -1  # no fringe order to start from
+                    if fill_reg:
+                        reg[do, y, x, c] = np.nan
+                    if fill_regq:
+                        if regq16.size > 0:
+                            regq16[do, y, x, c] = np.uint16(qmax)
+                        else:
+                            regq32[do, y, x, c] = np.uint32(qmax)
+                    if fill_res:
+                        res[do, y, x, c] = np.nan
+                    for i in range(K):
+                        if fill_fid:
+                            fid[do * K + i, y, x, c] = -1
+                        if fill_fidi:
+                            if fid8.size > 0:
+                                fid8[do * K + i, y, x, c] = FID8MAX
                             else:
-                                # no spatial modulation, therefore we can't compute value
-                                reg[d, y, x, c] = np.nan
-
-                                if verbose:
-                                    res[d, y, x, c] = np.nan
-                        elif v[d, 0] <= 1:
-                            # one period covers whole screen: no unwrapping required
-                            reg[d, y, x, c] = p[0] / PI2 * l[d, 0] - x0  # change codomain from [0, PI2) to [0, L)
-                            # xi = np.clip(xi, 0, R[d])  # todo: clip
-
-                            if verbose:
-                                res[d, y, x, c] = 0
+                                fid16[do * K + i, y, x, c] = -1
+
+                    continue  # skip spatial demodulation because signal is too weak for a reliable result
+
+                # spatial demodulation i.e. unwrapping
+                valid = True  # whether the registration is valid (with fastmath, it can't be tested for NaN)
+                if K == 1:
+                    if v[d, 0] == 0:  # no spatial modulation
+                        if R[d] == 1:
+                            # the only possible value; however it makes no senso to encode a single coordinate only
+                            xr = 0.0
+
+                            if fill_res:
+                                res[do, y, x, c] = 0
                         else:
-                            # spatial phase unwrapping (to be done in a later step)
-                            reg[d, y, x, c] = p[0] - PI2 / l[d, 0] * x0
-                            # xi = np.clip(xi, 0, R[d])  # todo: clip
+                            # no spatial modulation, therefore we can't compute value
+                            xr = np.nan
+                            valid = False
+
+                            if fill_res:
+                                res[do, y, x, c] = np.nan
+                    elif v[d, 0] <= 1:
+                        # one period covers whole screen: no unwrapping required
+                        xr = p[0] / PI2 * l[d, 0] - x0  # change codomain from [0, PI2) to [0, L)
+                        # xi = np.clip(xi, 0, R[d])  # todo: clip
 
-                            if verbose:
-                                # attention: residuals are to be received from SPU
-                                pass  # todo
+                        if fill_res:
+                            res[do, y, x, c] = 0
                     else:
-                        # generalized temporal phase unwrapping
-
-                        # weights of phase measurements
-                        w = w0 * b**2  # weights for inverse variance weighting
-                        w /= np.sum(w)  # normalize weights
-
-                        # criterion for when correct solution is found,
-                        # which is when the phasor is large enough
-                        # i.e. the circular variance is small enough
-                        # todo: other criterion than all phasors aligned and smallest one inbetween two fringe orders?
-                        # rmin = 0  # minimal phasor length for unwrapping to be successful:
-                        # for i in range(K):
-                        #     zmin = 0
-                        #     for j in range(K):
-                        #         if i == j:
-                        #             zmin += w[j] * dev[d]
-                        #         else:
-                        #             zmin += w[j]
-                        #
-                        #     r = np.abs(zmin)
-                        #     if r > rmin:
-                        #         rmin = r
-                        rmin = 1
-
-                        # maximal phasor length: initialize with minimal value
-                        rmax = 0
-
-                        # try in this order:
-                        # 1.) CRT
-                        # new: KDTree
-                        # 2.) derive(vmin), derive(wmax)
-                        # 3.) matching, their neighbors
-                        # 4.) exhaustive
-
-                        # # KDTree
-                        # anker = (np.arange(lcm[d]) + 1 / 2) * gcd[d]
-
-                        # if CRT[d]:  # CRT is applicable
-                        #     aa01_crt_tried += 1
-                        #
-                        #     # apply Chinese Remainder Theorem
-                        #     # time complexity O(1)
-                        #
-                        #     p_int, p_fract = np.divmod(p / PI2 * m[d], 1)
-                        #     p_int3, p_fract3 = np.divmod(p / PI2 * l[d], gcd[d])
-                        #
-                        #     # refine
-                        #     #
-                        #     # The validity of the absolute phase measurement
-                        #     # depends on the correct outcome of the INT operations,
-                        #     # which means that the measurement noise should not cause any p_ to cross an INT boundary.
-                        #     # It is very interesting and useful to realize
-                        #     # that p_fract is theoretically the same for all i,
-                        #     # so that we can average them to suppress random errors
-                        #     # and to obtain a more reliable xi_est.
-                        #
-                        #     p_fract_circ_mean = (
-                        #         np.angle(np.sum(w * np.exp(1j * PI2 * p_fract))) % PI2 / PI2
-                        #     )  # weighted circular mean
-                        #     p_fract_circ_mean3 = (
-                        #         np.angle(np.sum(w * np.exp(1j * PI2 * p_fract3))) % PI2 / PI2
-                        #     )  # weighted circular mean
-                        #
-                        #     d_p = p_fract - p_fract_circ_mean > 0.5
-                        #     d_m = p_fract_circ_mean - p_fract > 0.5
-                        #     p_int[p_fract - p_fract_circ_mean > 0.5] += 1
-                        #     # p_int[p_fract - p_fract_circ_mean < - 0.5] -= 1
-                        #     p_int[p_fract_circ_mean - p_fract > 0.5] -= 1
-                        #
-                        #     a000 = np.sum(MM_[d] * p_int.astype(np.int_))
-                        #     b000 = p_fract_circ_mean
-                        #     c000 = a000 + b000
-                        #     d000 = c000 % lcm[d]
-                        #     e000 = d000 * gcd[d]
-                        #
-                        #     xi_crt_ = np.sum(MM_[d] * p_int.astype(np.int_))
-                        #     xi_crt = (np.sum(MM_[d] * p_int.astype(np.int_)) % lcm[d] + p_fract_circ_mean) * gcd[
-                        #         d
-                        #     ]  # lcm * gcd = UMR
-                        #     xi_crt3 = (
-                        #         np.sum(MM_[d] * p_int3.astype(np.int_)) % lcm[d] * gcd[d] + p_fract_circ_mean3
-                        #     )  # lcm * gcd = UMR
-                        #
-                        #     xi_uc = np.angle(w * np.exp(1j * p / v[d])) % PI2 / PI2 * L - x0
-                        #     xi_uc3 = np.angle(np.exp(1j * np.sum(p / v[d] * MM_[d]) / lcm[d])) % PI2 / PI2 * L - x0
-                        #
-                        #     x_ = x
-                        #     xi_ = xi_crt
-                        #     xi = xi_crt
-                        #     z = np.exp(1j * PI2 * xi / L)
-                        #
-                        #     # xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0  # todo:L or UMR[d]?
-                        #     if np.round(xi) == x:
-                        #         aa01_crt_corr += 1
-                        # else:
-                        #     r = 0
-                        r = 0
-
-                        if r < rmin:
-                            # aa02_der_tried += 1
-
-                            # derive fringe orders from the reference set,
-                            # i.e. the one with the least number of periods
-                            # max. time complexity O(ceil(vmin))
-
-                            for k0 in kout[iref, : vmax[iref]]:  # fringe orders of reference set 'iref'
-                                arg0 = (k0 * PI2 + p[iref]) / v[d, iref]  # reference angle
-                                zi = w[iref] * np.exp(1j * arg0)
-
-                                for i in range(iref):
-                                    ki = np.rint((arg0 * v[d, i] - p[i]) / PI2)  # fringe order of i-th set
-                                    ai = (ki * PI2 + p[i]) / v[d, i]
-                                    zi += w[i] * np.exp(1j * ai)
-
-                                # leaving out reference set 'iref'
-
-                                for i in range(iref + 1, K):
-                                    ki = np.rint((arg0 * v[d, i] - p[i]) / PI2)  # fringe order of i-th set
-                                    ai = (ki * PI2 + p[i]) / v[d, i]
-                                    zi += w[i] * np.exp(1j * ai)
-
-                                r = np.abs(zi)
+                        # spatial phase unwrapping (to be done in a later step)
+                        xr = p[0] - PI2 / l[d, 0] * x0
+                        # xi = np.clip(xi, 0, R[d])  # todo: clip
+
+                        if fill_res:
+                            # attention: residuals are to be received from SPU
+                            pass  # todo
+                else:
+                    # generalized temporal phase unwrapping
+
+                    # weights of phase measurements
+                    wsum = precision(0)
+                    for i in range(K):
+                        w[i] = w0[d, i] * b[i] ** 2  # weights for inverse variance weighting
+                        wsum += w[i]
+                    for i in range(K):
+                        w[i] /= wsum  # normalize weights
+
+                    # criterion for when correct solution is found,
+                    # which is when the phasor is large enough
+                    # i.e. the circular variance is small enough:
+                    # 'rmin' is derived from the noise model such that no wrong candidate can reach it,
+                    # cf. `util.threshold()`
+                    nu += 1
+
+                    # maximal phasor length: initialize with minimal value
+                    rmax = precision(0)
+                    zrmax = zimax = precision(0)  # phasor with maximal length
+
+                    found = False  # flag indicating whether the fringe orders have been determined
+
+                    if crtd[d]:
+                        # apply Chinese Remainder Theorem (CRT), time complexity O(K):
+                        # the residues 'q' of the coordinate in units of 'g' modulo 'm' share their fractional part,
+                        # so it is averaged (weighted circular mean) to suppress random errors
+                        # and the integer parts are solved for by the CRT
+                        zr = zi = precision(0)
+                        for i in range(K):
+                            q[i] = p[i] / PI2 * precision(m[d, i])
+                            zr += w[i] * np.cos(PI2 * (q[i] - np.floor(q[i])))
+                            zi += w[i] * np.sin(PI2 * (q[i] - np.floor(q[i])))
+                        fm = np.arctan2(zi, zr) / PI2 % precision(1)  # mean fractional part
+
+                        # the validity of the solution depends on the correct rounding of the integer parts,
+                        # i.e. the measurement noise shouldn't cause any residue to cross an integer boundary:
+                        # their deviations must be small and the resulting congruences consistent
+                        dmax = precision(0)  # maximal deviation of the residues from their integer parts
+                        found = True
+                        r_ = np.int64(0)  # solution of the congruences solved so far
+                        for i in range(K):
+                            qi = np.rint(q[i] - fm)  # integer part
+                            dmax = max(dmax, abs(q[i] - fm - qi))
+                            diff = np.int64(qi) % m[d, i] - r_
+                            if diff % cg[d, i] != 0:
+                                found = False  # inconsistent congruences
+                                break
+                            r_ += cM[d, i] * (diff // cg[d, i] * cinv[d, i] % (m[d, i] // cg[d, i]))
+
+                        if found and dmax < CRTTOL:
+                            # phasor of the fringe orders which are derived from the solution
+                            arg = PI2 * (precision(r_) + fm) * precision(cg_[d] / L)  # angle of the solution
+                            zr = zi = precision(0)
+                            for i in range(K):
+                                ki = np.rint((arg * vf[d, i] - p[i]) / PI2)  # fringe order of i-th set
+                                ai = (ki * PI2 + p[i]) / vf[d, i]
+                                zr += w[i] * np.cos(ai)
+                                zi += w[i] * np.sin(ai)
+
+                            rmax = np.sqrt(zr**2 + zi**2)
+                            zrmax = zr
+                            zimax = zi
+                            npx += 1
+                        else:
+                            found = False  # fall back to search
+
+                    # fringe order of the reference set to start from:
+                    # the one of the prior registration or else the one of the previous pixel (in raster order)
+                    ks = -1
+                    if use_prior and prior[do, y, x, c] >= 0:
+                        ks = prior[do, y, x, c]
+                    elif warm:
+                        ks = kp[c]
+
+                    if not found and ks >= 0 and rmin[d] < 1:  # else they could never be accepted
+                        # try the fringe order to start from and its neighbors first,
+                        # since the prior resp. neighboring pixels usually share the same or adjacent fringe orders;
+                        # accept them only if the phasor proves them to be correct, else fall back to the search
+                        for k in range(3):
+                            k0 = ks + (k + 1) // 2 * (-1 if k % 2 else 1)  # ks, ks - 1, ks + 1
+                            if 0 <= k0 < vmax[d, iref]:
+                                zr, zi = _phasor(precision(k0), p, w, vf[d], iref, PI2)
+                                r = np.sqrt(zr**2 + zi**2)
+                                npx += 1
                                 if r >= rmax:
                                     rmax = r
-                                    z = zi
-
-                        #             if r > rmin:
-                        #                 xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0
-                        #                 if np.round(xi) == x:
-                        #                     aa02_der_corr += 1
-                        #                 break  # optimal solution found, stop loop
-                        #
-                        #         if r < rmin and i0 != np.argmax(w):
-                        #             aa03_der_tried += 1
-                        #
-                        #             # derive fringe orders from the reference set,
-                        #             # i.e. the one with the most precise phases
-                        #             # max. time complexity O(ceil(vmax[d]))
-                        #
-                        #             i0 = np.argmax(w)
-                        #
-                        #             for k0 in kout[d, i0, : vmax[d, i0]]:  # fringe orders of set 'i0'
-                        #                 arg0 = (k0 * PI2 + p[i0]) / v[d, i0]  # reference angle
-                        #                 zi = w[i0] * np.exp(1j * arg0)
-                        #
-                        #                 for i in range(i0):
-                        #                     ki = np.rint((arg0 * v[d, i] - p[i]) / PI2)  # fringe order of i-th set
-                        #                     ai = (ki * PI2 + p[i]) / v[d, i]
-                        #                     zi += w[i] * np.exp(1j * ai)
-                        #
-                        #                 # leaving out reference set 'i0'
-                        #
-                        #                 for i in range(i0 + 1, K):
-                        #                     ki = np.rint((arg0 * v[d, i] - p[i]) / PI2)  # fringe order of i-th set
-                        #                     ai = (ki * PI2 + p[i]) / v[d, i]
-                        #                     zi += w[i] * np.exp(1j * ai)
-                        #
-                        #                 r = np.abs(zi)
-                        #
-                        #                 if r >= rmax:
-                        #                     rmax = r
-                        #                     z = zi
-                        #
-                        #                     if r > rmin:
-                        #                         xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0
-                        #                         if np.round(xi) == x:
-                        #                             aa03_der_corr += 1
-                        #                         break  # optimal solution found, stop loop
-                        #
-                        #             if r < rmin:
-                        #                 aa04_nei_tried += 1
-                        #
-                        #                 # try natching fringe order combinations
-                        #                 # max. time complexity O(ceil(R[d] / gcd[d]))
-                        #
-                        #                 for k in Kp[d]:
-                        #                     arg = (k * PI2 + p) / v[d]
-                        #                     zm = np.sum(w * np.exp(1j * arg))
-                        #                     r = np.abs(zm)
-                        #
-                        #                     if r >= rmax:
-                        #                         rmax = r
-                        #                         z = zm
-                        #
-                        #                         if r > rmin:
-                        #                             xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0
-                        #                             if np.round(xi) == x:
-                        #                                 aa04_nei_corr += 1
-                        #                             break  # optimal solution found, stop loop
-                        #
-                        #                 if r < rmin:
-                        #                     aa05_nei_tried += 1
-                        #
-                        #                     # try neighbors of matching fringe order combinations to account for noise
-                        #                     # max. time complexity O(ceil(R[d] / gcd[d]) * K * 2 - ceil(R[d] / gcd[d]))
-                        #
-                        #                     for k in Kn[d]:
-                        #                         arg = (k * PI2 + p) / v[d]
-                        #                         zn = np.sum(w * np.exp(1j * arg))
-                        #                         r = np.abs(zn)
-                        #
-                        #                         if r >= rmax:
-                        #                             rmax = r
-                        #                             z = zn
-                        #
-                        #                             if r > rmin:
-                        #                                 xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0
-                        #                                 if np.round(xi) == x:
-                        #                                     aa05_nei_corr += 1
-                        #                                 break  # optimal solution found, stop loop
-                        #
-                        #                     if r < rmin:
-                        #                         aa06_exh_tried += 1
-                        #
-                        #                         # exhaustive search (without matching and their neighborng fringe order combinations)
-                        #                         # max. time complexity O(prod(v[d] - ceil(R[d] / gcd[d]) * K * 2 - ceil(R[d] / gcd[d]))
-                        #
-                        #                         for k in Ka[d]:
-                        #                             arg = (k * PI2 + p) / v[d]
-                        #                             ze = np.sum(w * np.exp(1j * arg))
-                        #                             r = np.abs(ze)
-                        #
-                        #                             if r >= rmax:
-                        #                                 rmax = r
-                        #                                 z = ze
-                        #
-                        #                                 if r > rmin:
-                        #                                     break  # optimal solution found, stop loop
-                        #
-                        #                         xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0
-                        #                         if np.round(xi) == x:
-                        #                             aa06_exh_corr += 1
-                        #
-                        # if np.round(xi) == x:
-                        #     aa0_all_corr += 1
-                        # else:
-                        #     false.append(x)
-
-                        xi = np.arctan2(z.imag, z.real) % PI2 / PI2 * L - x0  # change codomain from [-PI, PI] to [0, L)
-                        # xi = np.angle(z) % PI2 / PI2 * L - x0  # change codomain from [-PI, PI] to [0, L)
-                        # xi = np.clip(xi, 0, R[d])  # todo: clip
+                                    zrmax = zr
+                                    zimax = zi
+
+                                    if r > rmin[d]:
+                                        break  # optimal solution found, stop loop
+
+                        found = rmax > rmin[d]
+
+                    if not found:
+                        # derive fringe orders from the reference set,
+                        # i.e. the one with the least number of periods
+                        # max. time complexity O(ceil(vmin)),
+                        # resp. O(1) if the candidates are looked up from the quantized phases
+                        bi = np.int_(p[iref] / PI2 * Q) % Q if use_lut else 0
+                        bj = np.int_(p[pair[d]] / PI2 * Q) % Q if use_lut else 0
+                        nl = max(count[d, bi, bj], 0) if use_lut else 0  # number of looked up candidates
+
+                        for k in range(nl + vmax[d, iref]):
+                            if k == nl and nl > 0 and rmax > rlut[d]:
+                                # the best looked up candidate proves to be correct within the noise bound;
+                                # else, it may have been missed, so fall back to searching all candidates
+                                break
+                            k0 = lut[d, bi, bj, k] if k < nl else kout[d, iref, k - nl]  # fringe order of set 'iref'
+                            zr, zi = _phasor(precision(k0), p, w, vf[d], iref, PI2)
+                            r = np.sqrt(zr**2 + zi**2)
+                            npx += 1
+                            if r >= rmax:
+                                rmax = r
+                                zrmax = zr
+                                zimax = zi
+
+                                if r > rmin[d]:
+                                    break  # optimal solution found, stop loop
+
+                    xi = np.arctan2(zimax, zrmax) % PI2 / PI2 * L - x0  # change codomain from [-PI, PI] to [0, L)
+                    # xi = np.clip(xi, 0, R[d])  # todo: clip
+
+                    xr = xi
+
+                    if warm:  # fringe order of the reference set
+                        arg = np.arctan2(zimax, zrmax) % PI2
+                        kp[c] = np.int_(np.rint((arg * vf[d, iref] - p[iref]) / PI2)) % max(1, vmax[d, iref])
+
+                    if fill_res:
+                        # circular standard deviation; rounding errors may push `rmax` slightly beyond one
+                        res[do, y, x, c] = np.sqrt(-2 * np.log(min(rmax, precision(1))))
+
+                xr = np.float64(np.float32(xr))  # as stored in 'reg'
+
+                if fill_reg:
+                    reg[do, y, x, c] = xr
+
+                if fill_regq:  # fixed point
+                    xq = min(max(np.rint(xr * scale), 0.0), qmax - 1) if valid else qmax
+                    if regq16.size > 0:
+                        regq16[do, y, x, c] = np.uint16(xq)
+                    else:
+                        regq32[do, y, x, c] = np.uint32(xq)
+
+                if fill_fid or fill_fidi:  # fringe orders of the registration
+                    for i in range(K):
+                        kf = np.int_(np.floor(xr / l[d, i])) if valid else -1
+                        if fill_fid:
+                            fid[do * K + i, y, x, c] = kf
+                        if fill_fidi:
+                            if fid8.size > 0:
+                                fid8[do * K + i, y, x, c] = kf if valid else FID8MAX
+                            else:
+                                fid16[do * K + i, y, x, c] = kf
+
+                ne += npx
+                if instrument:
+                    cs += _cycles() - c1
+                    hist[j, min(npx, H - 1)] += 1
+
+        stats[j, 0] = ne
+        stats[j, 1] = nu
+        stats[j, 2] = ns
+        stats[j, 3] = ct
+        stats[j, 4] = cs
+
+
+# `decode()` and `_remap()` are compiled on demand, i.e. for each signature at their first call (or by `warmup()`),
+# and the compiled code is cached on disk;
+# hence importing the package doesn't compile anything, and after the first call, the compiled code is loaded
+_kernels = {}  # compiled functions for each signature
+_options = dict(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
+
+
+def _compile(func: callable, signature: nb.core.typing.templates.Signature) -> nb.core.registry.CPUDispatcher:
+    """Compiled `func` for the explicit `signature`.
+
+    It is compiled at the first request, resp. loaded from the on-disk cache if it has been compiled before.
+    Arguments of other types raise a `TypeError` instead of being compiled implicitly.
+    """
+
+    key = (func, signature)
+    if key not in _kernels:
+        dispatcher = nb.jit(**_options)(func)  # lazy, i.e. nothing is compiled yet
+        cache = dispatcher._cache  # the index of the on-disk cache is empty if the source file has changed since
+        if cache._index_key(signature, dispatcher.targetctx.codegen()) not in cache._cache_file._load_index():
+            logger.warning(
+                f"The '{func.__name__}()'-function has not been compiled for this data type yet. "
+                "This may take a few minutes (the time depends on your CPU and energy settings)."
+            )
+        dispatcher.compile(signature)
+        dispatcher.disable_compile()
+        _kernels[key] = dispatcher
+
+    return _kernels[key]
+
+
+def kernel(dtype: np.dtype, precision: np.dtype) -> nb.core.registry.CPUDispatcher:
+    """Compiled `decode()` for fringe pattern sequences of type `dtype` which are decoded with `precision`."""
+    return _compile(decode, _signature(nb.from_dtype(np.dtype(dtype)), nb.from_dtype(np.dtype(precision))))
+
+
+def remap_kernel(dtype: np.dtype) -> nb.core.registry.CPUDispatcher:
+    """Compiled `_remap()` for modulations of type `dtype`."""
+    signature = nb.float32[:, :, :](
+        nb.float32[:, :, :], nb.float32[:, :, :, :], nb.from_dtype(np.dtype(dtype))[:, :, :]
+    )
+    return _compile(_remap, signature)
+
+
+def warmup() -> None:
+    """Compile `decode()` for all supported data types and precisions and `_remap()` for all data types
+    (resp. load them from the on-disk cache),
+    so that even the first call of `Fringes.decode()` resp. `Fringes.remap()` runs at steady-state speed."""
+
+    for dtype in _dtypes:
+        for precision in _precisions:
+            kernel(np.dtype(dtype.name), np.dtype(precision.name))
+        remap_kernel(np.dtype(dtype.name))
+
+
+@nb.jit(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
+def _remap_legacy(
+    reg: np.ndarray,
+    mod: np.ndarray = np.ones(1),
+    scale: float = 1,
+    Y: int = 0,
+    X: int = 0,
+    C: int = 0,
+) -> np.ndarray:
+    if mod.ndim > 1:
+        assert reg.shape[1:] == mod.shape[1:]
+
+    if reg.shape[0] == 1:
+        # mod = np.vstack(mod, np.zeros_like(mod))
+        reg = np.vstack((reg, np.zeros_like(reg)))  # todo: axis
+
+    if X is None:
+        X = 0
+
+    if Y is None:
+        Y = 0
+
+    X = int(X)
+    Y = int(Y)
+
+    if scale <= 0:
+        scale = 1
+
+    if Y <= 0:
+        Y = max(1, int(np.nanmax(reg[1]) * scale + 0.5))
+    else:
+        Y = int(Y * scale + 0.5)
+
+    if X <= 0:
+        X = max(1, int(np.nanmax(reg[0]) * scale + 0.5))
+    else:
+        X = int(X * scale + 0.5)
+
+    if C not in [1, 3, 4]:
+        if reg.shape[-1] in [3, 4]:
+            C = reg.shape[-1]
+        else:
+            C = 1
+            # reg = reg.reshape([s for s in reg.shape] + [C])  # todo: how to get reg[..., 1] if C-axis doesn't exist?
+
+    src = np.zeros((Y, X, C), np.float32)
+
+    Xc = reg.shape[2]
+    Yc = reg.shape[1]
+    DK = mod.shape[0]
+    for xc in nb.prange(Xc):
+        for yc in nb.prange(Yc):
+            for c in nb.prange(C):
+                if not np.isnan(reg[0, yc, xc, c]):
+                    xs = int(reg[0, yc, xc, c] * scale + 0.5)  # i.e. rint()
+                    if xs < X:
+                        if not np.isnan(reg[1, yc, xc, c]):
+                            ys = int(reg[1, yc, xc, c] * scale + 0.5)  # i.e. rint()
+                            if ys < Y:
+                                for dk in nb.prange(DK):
+                                    if mod.ndim > 1:
+                                        m = mod[dk, yc, xc, c]
+                                        if not np.isnan(m):
+                                            src[ys, xs, c] += m
+                                    else:
+                                        src[ys, xs, c] += 1
+
+    mx = src.max()
+    if mx > 0:
+        src /= mx
+
+    return src
+
+
+def _remap(
+    src: np.ndarray,
+    reg: np.ndarray,
+    mod: np.ndarray = np.ones(1),
+) -> np.ndarray:
+    """Accumulate the modulation `mod` of each camera pixel at the source pixel
+    which its registration `reg` points to, into `src`; compiled by `remap_kernel()`."""
+    Ys, Xs, Cs = src.shape
+    Yc, Xc, Cc = reg.shape[1:]
 
-                        reg[d, y, x, c] = xi
+    for xc in nb.prange(Xc):
+        for yc in nb.prange(Yc):
+            for c in nb.prange(Cs):
+                if not np.isnan(reg[0, yc, xc, c]):
+                    xs = int(reg[0, yc, xc, c] + 0.5)  # i.e. rint()
 
-                        if verbose:
-                            res[d, y, x, c] = np.sqrt(-2 * np.log(r.item()))  # circular standard deviation
+                    if xs < Xs:
+                        if not np.isnan(reg[1, yc, xc, c]):
+                            ys = int(reg[1, yc, xc, c] + 0.5)  # i.e. rint()
 
-    return bri, mod.reshape(-1, Y, X, C), phi.reshape(-1, Y, X, C), reg, res
+                            if ys < Ys:
+                                if not np.isnan(mod[yc, xc, c]):
+                                    m = mod[yc, xc, c]
+                                    src[ys, xs, c] += m
+    return src
@@ -1,9 +1,13 @@
 import logging
 import os
+import importlib.util
+import glob
 import itertools as it
 from collections import namedtuple
 import time
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import scipy as sp
@@ -13,9 +17,9 @@ import cv2
 import toml
 import yaml
 
-from .util import vshape, bilateral, _remap
-from . import grid
-from .decoder import decode
+from .util import vshape, bilateral, tiles, candidates, threshold
+from . import grid, gemm, archive
+from .stream import Decoder, LineDecoder
 
 logger = logging.getLogger(__name__)
 
@@ -82,18 +86,25 @@ class Fringes:
         ".toml": toml.load,
     }
 
-    _verbose_output = (
+    _verbose_output = (  # in the order in which they are returned by 'decode()'
         "brightness",
         "modulation",
         "registration",
-        "phase",
-        "order",
         "residuals",
         "uncertainty",
-        "exposure",
+        "phase",
+        "orders",
         "visibility",
+        "exposure",
     )
 
+    _compact = {  # data types of the outputs which 'decode()' can write, the first one being the default
+        "registration": ("float32", "uint16", "uint32"),
+        "modulation": ("float32", "float16"),
+        "orders": (np.dtype(np.int_).name, "int16", "uint8"),
+        "visibility": ("float32", "float16"),
+    }
+
     # default values are defined here; take care to only use immutable types!
     def __init__(
         self,
@@ -146,6 +157,7 @@ class Fringes:
 
         # set default values
         self._UMR = None  # used for caching
+        self._LUT = self._RMIN = None  # used for caching
         for k, v in self.defaults.items():
             if k not in "HMTlAB":  # these properties are inferred from others
                 setattr(self, f"_{k}", v)  # define private variables from where the properties get their value from
@@ -404,6 +416,9 @@ class Fringes:
         -------
         I : np.ndarray
             Deinterlaced fringe pattern sequence.
+            This is a view on `I`, i.e. no data is copied.
+            As the frames of each line are stored next to each other,
+            the method `decode()` can transpose it into pixel-major tiles at low cost.
 
         Raises
         ------
@@ -564,20 +579,44 @@ class Fringes:
         return I.reshape(-1, Y, X, 1)
 
     def _demodulate(
-        self, I: np.ndarray, verbose: bool = False, func: str = "ski"
+        self,
+        I: np.ndarray,
+        outputs: tuple | set = ("brightness", "modulation", "registration"),
+        func: str = "ski",
+        threads: int = 0,
+        chunk: int = 64,
+        precision: str = "float64",
+        out: dict = None,
+        mask: np.ndarray = None,
+        closedform: bool = True,
+        integer: bool = True,
+        crt: bool = False,
+        lut: bool = False,
+        rmin: float | str = 1.0,
+        warm: bool = False,
+        prior: np.ndarray = None,
+        statistics: dict = None,
+        derived: dict = None,
+        dtypes: dict = None,
+        scale: float = 1.0,
+        backend: str = "numba",
+        summed: np.dtype = None,
     ) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
         """Decode base fringe patterns by spatio-temporal demodulation.
 
         Parameters
         ----------
-        I : np.ndarray
+        I : np.ndarray or list
             Fringe pattern sequence.
             It is reshaped to videoshape (frames `T`, height `Y`, width `X`, color channels `C`) before processing.
+            A batch of sequences, i.e. an array with a leading batch axis (`B`, `T`, `Y`, `X`, `C`)
+            or a list of arrays of possibly different heights and widths, is decoded in one parallel region;
+            then the outputs have a leading batch axis as well and are padded to the largest height and width.
 
-        verbose : bool, optional
-            If this or the argument `verbose` of the Fringes instance is set to True,
-            additional infomation is computed and retuned.
-            This includes: phase maps, residuals, fringe orders, visibility and relative exposure.
+        outputs : tuple or set, optional
+            Outputs to be computed, out of 'brightness', 'modulation', 'registration', 'phase' and 'residuals'.
+            Only these are allocated and filled; the others are returned as None.
+            The default is ('brightness', 'modulation', 'registration').
 
         func : str, optional
             Unwrapping function to use. The default is 'ski'.
@@ -586,6 +625,79 @@ class Fringes:
 
             - else: `OpenCV https://docs.opencv.org/4.7.0/df/d3a/group__phase__unwrapping.html>`_
 
+        threads : int, optional
+            Number of threads used for decoding.
+            The default is zero, i.e. the number of threads as set in Numba (which are all available CPU cores).
+
+        chunk : int, optional
+            Number of pixels of a row which make up one work item of the parallel decoding.
+            The default is 64.
+
+        precision : str, optional
+            Floating point type in which the decoding is computed: 'float32' or 'float64'.
+            The default is 'float64'.
+
+        out : dict, optional
+            Arrays to write the outputs into, with the names of the outputs as keys.
+            Arrays which are missing or whose shape or dtype don't match are allocated anew.
+
+        mask : np.ndarray or list, optional
+            Boolean array in shape (`Y`, `X`) of the pixels to decode; the others are set to NaN.
+            For a batch, it is either shared by all sequences or a list with one mask (or None) per sequence.
+            The Fourier-transform method ('uwr' == 'FTM') always decodes all pixels.
+            The default is None, i.e. all pixels are decoded.
+
+        closedform : bool, optional
+            If this is set to True (the default), sets with 3 or 4 shifts are demodulated
+            with the classic closed-form phase shifting formulas instead of the generic complex filter.
+
+        integer : bool, optional
+            If this is set to True (the default), integer-valued fringe pattern sequences (i.e. `uint8` or `uint16`)
+            are accumulated in the integer domain and converted to floating point once per pixel.
+
+        crt : bool, optional
+            Flag for determining the fringe orders with the Chinese Remainder Theorem. The default is False.
+
+        lut : bool, optional
+            Flag for looking up the candidate fringe orders from the quantized phases. The default is False.
+            If none of them proves to be correct (cf. `rmin`), all candidates are searched for.
+
+        rmin : float or str, optional
+            Minimal phasor length at which the search for the fringe orders stops early;
+            if it is 'auto', it is derived from the noise model. The default is 1.0, i.e. no early termination.
+
+        warm : bool, optional
+            Flag for starting the search for the fringe orders at the ones of the previous pixel. The default is False.
+
+        prior : np.ndarray or list, optional
+            Prior registration in shape (`D`, `Y`, `X`, `C`) at whose fringe orders the search starts,
+            resp. one per sequence of a batch. The default is None.
+
+        statistics : dict, optional
+            If given, the decoding is instrumented and the statistics are written into it, cf. `decode()`.
+
+        derived : dict, optional
+            If given, the outputs derived from the demodulation which are in `outputs`,
+            i.e. 'uncertainty', 'orders', 'visibility' and 'exposure', are computed in the same pass
+            and written into it (orders require 'registration' to be in `outputs` as well).
+            The Fourier-transform method ('uwr' == 'FTM') leaves it empty.
+
+        dtypes : dict, optional
+            Data types of the outputs, with the names of the outputs as keys, cf. `decode()`.
+            The default is None, i.e. all outputs are of their default type.
+
+        scale : float, optional
+            Subpixel scale of fixed point registration, i.e. its units per pixel. The default is 1.0.
+
+        backend : str, optional
+            Implementation of the decoder: 'numba' (the default) for the compiled one in `decoder`
+            or 'numpy' for the one in `gemm`, which doesn't compile anything.
+
+        summed : np.dtype, optional
+            If given, `I` doesn't contain the frames but their filtered sums (cf. `gemm.decode()`),
+            and this is the data type of the frames; they are decoded with the 'numpy' backend.
+            The default is None, i.e. `I` contains the frames.
+
         Returns
         -------
         brightness : np.ndarray
@@ -611,8 +723,32 @@ class Fringes:
         t0 = time.perf_counter()
 
         # parse
-        T, Y, X, C = vshape(I).shape  # extract Y, X, C from data as these parameters depend on used camera
-        I = I.reshape((T, Y, X, C))
+        batch = isinstance(I, (list, tuple)) or I.ndim == 5  # several sequences, e.g. of multiple cameras
+        if batch:
+            assert self.uwr != "FTM", "Batches aren't supported by the Fourier-transform method."
+            B = len(I)
+            shapes = [vshape(Ib).shape for Ib in I]
+            T, C = shapes[0][0], shapes[0][3]
+            assert all(shp[0] == T and shp[3] == C for shp in shapes), \
+                "Number of frames and color channels of the sequences of a batch must be equal."
+            Y = max(shp[1] for shp in shapes)
+            X = max(shp[2] for shp in shapes)
+            if isinstance(I, np.ndarray):  # frames of all sequences one after another, as a view if possible
+                I = I.reshape((B * T, Y, X, C))
+            else:  # sequences are padded to the largest height and width
+                J = np.empty((B, T, Y, X, C), np.result_type(*I))
+                for b, Ib in enumerate(I):
+                    J[b, :, : shapes[b][1], : shapes[b][2]] = Ib.reshape(shapes[b])
+                I = J.reshape((B * T, Y, X, C))
+            sizes = [shp[1:3] for shp in shapes]
+            masks = list(mask) if isinstance(mask, (list, tuple)) else [mask] * B
+        else:
+            T, Y, X, C = vshape(I).shape  # extract Y, X, C from data as these parameters depend on used camera
+            I = I.reshape((T, Y, X, C))
+            sizes = [(Y, X)]
+            masks = [mask]
+        lead = (B,) if batch else ()  # leading batch axis of the outputs
+        verbose = "phase" in outputs or "residuals" in outputs
 
         # if self.FDM:
         #    c = np.fft.rfft(I, axis=0) / T  # todo: hfft
@@ -690,7 +826,7 @@ class Fringes:
                     # todo: bri
                     mod[0, ..., c] = np.abs(Jx) * 2  # factor 2 because one sideband is filtered out
                     mod[1, ..., c] = np.abs(Jy) * 2  # factor 2 because one sideband is filtered out
-                    if self.verbose or verbose:
+                    if verbose:
                         phi[0, ..., c] = reg[0, ..., c]
                         phi[1, ..., c] = reg[1, ..., c]
                         res[0, ..., c] = np.log(np.abs(I_FFT))  # J  # todo: hfft
@@ -743,28 +879,223 @@ class Fringes:
                     reg[0, ..., c] = np.angle(J)
                     # todo: bri
                     mod[0, ..., c] = np.abs(J) * 2  # factor 2 because one sideband is filtered out
-                    if self.verbose or verbose:
+                    if verbose:
                         phi[0, ..., c] = reg[0, ..., c]
                         res[0, ..., c] = np.log(np.abs(I_FFT))  # J
                         # todo: I - J
         else:
-            bri, mod, phi, reg, res = decode(
-                I,
-                self._N,
-                self._v,
-                self._f * (-1 if self.reverse else 1),
-                self.R,
-                self.UMR,
-                self.x0,
-                self.p0,
-                self.Vmin,
-                self.verbose or verbose,
-            )
+            dtype = I.dtype if summed is None else np.dtype(summed)  # of the frames
+            Imax = np.iinfo(dtype).max if dtype.kind in "ui" else 1  # for the exposure
+
+            if I.dtype.name not in self._dtypes:  # 'decode()' is compiled for the supported dtypes only
+                I = I.astype(np.float64, copy=False)
+
+            # allocate only the requested outputs (or reuse the ones in 'out'); the others are passed as empty arrays
+            D, K = self.D, self.K
+            dtypes = dtypes or {}
+            empty = np.empty((0, 0, 0, 0), np.float32)
+            bri = self._buffer(out, "brightness", lead + (D, Y, X, C)) if "brightness" in outputs else empty
+            if "modulation" in outputs:
+                mod = self._buffer(out, "modulation", lead + (D * K, Y, X, C), dtypes.get("modulation", np.float32))
+            else:
+                mod = empty
+            phi = self._buffer(out, "phase", lead + (D * K, Y, X, C)) if "phase" in outputs else empty
+            if "registration" in outputs:
+                reg = self._buffer(out, "registration", lead + (D, Y, X, C), dtypes.get("registration", np.float32))
+            else:
+                reg = empty
+            res = self._buffer(out, "residuals", lead + (D, Y, X, C)) if "residuals" in outputs else empty
+
+            # derived outputs
+            fused = set(outputs) if derived is not None else set()
+            unc = self._buffer(out, "uncertainty", lead + (D, Y, X, C)) if "uncertainty" in fused else empty
+            if "visibility" in fused:
+                vis = self._buffer(out, "visibility", lead + (D * K, Y, X, C), dtypes.get("visibility", np.float32))
+            else:
+                vis = empty
+            exp = self._buffer(out, "exposure", lead + (D, Y, X, C)) if "exposure" in fused else empty
+            if "orders" in fused and "registration" in outputs:
+                fid = self._buffer(out, "orders", lead + (D * K, Y, X, C), dtypes.get("orders", np.int_))
+            else:
+                fid = np.empty((0, 0, 0, 0), np.int_)
+
+            if any(m is not None for m in masks) or len(set(sizes)) > 1:
+                for buf in (bri, mod, phi, reg, res, unc, fid, vis, exp):
+                    buf.fill(self._invalid(buf.dtype))  # pixels outside the mask or of the padding aren't decoded
+
+            # noise model, cf. `_verbose_()`
+            quant = 0 if self.dark > 0 else self.quant
+            wu = (self.M * self._N / 2 * (2 * np.pi / self._l) ** 2).astype(np.float64)
+            noise = np.array([self.gain, (self.gain * self.dark) ** 2 + quant**2, self.y0, Imax], np.float64)
+
+            if lut:
+                lut, count, pair = self._candidates
+                rlut = self._rmin  # looked up candidates are only accepted if they prove to be correct
+            else:
+                lut, count, pair = np.empty((0, 0, 0, 0), np.int_), np.empty((0, 0, 0), np.int_), np.empty(0, np.int_)
+                rlut = np.empty(0, np.float64)
+
+            if prior is None:
+                prior = np.empty((0, 0, 0, 0), np.int_)
+            else:
+                if batch and isinstance(prior, np.ndarray):
+                    prior = prior.reshape((B * D, Y, X, C))
+                elif batch:  # priors are padded like the sequences
+                    P = np.full((B, D, Y, X, C), np.nan, np.float32)
+                    for b, Pb in enumerate(prior):
+                        P[b, :, : sizes[b][0], : sizes[b][1]] = Pb
+                    prior = P.reshape((B * D, Y, X, C))
+
+                # fringe orders of the reference sets (the ones with the fewest periods, cf. `decoder.decode()`)
+                # of the prior coordinates; non-finite ones become -1, i.e. the search starts as without a prior
+                # (the compiled decoder can't test for NaN, since it is compiled with 'fastmath')
+                vref = np.tile(np.min(self._v, axis=1), len(prior) // D)[:, None, None, None]
+                with np.errstate(invalid="ignore"):
+                    ks = np.floor((prior + self.x0) / (np.max(self.R) + 2 * self.x0) * vref)
+                prior = np.where(np.isfinite(ks), np.clip(ks, -1, np.max(vref)), -1).astype(np.int_)
+
+            if (warm or prior.size > 0) and rmin != "auto" and rmin >= 1:
+                # the fringe orders to start from could never be accepted, so the decoder doesn't try them first
+                logger.info("Starting the search has no effect unless 'rmin' < 1, so all candidates are evaluated.")
+            rmin = self._rmin if rmin == "auto" else np.full(D, rmin, np.float64)
+            tls = np.concatenate([tiles(*sizes[b], chunk, masks[b], b) for b in range(len(sizes))])
+            stats = np.zeros((D * len(tls), 5), np.int64)  # statistics of each work item
+            if statistics is not None:  # instrumentation: histogram of the number of evaluated candidates per pixel
+                vmax = np.ceil(self._v * ((self.R + 2 * self.x0) / self.L)[:, None]).astype(int)
+                hist = np.zeros((D * len(tls), np.max(vmax) + 4), np.int64)
+            else:
+                hist = np.empty((0, 0), np.int64)
+
+            compiled = backend == "numba" and summed is None
+            if compiled:  # numba is only imported if it is used, since it is an optional dependency
+                import numba as nb
+                from .decoder import kernel, cycles
+
+                threads0 = nb.get_num_threads()
+                if threads > 0:
+                    nb.set_num_threads(min(threads, nb.config.NUMBA_NUM_THREADS))
+
+            instrument = statistics is not None
+            clocked = instrument and compiled  # the cycle counters are only read for the statistics of the kernel
+            c0, t1 = (cycles(), time.perf_counter()) if clocked else (0, 0.0)
+            try:
+                args = (
+                    I,
+                    self._N,
+                    self._v,
+                    self._f * (-1 if self.reverse else 1),
+                    self.R,
+                    self.UMR,
+                    self.x0,
+                    self.p0,
+                    self.Vmin,
+                    self._typed(bri, np.float32),
+                    self._typed(mod, np.float32),
+                    self._typed(phi, np.float32),
+                    self._typed(reg, np.float32),
+                    self._typed(res, np.float32),
+                    (  # verbose, compact and statistics outputs
+                        self._typed(unc, np.float32),
+                        self._typed(fid, np.int_),
+                        self._typed(vis, np.float32),
+                        self._typed(exp, np.float32),
+                        self._typed(reg, np.uint16),
+                        self._typed(reg, np.uint32),
+                        self._typed(mod, np.float16),
+                        self._typed(vis, np.float16),
+                        self._typed(fid, np.uint8),
+                        self._typed(fid, np.int16),
+                        stats,
+                        hist,
+                    ),
+                    tls,
+                    closedform,
+                    integer and I.dtype.kind in "ui",
+                    crt,
+                    lut,
+                    count,
+                    pair,
+                    rlut,
+                    rmin,
+                    warm,
+                    prior,
+                    wu,
+                    noise,
+                    scale,
+                    np.dtype(precision).type,
+                )
+                if compiled:
+                    kernel(I.dtype, precision)(*args)
+                else:
+                    gemm.decode(*args, summed=summed is not None)
+            finally:
+                if compiled:
+                    nb.set_num_threads(threads0)
+            c1, t2 = (cycles(), time.perf_counter()) if clocked else (0, 0.0)
+
+            bri, mod, phi, reg, res = (out if out.size else None for out in (bri, mod, phi, reg, res))
+
+            if derived is not None:
+                for name, buf in (("uncertainty", unc), ("orders", fid), ("visibility", vis), ("exposure", exp)):
+                    if buf.size:
+                        derived[name] = buf
+
+            ne, nu, ns, ct, cs = stats.sum(axis=0)
+            if nu:
+                logger.debug(f"{ne / nu:.2f} candidates evaluated per unwrapped pixel on average.")
+
+            if instrument:
+                freq = (c1 - c0) / (t2 - t1) if c1 > c0 else np.nan  # cycles per second
+                statistics.update(
+                    evaluated=ne / nu if nu else 0.0,
+                    histogram=hist.sum(axis=0),
+                    unwrapped=int(nu),
+                    skipped=int(ns),
+                    temporal=ct / freq,
+                    spatial=cs / freq,
+                )
 
         logger.debug(f"{1000 * (time.perf_counter() - t0)}ms")
 
         return bri, mod, phi, reg, res
 
+    @staticmethod
+    def _buffer(out: dict, name: str, shape: tuple, dtype: type = np.float32) -> np.ndarray:
+        """Return the array `name` of `out` if it can hold an output of `shape` and `dtype`,
+        else allocate a new one."""
+
+        buf = out.get(name) if out else None
+
+        if buf is None or buf.shape != shape or buf.dtype != dtype or not buf.flags.writeable:
+            buf = np.empty(shape, dtype)
+        elif len(shape) == 5 and not buf.flags.c_contiguous:  # the axes of a batch are merged for the decoder
+            buf = np.empty(shape, dtype)
+
+        return buf
+
+    @staticmethod
+    def _typed(buf: np.ndarray, dtype: type) -> np.ndarray:
+        """Return `buf` if it is of type `dtype`, else an empty array of this type, as passed to `decoder.decode()`.
+        The leading batch axis of a batch is merged into the first axis
+        and arrays of type `np.float16` are passed as views of their bits, i.e. as `np.uint16`."""
+
+        if buf.dtype != dtype:
+            buf = np.empty((0, 0, 0, 0), dtype)
+        elif buf.ndim == 5:
+            buf = buf.reshape((-1,) + buf.shape[2:])
+
+        return buf.view(np.uint16) if buf.dtype == np.float16 else buf
+
+    @staticmethod
+    def _invalid(dtype: np.dtype) -> float | int:
+        """Value marking invalid pixels in an output of type `dtype`:
+        NaN for floating point, the maximal value for unsigned and -1 for signed integers."""
+
+        if dtype.kind == "f":
+            return np.nan
+
+        return np.iinfo(dtype).max if dtype.kind == "u" else -1
+
     def _multiplex(self, I: np.ndarray, rint: bool = True) -> np.ndarray:
         """Multiplex fringe patterns.
 
@@ -1230,21 +1561,44 @@ class Fringes:
 
     def decode(
         self,
-        I: np.ndarray,
+        I: np.ndarray | list,
         verbose: bool = False,
         despike: bool = False,
         denoise: bool = False,
+        pixelmajor: bool = False,
+        threads: int = 0,
+        chunk: int = 64,
+        precision: str = "float64",
+        outputs: tuple | set = None,
+        out: namedtuple = None,
+        mask: np.ndarray | list = None,
+        crt: bool = False,
+        lut: bool = False,
+        rmin: float | str = 1.0,
+        warm: bool = False,
+        prior: np.ndarray | list = None,
+        stats: bool = False,
+        dtypes: dict = None,
+        scale: float = None,
+        backend: str = "numba",
     ) -> namedtuple:
         r"""Decode fringe patterns.
 
         Parameters
         ----------
-        I : np.ndarray
+        I : np.ndarray or list
             Fringe pattern sequence.
             It is reshaped to videoshape (frames `T`, height `Y`, width `X`, color channels `C`) before processing.
 
             .. note:: It must have been encoded with the same parameters set to the Fringes instance as the encoded one.
 
+            A batch of sequences, e.g. of several cameras observing the same screen,
+            is given either with a leading batch axis, i.e. in shape (`B`, `T`, `Y`, `X`, `C`),
+            or as a list of sequences whose heights and widths may differ.
+            All of them are decoded in one parallel region, sharing the constants of the configuration,
+            which is faster than decoding them one after another.
+            The Fourier-transform method ('uwr' == 'FTM') doesn't support batches.
+
         verbose : bool, optional
             If this or the argument `verbose` of the Fringes instance is set to True,
             additional infomation is computed and retuned.
@@ -1258,6 +1612,141 @@ class Fringes:
             If this is set to True, the unwrapped phase map is smoothened
             by a bilateral filter which is edge-preserving.
 
+        pixelmajor: bool, optional
+            If this is set to True, `I` is expected in pixel-major shape
+            (height `Y`, width `X`, frames `T`[, color channels `C`]),
+            i.e. the time series of each pixel is contiguous in memory, which is the fastest layout for decoding.
+            It is transposed to videoshape without copying.
+            Else, frames which are stored one after another are transposed into pixel-major tiles while decoding.
+
+        threads: int, optional
+            Number of threads used for decoding.
+            The default is zero, i.e. the number of threads as set in Numba (which are all available CPU cores).
+
+        chunk: int, optional
+            Number of pixels of a row which make up one work item of the parallel decoding.
+            Directions, rows and chunks are scheduled in row-major order.
+            The default is 64.
+
+        precision: str, optional
+            Floating point type in which the decoding is computed: 'float32' or 'float64'.
+            Single precision halves the memory traffic and doubles the SIMD width,
+            while its precision still exceeds the quantization noise of the fringe pattern sequence.
+            The default is 'float64'.
+
+        outputs: tuple or set, optional
+            Names of the outputs to be computed and returned,
+            out of 'brightness', 'modulation', 'registration', 'residuals',
+            'uncertainty', 'phase', 'orders', 'visibility' and 'exposure'.
+            Only the outputs which are requested or which they are derived from are allocated and computed;
+            e.g. if the registration isn't requested, spatial demodulation is skipped altogether.
+            The default is None, i.e. the first three resp. all of them if `verbose` is True.
+
+        out: namedtuple, optional
+            Result of a previous call, whose arrays are reused to write the outputs into.
+            When decoding the same camera geometry repeatedly,
+            this avoids allocating the large output arrays for every call.
+            Arrays whose shape or dtype don't match (anymore) are allocated anew.
+            For a list of sequences, it isn't used.
+            The default is None, i.e. all outputs are allocated.
+
+        mask: np.ndarray or list, optional
+            Region of the camera frame to decode, either as a boolean array in shape (`Y`, `X`)
+            or as a list of rectangular regions of interest, each given as (x, y, width, height).
+            Temporal demodulation and unwrapping are computed only for the pixels inside it,
+            so the decoding time scales with the covered area; the outputs are NaN outside.
+            For a batch, it applies to all sequences, or it is a list of boolean arrays (or None),
+            one for each sequence.
+            The default is None, i.e. the whole camera frame is decoded.
+
+        crt: bool, optional
+            If this is set to True, temporal phase unwrapping uses the Chinese Remainder Theorem (CRT),
+            which determines the fringe orders in constant time per pixel
+            instead of searching the fringe orders of the set with the fewest periods.
+            It is applicable if all wavelengths `l` of a direction are integers,
+            e.g. as chosen by setting `l` to 'close' or 'small'; else the search is used.
+            Pixels for which the residues are too noisy for a reliable solution fall back to the search.
+            The default is False.
+
+        lut: bool, optional
+            If this is set to True, temporal phase unwrapping tries only a few candidate fringe orders,
+            which are looked up from the quantized phases of the two sets with the fewest periods,
+            instead of all fringe orders of the set with the fewest periods.
+            The bins are widened by the phase uncertainties (cf. `upi`),
+            and the lookup table is computed once per configuration and cached.
+            Pixels whose phases are too noisy to fall into a bin with candidates fall back to the search,
+            as do pixels for which none of the candidates reaches the threshold derived from the noise model
+            (cf. `rmin` = 'auto'), i.e. proves to be correct.
+            The default is False.
+
+        rmin: float or str, optional
+            Minimal phasor length (in the interval [0, 1]) at which the search for the fringe orders stops early,
+            because the current candidate is the correct one.
+            If it is set to 'auto', it is derived from the noise model (cf. `upi`) for each direction
+            such that no wrong candidate can reach it as long as the phase errors are within three standard deviations;
+            this requires the noise parameters `gain`, `dark` and `y0` to match the camera.
+            The average number of evaluated candidates per pixel is logged at the debug level.
+            The default is 1.0, i.e. all candidates are evaluated.
+
+        warm: bool, optional
+            If this is set to True, the pixels of each chunk are unwrapped in raster order
+            and the search for the fringe orders of each pixel starts at the fringe order of the previous one
+            and its two neighbors, since neighboring pixels usually share the same or adjacent fringe orders.
+            They are accepted if the phasor reaches `rmin`, else all fringe orders are tried;
+            hence this has no effect unless `rmin` is less than one, e.g. 'auto'.
+            On smooth surfaces, this reduces the number of evaluated candidates to about one per pixel.
+            The default is False.
+
+        prior: np.ndarray, optional
+            Prior registration, e.g. the registration of the result of a previous call
+            when measuring nearly identical specimens one after another.
+            The search for the fringe orders of each pixel starts at the fringe order of its prior coordinate
+            and its two neighbors, which are accepted if the phasor reaches `rmin`,
+            so only where the prior disagrees, all fringe orders are tried;
+            hence this has no effect unless `rmin` is less than one, e.g. 'auto'.
+            The prior must be in shape (`D`, `Y`, `X`, `C`) and in the coordinates of the fringe patterns,
+            i.e. as returned with `grid` = 'image'. Where it is NaN, the search starts as without a prior.
+            For a batch, there is one prior for each sequence, i.e. with a leading batch axis resp. as a list.
+            The default is None.
+
+        stats: bool, optional
+            If this is set to True, the decoding is instrumented
+            and statistics about its cost are returned alongside the decoded results.
+            The instrumentation is built into the compiled decoder, i.e. it doesn't require recompilation,
+            and costs only a few cycles per pixel.
+            The default is False.
+
+        dtypes: dict, optional
+            Data types of the outputs, with the names of the outputs as keys, for compact encodings
+            which are written directly by the decoder, i.e. without any conversion afterward:
+
+            - 'registration': 'float32' (the default), or 'uint16' resp. 'uint32' for fixed point coordinates
+              in units of 1 / `scale` pixels; the maximal value marks invalid pixels.
+              This requires that the registration isn't post-processed, i.e. no spatial unwrapping,
+              no `despike`, no `denoise` and no rotation by `angle`.
+            - 'modulation' and 'visibility': 'float32' (the default) or 'float16'.
+            - 'orders': 'int64' (the default), 'int16' or 'uint8'; for 'uint8', 255 marks invalid pixels.
+
+            The Fourier-transform method ('uwr' == 'FTM') doesn't support compact encodings.
+            The default is None, i.e. all outputs are of their default type.
+
+        scale: float, optional
+            Subpixel scale of fixed point registration, i.e. its units per pixel.
+            The default is None, i.e. the largest power of two at which the coding range `L` fits into the data type.
+
+        backend: str, optional
+            Implementation of the decoder:
+
+            - 'numba': The compiled decoder, which is parallelized over the pixels (the default).
+              It requires the optional dependency numba; if it isn't installed, the 'numpy' backend is used.
+            - 'numpy': Pure NumPy, i.e. no compilation at all, which suits short-lived processes
+              and platforms on which numba is slow to compile or not available.
+              Temporal demodulation is a matrix multiplication of the frames by the discrete complex filters,
+              which is run multi-threaded by BLAS (so `threads` has no effect),
+              and the fringe orders are derived for many pixels at once.
+              The options `crt`, `lut` and `warm` only accelerate the compiled decoder and are ignored,
+              and the CPU times of the statistics are NaN.
+
         Returns
         -------
         brightness : np.ndarray
@@ -1291,6 +1780,21 @@ class Fringes:
         exposure : np.ndarray, optional
             Local exposure (relative average intensity).
 
+        .. note:: For a batch with a leading batch axis, the outputs have a leading batch axis as well;
+          for a list of sequences, a list with the outputs of each sequence is returned.
+
+        stats : namedtuple, optional
+            Statistics of the decoding (of all sequences of a batch), only returned if `stats` is True:
+
+            - evaluated: Average number of evaluated candidate combinations of fringe orders per unwrapped pixel.
+            - histogram: Number of pixels by their number of evaluated candidates.
+            - unwrapped: Number of unwrapped pixels.
+            - skipped: Number of pixels whose unwrapping has been skipped because `Vmin` isn't reached.
+            - temporal: CPU time spent in temporal demodulation (summed over all threads), in seconds.
+            - spatial: CPU time spent in spatial demodulation (summed over all threads), in seconds.
+
+            The times are measured with the cycle counter of the CPU on x86 and ARM64, else they are NaN.
+
         Raises
         ------
         AssertionError
@@ -1309,50 +1813,777 @@ class Fringes:
 
         t0 = time.perf_counter()
 
-        # get and apply videoshape
-        T, Y, X, C = vshape(I).shape  # extract Y, X, C from data as these parameters depend on the used camera
-        I = I.reshape((T, Y, X, C))
+        listed = isinstance(I, (list, tuple))  # sequences of possibly different shapes
+        batch = listed or np.ndim(I) == 5  # several sequences, e.g. of multiple cameras
+        Is = list(I) if batch else [I]  # for a leading batch axis, the sequences are views of it
+        shapes = []  # height, width and color channels of each sequence
+
+        for b, Ib in enumerate(Is):
+            if pixelmajor:
+                Ib = np.moveaxis(Ib, 2, 0)  # returns a view
+
+            # get and apply videoshape
+            T, Y, X, C = vshape(Ib).shape  # extract Y, X, C from data as these parameters depend on the used camera
+            Ib = Ib.reshape((T, Y, X, C))
+            shapes.append((Y, X, C))
+
+            # subtract dark signal
+            if self.y0 > 0:
+                Ib[Ib >= self.y0] = Ib[Ib >= self.y0] - self.y0
+                Ib[Ib < self.y0] = 0
+
+            # decolorize (fuse hues/colors) [for gray fringes, color fusion is not performed, but extended averaging is]
+            if self.H > 1 or not self._monochrome:
+                Ib = self._decolorize(Ib)
+
+            # demultiplex
+            if self.SDM and 1 not in self.N or self.WDM or self.FDM:
+                # todo: if self.SDM and 1 in self.N: Fourier-transform method
+                Ib = self._demultiplex(Ib)
+
+            Is[b] = Ib
+
+        if not batch:
+            I = Is[0]
+        elif isinstance(I, np.ndarray) and not pixelmajor and all(np.may_share_memory(Ib, I) for Ib in Is):
+            I = I.reshape((len(Is),) + Is[0].shape)  # leading batch axis, as a view
+        else:
+            I = Is  # the decoder pads sequences of different shapes
+
+        dec = self._decode(
+            I,
+            shapes,
+            verbose=verbose,
+            despike=despike,
+            denoise=denoise,
+            threads=threads,
+            chunk=chunk,
+            precision=precision,
+            outputs=outputs,
+            out=out,
+            mask=mask,
+            crt=crt,
+            lut=lut,
+            rmin=rmin,
+            warm=warm,
+            prior=prior,
+            stats=stats,
+            dtypes=dtypes,
+            scale=scale,
+            backend=backend,
+        )
+
+        logger.info(f"{1000 * (time.perf_counter() - t0)}ms")
 
-        # subtract dark signal
-        if self.y0 > 0:
-            I[I >= self.y0] = I[I >= self.y0] - self.y0
-            I[I < self.y0] = 0
+        return dec
+
+    def _decode(
+        self,
+        I: np.ndarray | list,
+        shapes: list,
+        verbose: bool = False,
+        despike: bool = False,
+        denoise: bool = False,
+        threads: int = 0,
+        chunk: int = 64,
+        precision: str = "float64",
+        outputs: tuple | set = None,
+        out: namedtuple = None,
+        mask: np.ndarray | list = None,
+        crt: bool = False,
+        lut: bool = False,
+        rmin: float | str = 1.0,
+        warm: bool = False,
+        prior: np.ndarray | list = None,
+        stats: bool = False,
+        dtypes: dict = None,
+        scale: float = None,
+        backend: str = "numba",
+        summed: np.dtype = None,
+    ) -> namedtuple:
+        """Decode the preprocessed fringe pattern sequence `I`, cf. `decode()`.
 
-        # decolorize (fuse hues/colors) [for gray fringes, color fusion is not performed, but extended averaging is]
-        if self.H > 1 or not self._monochrome:
-            I = self._decolorize(I)
+        `shapes` are the heights, widths and color channels of its sequences.
+        If `summed` is given, `I` contains the filtered sums of the frames of this data type, cf. `_demodulate()`.
+        """
 
-        # demultiplex
-        if self.SDM and 1 not in self.N or self.WDM or self.FDM:
-            # todo: if self.SDM and 1 in self.N: Fourier-transform method
-            I = self._demultiplex(I)
+        listed = isinstance(I, list)  # sequences of possibly different shapes
+        batch = listed or I.ndim == 5  # several sequences, e.g. of multiple cameras
 
         # demodulate
-        bri, mod, phi, reg, res = self._demodulate(I, verbose)
+        assert precision in ("float32", "float64"), "Precision must be either 'float32' or 'float64'."
+        assert backend in ("numba", "numpy"), "Backend must be either 'numba' or 'numpy'."
+        if backend == "numba" and importlib.util.find_spec("numba") is None:  # numba is an optional dependency
+            logger.warning("Numba is not installed, so the 'numpy' backend is used.")
+            backend = "numpy"
+
+        if outputs is None:
+            outputs = self._verbose_output if self.verbose or verbose else self._verbose_output[:3]
+        assert all(o in self._verbose_output for o in outputs), f"Outputs must be out of {self._verbose_output}."
+
+        # outputs of the demodulation which are required
+        derived = any(o in outputs for o in ("uncertainty", "orders", "visibility", "exposure"))
+        required = set(outputs)
+        if derived and self.uwr == "FTM":  # derived outputs are computed from the demodulated ones afterward
+            required |= {"brightness", "modulation", "registration"}
+        elif "orders" in outputs:  # fringe orders are derived from the registration in the same pass
+            required.add("registration")
+        if "residuals" in outputs:
+            required.add("registration")
+
+        out = out._asdict() if isinstance(out, tuple) and hasattr(out, "_asdict") else {}
+
+        # one mask for all sequences, or a list with one for each sequence of a batch
+        each = batch and isinstance(mask, (list, tuple)) and all(m is None or isinstance(m, np.ndarray) for m in mask)
+        masks = list(mask) if each else [mask] * len(shapes)
+        assert len(masks) == len(shapes), "Number of masks doesn't match the number of sequences."
+        for b, (Y, X, C) in enumerate(shapes):
+            if isinstance(masks[b], np.ndarray):
+                masks[b] = masks[b].astype(bool, copy=False)
+            elif masks[b] is not None:  # regions of interest
+                rois = masks[b]
+                masks[b] = np.zeros((Y, X), bool)
+                for x, y, w, h in rois:
+                    masks[b][y : y + h, x : x + w] = True
+            assert masks[b] is None or masks[b].shape == (Y, X), "Shape of mask doesn't match the camera frame."
+        mask = masks if batch else masks[0]
+
+        if prior is not None:
+            priors = list(prior) if batch else [prior]
+            assert len(priors) == len(shapes), "Number of priors doesn't match the number of sequences."
+            for b, (Y, X, C) in enumerate(shapes):
+                priors[b] = np.asarray(priors[b]).astype(np.float32, copy=False)
+                assert priors[b].shape == (self.D, Y, X, C), "Shape of prior doesn't match the registration."
+            prior = priors if batch else priors[0]
+
+        dtypes = {o: np.dtype(t) for o, t in (dtypes or {}).items()}
+        for o, t in dtypes.items():
+            assert t.name in self._compact.get(o, ()), f"Data type of '{o}' must be out of {self._compact.get(o, ())}."
+        if dtypes:
+            assert self.uwr != "FTM", "Compact encodings aren't supported by the Fourier-transform method."
+        if "orders" in dtypes:
+            assert np.max(np.ceil(self._v)) < np.iinfo(dtypes["orders"]).max, "Fringe orders exceed the data type."
+        if "registration" in dtypes and dtypes["registration"].kind == "u":
+            assert not self._ambiguous and not despike and not denoise and (self.D == 1 or self.angle == 0), \
+                "Fixed point registration can't be post-processed."
+            if scale is None:
+                scale = 2.0 ** np.floor(np.log2(np.iinfo(dtypes["registration"]).max / self.L))
+
+        statistics = {} if stats else None
+        fused = {} if derived else None
+        bri, mod, phi, reg, res = self._demodulate(
+            I,
+            required,
+            threads=threads,
+            chunk=chunk,
+            precision=precision,
+            out=out,
+            mask=mask,
+            crt=crt,
+            lut=lut,
+            rmin=rmin,
+            warm=warm,
+            prior=prior,
+            statistics=statistics,
+            derived=fused,
+            dtypes=dtypes,
+            scale=1.0 if scale is None else scale,
+            backend=backend,
+            summed=summed,
+        )
 
         # verbose
-        if self.verbose or verbose:
-            unc, fid, vis, exp = self._verbose_(I, bri, mod, reg)
+        if fused:  # computed by the decoder in the same pass
+            unc, fid, vis, exp = (fused.get(o) for o in ("uncertainty", "orders", "visibility", "exposure"))
+        elif derived:
+            unc, fid, vis, exp = self._verbose_(I, bri, mod, reg, out=out)
+        else:
+            unc = fid = vis = exp = None
+
+        # post-process each sequence, i.e. a view of the (padded) outputs of a batch
+        values = dict(zip(self._verbose_output, (bri, mod, reg, res, unc, phi, fid, vis, exp)))
+        for b, (Y, X, C) in enumerate(shapes):
+            item = [None if v is None else v[b, :, :Y, :X] if batch else v for v in values.values()]
+            regb = self._postprocess(*item, C, despike=despike, denoise=denoise)
+            if not batch:
+                values["registration"] = regb
+            elif regb is not item[2]:  # registration has been replaced
+                item[2][...] = regb
+
+        # create named tuple to return
+        fields = [o for o in self._verbose_output if o in outputs]
+        decoded = namedtuple("decoded", fields)
+        if listed:  # one for each sequence, without padding
+            dec = [decoded(*(values[o][b, :, :Y, :X] for o in fields)) for b, (Y, X, C) in enumerate(shapes)]
+        else:
+            dec = decoded(*(values[o] for o in fields))
+
+        if stats:
+            return dec, namedtuple("statistics", statistics.keys())(**statistics)
+
+        return dec
+
+    def decoder(
+        self,
+        verbose: bool = False,
+        despike: bool = False,
+        denoise: bool = False,
+        precision: str = "float64",
+        outputs: tuple | set = None,
+        mask: np.ndarray | list = None,
+        rmin: float | str = 1.0,
+        prior: np.ndarray = None,
+        stats: bool = False,
+        dtypes: dict = None,
+        scale: float = None,
+    ) -> Decoder:
+        """Streaming decoder, which decodes the fringe pattern sequence while it is acquired.
+
+        Each frame is fed into it with `feed()` as soon as it is available;
+        it is accumulated into the complex phasors of its set and the brightness sums right away,
+        so the memory is independent of the number of frames.
+        After the last frame, `result()` only has to perform the spatial demodulation (i.e. unwrapping)
+        and returns the decoded outputs as `decode()` does;
+        hence the decoding hardly adds any latency to the acquisition.
+        With `reset()`, the decoder can be reused for the next sequence.
+
+        The accumulated sums are decoded with the 'numpy' backend.
+        Color, hue and spatial, wavelength or frequency division multiplexing aren't supported,
+        since they require all frames to be demultiplexed first,
+        and neither is the Fourier-transform method ('uwr' == 'FTM').
+
+        Parameters
+        ----------
+        verbose, despike, denoise, outputs, mask, rmin, prior, stats, dtypes, scale
+            Cf. `decode()`.
+
+        precision: str, optional
+            Floating point type of the accumulators and of the decoding: 'float32' or 'float64'.
+            Single precision halves the memory of the accumulators.
+            The default is 'float64'.
+
+        Returns
+        -------
+        decoder : Decoder
+            Streaming decoder.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> I = f.encode()
+
+        >>> dec = f.decoder()
+        >>> for frame in I:
+        ...     dec.feed(frame)
+        >>> A, B, x = dec.result()
+        """
+
+        assert self.uwr != "FTM", "The Fourier-transform method doesn't support streaming."
+        assert self.H == 1 and self._monochrome, "Colored fringe patterns don't support streaming."
+        assert not (self.SDM and 1 not in self.N or self.WDM or self.FDM), "Multiplexing doesn't support streaming."
+        assert precision in ("float32", "float64"), "Precision must be either 'float32' or 'float64'."
+
+        return Decoder(
+            self,
+            precision=precision,
+            verbose=verbose,
+            despike=despike,
+            denoise=denoise,
+            outputs=outputs,
+            mask=mask,
+            rmin=rmin,
+            prior=prior,
+            stats=stats,
+            dtypes=dtypes,
+            scale=scale,
+        )
+
+    def decode_large(
+        self,
+        I: np.ndarray | str,
+        path: str = None,
+        budget: float = 2**30,
+        shape: tuple = None,
+        dtype: np.dtype | str = None,
+        offset: int = 0,
+        mask: np.ndarray | list = None,
+        prior: np.ndarray = None,
+        **kwargs,
+    ) -> namedtuple:
+        """Decode a fringe pattern sequence which doesn't fit into memory, e.g. a long line-scan recording.
+
+        The sequence is decoded in bands of rows, which are read one after another,
+        such that the memory for the frames of the current band and of the next one stays within `budget`.
+        The next band is read in the background while the current one is decoded,
+        and the outputs are written into memory-mapped files band by band.
+
+        Since each band is decoded on its own, spatial unwrapping (i.e. an ambiguous coding range),
+        `despike` and `denoise` as well as the Fourier-transform method ('uwr' == 'FTM') aren't supported.
+
+        Parameters
+        ----------
+        I : np.ndarray or str
+            Fringe pattern sequence in videoshape (frames `T`, height `Y`, width `X`[, color channels `C`]),
+            e.g. a `np.memmap` (such as the deinterlaced view of a memory-mapped line-scan recording)
+            or any other object with a `shape` and array-like slicing (e.g. a dataset of an HDF5 file).
+            If it is a path, it is either a '.npy' file, which is memory-mapped,
+            or a raw file, whose `shape` and `dtype` must be given.
+
+        path : str, optional
+            Directory into which the outputs are written, each as an '.npy' file named after it.
+            The default is None, i.e. a new temporary directory.
+
+        budget : float, optional
+            Memory for the frames of the bands, in bytes. The default is 2**30, i.e. 1 GiB.
+            The bands consist of at least one row.
+
+        shape : tuple, optional
+            Shape of a raw file.
+
+        dtype : np.dtype or str, optional
+            Data type of a raw file.
+
+        offset : int, optional
+            Offset of the data in a raw file, in bytes. The default is 0.
+
+        mask : np.ndarray or list, optional
+            Region of the camera frame to decode, cf. `decode()`.
+
+        prior : np.ndarray, optional
+            Prior registration, cf. `decode()`; it may be memory-mapped as well.
+
+        **kwargs
+            Further arguments of `decode()`, e.g. `verbose`, `outputs`, `precision` or `backend`.
+
+        Returns
+        -------
+        decoded : namedtuple
+            Outputs as returned by `decode()`, as memory-mapped arrays of the files in `path`.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> I = f.encode()
+        >>> np.save("I.npy", I)
+
+        >>> A, B, x = f.decode_large("I.npy", budget=2**26)
+        """
+
+        assert self.uwr != "FTM", "The Fourier-transform method can't decode bands of rows."
+        assert not self._ambiguous, "Spatial unwrapping can't decode bands of rows."
+        assert not kwargs.get("despike") and not kwargs.get("denoise"), "Filters can't be applied to bands of rows."
+        assert not kwargs.get("stats") and "out" not in kwargs, "Statistics and 'out' aren't supported."
+
+        if isinstance(I, (str, os.PathLike)):
+            if str(I).endswith(".npy"):
+                I = np.load(I, mmap_mode="r")
+            else:
+                assert shape is not None and dtype is not None, "Shape and dtype of raw file must be given."
+                I = np.memmap(I, dtype, "r", offset, shape)
+
+        T, Y, X = I.shape[:3]
+        C = I.shape[3] if len(I.shape) == 4 else 1
+        assert T == self.T, "Number of frames of parameters and data don't match."
+
+        if mask is not None and not isinstance(mask, np.ndarray):  # regions of interest
+            rois = mask
+            mask = np.zeros((Y, X), bool)
+            for x, y, w, h in rois:
+                mask[y : y + h, x : x + w] = True
+
+        # rows per band: the frames of the current and of the next band
+        # (plus their conversion to floating point if the compiled decoder doesn't support their data type)
+        itemsize = np.dtype(I.dtype).itemsize
+        row = T * X * C * (2 * itemsize + (8 if np.dtype(I.dtype).name not in self._dtypes else 0))
+        h = int(min(max(1, budget // row), Y))
+        bands = [(y0, min(y0 + h, Y)) for y0 in range(0, Y, h)]
+
+        def read(y0: int, y1: int) -> np.ndarray:
+            # copy, so the band is read here (in the background) instead of while decoding
+            return np.array(I[:, y0:y1], copy=True).reshape((T, y1 - y0, X, C))
+
+        if path is None:
+            path = tempfile.mkdtemp(prefix="fringes_")
+        os.makedirs(path, exist_ok=True)
+
+        t0 = time.perf_counter()
+        mms = None  # memory-mapped outputs, created with the first band
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(read, *bands[0])
+            for i, (y0, y1) in enumerate(bands):
+                J = future.result()
+                if i + 1 < len(bands):
+                    future = pool.submit(read, *bands[i + 1])  # read-ahead
+
+                views = None if mms is None else type(mms)(*(mm[:, y0:y1] for mm in mms))
+                dec = self.decode(
+                    J,
+                    out=views,
+                    mask=None if mask is None else mask[y0:y1],
+                    prior=None if prior is None else prior[:, y0:y1],
+                    **kwargs,
+                )
+
+                if mms is None:  # outputs are allocated after their shapes and dtypes are known
+                    mms = type(dec)(
+                        *(
+                            np.lib.format.open_memmap(
+                                os.path.join(path, f"{o}.npy"), "w+", a.dtype, (a.shape[0], Y, X, a.shape[3])
+                            )
+                            for o, a in zip(dec._fields, dec)
+                        )
+                    )
+                    views = type(mms)(*(mm[:, y0:y1] for mm in mms))
+
+                for a, view, mm in zip(dec, views, mms):
+                    if not np.shares_memory(a, view):  # not written in place
+                        view[...] = a
+                    mm.flush()
+
+                del J, dec
+
+        logger.info(f"{1000 * (time.perf_counter() - t0)}ms for {len(bands)} bands of {h} rows")
+
+        return mms
+
+    def line_decoder(self, rows: int = 1, mask: np.ndarray = None, **kwargs) -> LineDecoder:
+        """Streaming decoder for line-scan cameras, which decodes the lines while they are acquired.
+
+        The camera captures the `T` frames of each row one line after another while the object moves
+        (cf. `deinterlace()`). The lines are fed into the decoder with `feed()` as they arrive,
+        either one by one or in small blocks; it keeps a buffer of `rows` * `T` lines,
+        and as soon as `rows` rows are complete, they are decoded and their outputs are returned.
+        Hence memory is constant and latency is bounded, so it suits continuously running acquisitions.
+        At the end of an acquisition, `flush()` decodes the remaining complete rows.
+
+        Parameters
+        ----------
+        rows : int, optional
+            Number of rows which are decoded at once. The default is 1, i.e. the smallest latency;
+            larger values amortize the overhead per call of `decode()`.
+
+        mask : np.ndarray, optional
+            Boolean array of length `X` of the columns to decode; the outputs are NaN in the others.
+            The default is None, i.e. all columns are decoded.
+
+        **kwargs
+            Further arguments of `decode()`, e.g. `outputs`, `precision` or `backend`.
+
+        Returns
+        -------
+        decoder : LineDecoder
+            Streaming decoder.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> I = f.encode()
+        >>> lines = I.swapaxes(0, 1).reshape(-1, f.X)  # as captured by a line-scan camera
+
+        >>> dec = f.line_decoder()
+        >>> for line in lines:
+        ...     rows = dec.feed(line)
+        ...     if rows is not None:
+        ...         A, B, x = rows
+        """
+
+        assert self.uwr != "FTM", "The Fourier-transform method can't decode single rows."
+        assert not self._ambiguous, "Spatial unwrapping can't decode single rows."
+        assert not kwargs.get("despike") and not kwargs.get("denoise"), "Filters can't be applied to single rows."
+        assert "out" not in kwargs and "prior" not in kwargs, "'out' and 'prior' aren't supported."
+
+        return LineDecoder(self, rows=rows, mask=mask, **kwargs)
+
+    def load_sequence(
+        self,
+        paths: str | list,
+        pixelmajor: bool = False,
+        workers: int = 0,
+        out: np.ndarray = None,
+    ) -> np.ndarray:
+        """Load a fringe pattern sequence from image files, e.g. PNG or TIFF files, using a thread pool.
+
+        The image files are decoded in parallel (OpenCV releases the GIL while doing so)
+        and each frame is written right into one preallocated array, in the shape and data type `decode()` expects.
+        The throughput is logged in frames per second.
+
+        Parameters
+        ----------
+        paths : str or list
+            Paths of the image files, in the order of the frames.
+            If it is a str, it is either a directory, whose files are loaded in sorted order,
+            or a glob pattern, e.g. 'sequence/*.tif'.
+
+        pixelmajor : bool, optional
+            If this is set to True, the sequence is stored in pixel-major shape
+            (height `Y`, width `X`, frames `T`, color channels `C`), cf. `decode()`.
+            The default is False, i.e. in videoshape (frames `T`, height `Y`, width `X`, color channels `C`).
+
+        workers : int, optional
+            Number of threads which load the image files.
+            The default is zero, i.e. the number of CPU cores.
+
+        out : np.ndarray, optional
+            Array in the shape (cf. `pixelmajor`) and the data type of the sequence, into which it is written,
+            e.g. in order to reuse it for consecutive sequences. The default is None, i.e. a new array is allocated.
+
+        Returns
+        -------
+        I : np.ndarray
+            Fringe pattern sequence.
+            Color images are converted from the BGR order of OpenCV to RGB.
+            Data types which aren't supported by `decode()` (cf. `_dtypes`) are converted to 'float32'.
+
+        Raises
+        ------
+        AssertionError
+            If the number of image files and the attribute `T` of the `Fringes` instance don't match,
+            if a file can't be read, or if the shapes of the images differ.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> I = f.load_sequence("sequence/*.png")
+        """
+
+        t0 = time.perf_counter()
+
+        if isinstance(paths, (str, os.PathLike)):
+            if os.path.isdir(paths):
+                paths = [os.path.join(paths, file) for file in os.listdir(paths)]
+                paths = [path for path in paths if os.path.isfile(path)]
+            else:
+                paths = glob.glob(str(paths))
+            paths = sorted(paths)
+        paths = list(paths)
+        T = len(paths)
+        assert T == self.T, "Number of frames of parameters and data don't match."
+
+        def read(path: str) -> np.ndarray:
+            img = cv2.imread(os.fspath(path), cv2.IMREAD_UNCHANGED)
+            assert img is not None, f"Can't read image file '{path}'."
+            if img.ndim == 3 and img.shape[2] in (3, 4):  # BGR[A] -> RGB[A]
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB if img.shape[2] == 3 else cv2.COLOR_BGRA2RGBA)
+            return img.reshape(img.shape[:2] + (-1,))
+
+        first = read(paths[0])  # determines the shape and the data type of the sequence
+        Y, X, C = first.shape
+        shape = (Y, X, T, C) if pixelmajor else (T, Y, X, C)
+        dtype = first.dtype if first.dtype.name in self._dtypes else np.dtype(np.float32)
+        if out is None:
+            out = np.empty(shape, dtype)
+        assert out.shape == shape and out.dtype == dtype, f"'out' must be of shape {shape} and dtype '{dtype}'."
+
+        def load(t: int, img: np.ndarray = None) -> None:
+            if img is None:
+                img = read(paths[t])
+            assert img.shape == (Y, X, C), f"Shape of image file '{paths[t]}' doesn't match the first one."
+            if pixelmajor:
+                out[:, :, t] = img
+            else:
+                out[t] = img
+
+        workers = workers if workers > 0 else os.cpu_count() or 1
+        load(0, first)
+        if workers == 1:
+            for t in range(1, T):
+                load(t)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(load, t) for t in range(1, T)]:
+                    future.result()  # raise exceptions of the threads
+
+        dt = time.perf_counter() - t0
+        logger.info(f"{1000 * dt}ms, i.e. {T / dt:.1f} frames per second")
+
+        return out
+
+    def decode_files(
+        self,
+        paths: str | list,
+        pixelmajor: bool = False,
+        workers: int = 0,
+        **kwargs,
+    ) -> namedtuple:
+        """Load a fringe pattern sequence from image files (cf. `load_sequence()`) and decode it.
+
+        Parameters
+        ----------
+        paths : str or list
+            Paths of the image files, a directory or a glob pattern, cf. `load_sequence()`.
+
+        pixelmajor : bool, optional
+            If this is set to True, the sequence is loaded and decoded in pixel-major shape.
+            The default is False.
+
+        workers : int, optional
+            Number of threads which load the image files.
+            The default is zero, i.e. the number of CPU cores.
+
+        **kwargs
+            Further arguments of `decode()`.
+
+        Returns
+        -------
+        decoded : namedtuple
+            Outputs as returned by `decode()`.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> A, B, x = f.decode_files("sequence")
+        """
+
+        I = self.load_sequence(paths, pixelmajor=pixelmajor, workers=workers)
+        return self.decode(I, pixelmajor=pixelmajor, **kwargs)
+
+    def save_decoded(
+        self,
+        fname: str,
+        dec: namedtuple,
+        rows: int = 64,
+        compression: str = "zlib",
+        level: int = 6,
+    ) -> None:
+        """Archive the outputs of `decode()` in a chunked, compressed file, with the parameters embedded as metadata.
+
+        Each output is split into chunks of `rows` rows, which are compressed one by one,
+        so a region of interest or a single output can be read later on
+        without reading the whole file, cf. `load_decoded()` and `Archive`.
+
+        Parameters
+        ----------
+        fname : str
+            File name of the archive.
+
+        dec : namedtuple
+            Outputs as returned by `decode()`.
+
+        rows : int, optional
+            Number of rows of each chunk. The default is 64.
+
+        compression : str, optional
+            Compression of the chunks: 'zlib' (the default), 'lzma' or 'none'.
+
+        level : int, optional
+            Compression level, i.e. 0 to 9. The default is 6.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+        >>> dec = f.decode(f.encode(), verbose=True)
+
+        >>> f.save_decoded("decoded.frng", dec)
+        """
+
+        t0 = time.perf_counter()
+
+        archive.write(fname, dec, self.params, rows=rows, compression=compression, level=level)
+
+        logger.info(f"{1000 * (time.perf_counter() - t0)}ms")
+
+    def load_decoded(
+        self,
+        fname: str,
+        outputs: tuple | set = None,
+        roi: tuple = None,
+        params: bool = False,
+    ) -> namedtuple:
+        """Load outputs of `decode()` from an archive file written by `save_decoded()`.
+
+        Only the chunks of the requested outputs which overlap the region of interest are read and decompressed.
+
+        Parameters
+        ----------
+        fname : str
+            File name of the archive.
+
+        outputs : tuple or set, optional
+            Names of the outputs to load. The default is None, i.e. all archived outputs.
+
+        roi : tuple, optional
+            Region of interest (x, y, width, height), in pixels.
+            The default is None, i.e. the whole outputs are loaded.
+
+        params : bool, optional
+            If this is set to True, the parameters of the `Fringes` instance
+            are set to the ones embedded in the archive. The default is False.
+
+        Returns
+        -------
+        decoded : namedtuple
+            Outputs as returned by `decode()`, resp. their region of interest.
+
+        Examples
+        --------
+        >>> import fringes as frng
+        >>> f = frng.Fringes()
+
+        >>> x = f.load_decoded("decoded.frng", outputs={"registration"}, roi=(100, 200, 50, 50)).registration
+        """
+
+        t0 = time.perf_counter()
+
+        arc = archive.Archive(fname)
+        if params:
+            self.params = arc.params
+        dec = arc.load(outputs, roi)
+
+        logger.info(f"{1000 * (time.perf_counter() - t0)}ms")
+
+        return dec
+
+    def _postprocess(
+        self,
+        bri: np.ndarray,
+        mod: np.ndarray,
+        reg: np.ndarray,
+        res: np.ndarray,
+        unc: np.ndarray,
+        phi: np.ndarray,
+        fid: np.ndarray,
+        vis: np.ndarray,
+        exp: np.ndarray,
+        C: int,
+        despike: bool = False,
+        denoise: bool = False,
+    ) -> np.ndarray:
+        """Post-process the decoded outputs of one sequence, cf. `decode()`.
+
+        The outputs are modified in place (the ones which aren't requested are None),
+        only the registration may be replaced by a new array, which is returned.
+        """
 
         # blacken where color value of hue was black
         if self.H > 1 and C == 3:
             idx = np.sum(self.h, axis=0) == 0
             if np.any(idx):  # blacken where color value of hue was black
-                bri[..., idx] = 0
-                mod[..., idx] = 0
-                reg[..., idx] = np.nan
-                if self.verbose:
-                    res[..., idx] = np.nan
-                    unc[..., idx] = np.nan  # self.R / np.sqrt(12)  # todo: circular distribution
-                    phi[..., idx] = np.nan
-                    fid[..., idx] = np.nan
-                    vis[..., idx] = 0
-                    exp[..., idx] = 0
+                for out, val in (
+                    (bri, 0),
+                    (mod, 0),
+                    (reg, None),
+                    (res, None),
+                    (unc, None),  # self.R / np.sqrt(12)  # todo: circular distribution
+                    (phi, None),
+                    (fid, None),
+                    (vis, 0),
+                    (exp, 0),
+                ):
+                    if out is not None:
+                        out[..., idx] = self._invalid(out.dtype) if val is None else val
 
         # spatial unwrapping
-        if self._ambiguous:
+        if reg is None:
+            pass  # registration isn't requested
+        elif self._ambiguous:
             logger.warning("Unwrapping is not spatially independent and only yields a relative phase map.")
-            reg = self._unwrap(reg, bri)  # todo: res if verbose
+            reg = self._unwrap(reg, bri, out=reg)  # todo: res if verbose
         else:  # coordiante retransformation
             # todo: tests
 
@@ -1396,7 +2627,7 @@ class Fringes:
                     reg = np.stack((uu, vv), axis=0)
                     reg = np.stack((ur, vr), axis=0)
 
-        if despike:
+        if despike and reg is not None:
             reg = sp.ndimage.median_filter(reg, size=3, mode="nearest", axes=(1, 2))
             # todo: despike all channels
 
@@ -1413,7 +2644,7 @@ class Fringes:
             #         a = sp.interpolate.interpn(points, values, xi, method="cubic")
             #         reg[d] = sp.interpolate.interpn(points, values, xi, method="cubic")
 
-        if denoise:
+        if denoise and reg is not None:
             # # blurring due to uncertainty and PSF
             # u = self.u if self.indexing == "ij" else self.u[::-1]  # todo: D = 1, i.e. shape of sigma equal to axes?
             # sigma = np.sqrt(u ** 2 + self.PSF ** 2)
@@ -1421,20 +2652,11 @@ class Fringes:
             reg = bilateral(reg, k=3)
             # todo: denoise all channels
 
-        # create named tuple to return
-        if self.verbose or verbose:
-            dec = namedtuple(
-                "decoded",
-                "brightness modulation registration residuals uncertainty phase orders visibility exposure",
-            )(bri, mod, reg, res, unc, phi, fid, vis, exp)
-        else:
-            dec = namedtuple("decoded", "brightness modulation registration")(bri, mod, reg)
-
-        logger.info(f"{1000 * (time.perf_counter() - t0)}ms")
-
-        return dec
+        return reg
 
-    def _verbose_(self, I: np.ndarray, A: np.ndarray, B: np.ndarray, xi: np.ndarray, lessbits: bool = False):
+    def _verbose_(
+        self, I: np.ndarray, A: np.ndarray, B: np.ndarray, xi: np.ndarray, lessbits: bool = False, out: dict = None
+    ):
         """Compute verbose output.
 
         Parameters
@@ -1457,6 +2679,10 @@ class Fringes:
             If 'lessbits' is True, the number of bits is estimated based on the maximal value of 'I'.
             This affects the value of the exposure 'e'.
 
+        out : dict, optional
+            Arrays to write the outputs into, with the names of the outputs as keys.
+            Arrays which are missing or whose shape or dtype don't match are allocated anew.
+
         Returns
         -------
         u : np.ndarray
@@ -1472,34 +2698,45 @@ class Fringes:
             Exposure (relative average intensity).
         """
 
+        D, K = self.D, self.K
         Y, X, C = A.shape[1:]
 
+        # the outputs are computed in place, using 'V' and 'e' as scratch space before they are finally written
+        u = self._buffer(out, "uncertainty", (D, Y, X, C))
+        k = self._buffer(out, "orders", (D * K, Y, X, C), int)
+        V = self._buffer(out, "visibility", (D * K, Y, X, C))
+        e = self._buffer(out, "exposure", (D, Y, X, C))
+
         dark = self.gain * self.dark
         quant = 0 if self.dark > 0 else self.quant
-        shot = (
-            np.sqrt(self.gain * np.maximum(0, A - self.y0)) if self.gain != 0 else np.zeros_like(A)
-        )  # average intensity = brightness
-        ui = np.sqrt(dark**2 + quant**2 + shot**2)  # intensity noise
-        upi = (
-            np.sqrt(2)
-            / np.sqrt(self.M)
-            / np.sqrt(self._N[:, :, None, None, None])
-            / B.reshape(self.D, self.K, Y, X, C)
-            * ui[:, None, :, :]
-        )  # local phase uncertainties  # todo: M
-        uxi = upi / (2 * np.pi) * self._l[:, :, None, None, None]  # local positional uncertainties
-        u = np.sqrt(1 / np.sum(1 / uxi**2, axis=1))  # global positional uncertainty
-        u = u.astype(np.float32, copy=False)
-
-        k = xi[:, None, :, :, :] // self._l[:, :, None, None, None]
+        # shot noise squared: gain * average intensity (= brightness)
+        np.subtract(A, self.y0, out=e)
+        np.maximum(e, 0, out=e)
+        e *= self.gain
+        e += dark**2 + quant**2  # intensity noise squared
+
+        # local phase uncertainties: upi = sqrt(2) / sqrt(M) / sqrt(N) / B * ui  # todo: M
+        # local positional uncertainties: uxi = upi / (2 * pi) * l
+        # global positional uncertainty (by inverse variance weighting of uxi): u = sqrt(1 / sum(1 / uxi ** 2))
+        w = self.M * self._N / 2 * (2 * np.pi / self._l) ** 2  # inverse variances of uxi are w * B ** 2 / ui ** 2
+        np.square(B, out=V)
+        V.reshape(D, K, Y, X, C)[...] *= w[:, :, None, None, None]
+        np.sum(V.reshape(D, K, Y, X, C), axis=1, out=u)
+        # pixels without modulation have an infinite uncertainty and those without registration (NaN) no fringe orders
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(e, u, out=u)
+            np.sqrt(u, out=u)
+
+            np.floor_divide(
+                xi[:, None, :, :, :],
+                self._l[:, :, None, None, None],
+                out=k.reshape(D, K, Y, X, C),
+                casting="unsafe",
+            )
         # p = (xi[:, None, :, :, :] / self._l[:, :, None, None, None] - k) * 2 * np.pi - self.p0
-        k = k.astype(int, copy=False).reshape(self.D * self.K, Y, X, C)
-        # p = p.astype(np.float32, copy=False).reshape(self.D * self.K, Y, X, C)
 
-        V = B.reshape(self.D, self.K, Y, X, C) / np.maximum(
-            A[:, None, :, :, :], np.finfo(np.float_).eps
-        )  # avoid division by zero
-        V = V.astype(np.float32, copy=False).reshape(self.D * self.K, Y, X, C)
+        np.maximum(A, np.finfo(np.float_).eps, out=e)  # avoid division by zero
+        np.divide(B.reshape(D, K, Y, X, C), e[:, None, :, :, :], out=V.reshape(D, K, Y, X, C))
 
         if I.dtype.kind in "ui":
             if lessbits and np.iinfo(I.dtype).bits > 8:  # data may contain fewer bits of information
@@ -1509,13 +2746,12 @@ class Fringes:
                 Imax = np.iinfo(I.dtype).max
         else:  # float
             Imax = 1
-        e = A / Imax
-        e = e.astype(np.float32, copy=False)
+        np.divide(A, Imax, out=e)
 
         return u, k, V, e
 
     def _unwrap(
-        self, phi: np.ndarray, B: np.ndarray, func: str = "ski"
+        self, phi: np.ndarray, B: np.ndarray, func: str = "ski", out: np.ndarray = None
     ) -> (np.ndarray, np.ndarray):  # todo: use B for quality guidance
         """Unwrap phase maps spacially.
 
@@ -1538,6 +2774,10 @@ class Fringes:
 
             - else: `OpenCV[2]_ <https://docs.opencv.org/4.7.0/df/d3a/group__phase__unwrapping.html>`_
 
+        out : np.ndarray, optional
+            Array to write the unwrapped phase maps into. It may be `phi` itself.
+            If it is None (the default) or its shape or dtype don't match, a new one is allocated.
+
         Returns
         -------
         unwrapped : np.ndarray
@@ -1573,7 +2813,7 @@ class Fringes:
             # unwrapping_instance = cv2.phase_unwrapping.HistogramPhaseUnwrapping_create(params)
             unwrapping_instance = cv2.phase_unwrapping.HistogramPhaseUnwrapping.create(params)
 
-        reg = np.empty((self.D, Y, X, C), np.float32)
+        reg = self._buffer({"registration": out}, "registration", (self.D, Y, X, C))
         if self.verbose:
             res = np.empty((self.D, Y, X, C), np.float32)
 
@@ -1607,12 +2847,17 @@ class Fringes:
                         res[d, :, :, c] = unwrapping_instance.getInverseReliabilityMap()  # todo: test this
                         # todo: res vs. rel
                 else:  # Scikit-image algorithm is slower but delivers better results on edges
-                    reg[d, :, :, c] = ski.restoration.unwrap_phase(phi[d, :, :, c])
+                    if np.isnan(phi[d, :, :, c]).any():  # e.g. pixels outside a mask
+                        reg[d, :, :, c] = ski.restoration.unwrap_phase(
+                            np.ma.masked_invalid(phi[d, :, :, c])
+                        ).filled(np.nan)
+                    else:
+                        reg[d, :, :, c] = ski.restoration.unwrap_phase(phi[d, :, :, c])
 
                     if self.verbose:
                         res[d, :, :, c] = np.nan
 
-            regmin = np.min(reg[d])
+            regmin = np.nanmin(reg[d])
             if regmin < 0:
                 reg[d] -= regmin
 
@@ -1782,7 +3027,7 @@ class Fringes:
         T, Y, X, C = vshape(xi).shape
 
         # trim Xi
-        xi = xi.reshape((-1, Y, X, C))
+        xi = xi.reshape((-1, Y, X, C)).astype(np.float32, copy=False)  # '_remap()' is compiled for float32 only
         if self.D == 1:
             if self.axis == 0:
                 # xi = np.vstack((xi, np.zeros_like(xi)))
@@ -1824,7 +3069,9 @@ class Fringes:
             #     src[idx[1].ravel(), idx[0].ravel(), c] += B[..., c].ravel()  # ravel() returns a view
             # todo: advanced indexing with nan?
             B[~valid] = 0
-            src = _remap(src, xi, B)  # todo: if u is array -> also increment region around rint pixel
+            from .decoder import remap_kernel  # compiled, i.e. it requires numba
+
+            src = remap_kernel(B.dtype)(src, xi, B)  # todo: if u is array -> also increment region around rint pixel
 
             # blurring due to uncertainty and PSF
             u = self.u if self.indexing == "ij" else self.u[::-1]  # todo: D = 1, i.e. shape of sigma equal to axes?
@@ -2294,6 +3541,7 @@ class Fringes:
             self._Y = _Y
             logger.debug(f"{self._Y = }")
             self._UMR = None
+            self._LUT = self._RMIN = None
 
             if self._X == self._Y == 1:
                 self.D = 1
@@ -2319,6 +3567,7 @@ class Fringes:
             self._X = _X
             logger.debug(f"{self._X = }")
             self._UMR = None
+            self._LUT = self._RMIN = None
 
             if self._X == self._Y == 1:
                 self.D = 1
@@ -2364,6 +3613,7 @@ class Fringes:
             self._alpha = _alpha
             logger.debug(f"{self._alpha = }")
             self._UMR = None
+            self._LUT = self._RMIN = None
 
     @property
     def x0(self) -> float:
@@ -2462,6 +3712,7 @@ class Fringes:
             self._axis = _axis
             logger.debug(f"{self._axis = }")
             self._UMR = None
+            self._LUT = self._RMIN = None
 
     @property
     def _M(self) -> np.ndarray:
@@ -2822,6 +4073,7 @@ class Fringes:
             self._N = _N
             logger.debug(f"self._N = {str(self._N).replace(chr(10), ',')}")
             self._UMR = None
+            self._LUT = self._RMIN = None
             self.D, self.K = self._N.shape
             logger.debug(f"{self.T = }")
 
@@ -2994,6 +4246,7 @@ class Fringes:
                 return
 
         self._UMR = None  # to be safe
+        self._LUT = self._RMIN = None
         _l = np.array(l, float)
         self.v = self.L / np.array(l, float)
 
@@ -3091,6 +4344,7 @@ class Fringes:
             logger.debug(f"self.v = {str(self._v.round(3)).replace(chr(10), ',')}")
             logger.debug(f"self.l = {str(self._l.round(3)).replace(chr(10), ',')}")
             self._UMR = None
+            self._LUT = self._RMIN = None
             self.D, self.K = self._v.shape
             self.f = self._f
 
@@ -3221,6 +4475,7 @@ class Fringes:
             self._indexing = _indexing
             logger.debug(f"{self._indexing = }")
             self._UMR = None
+            self._LUT = self._RMIN = None
 
     @property
     def reverse(self) -> bool:
@@ -3635,6 +4890,27 @@ class Fringes:
 
         return self._UMR
 
+    @property
+    def _candidates(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        """Lookup table of the candidate fringe orders for temporal phase unwrapping, cf. `util.candidates()`."""
+
+        upi = self.upi  # the tolerance of the bins depends on the phase uncertainties
+        if self._LUT is None or not np.array_equal(self._LUT[0], upi):  # cache
+            self._LUT = upi, candidates(self._v, self.R, self.x0, u=upi)
+
+        return self._LUT[1]
+
+    @property
+    def _rmin(self) -> np.ndarray:
+        """Minimal phasor length for each direction at which the search for the fringe orders stops early,
+        cf. `util.threshold()`."""
+        w = self._N * self._v**2 * (self.B * self.MTF(self._v)) ** 2  # nominal weights, as in `decoder.decode()`
+        upi = self.upi
+        if self._RMIN is None or not (np.array_equal(self._RMIN[0], w) and np.array_equal(self._RMIN[1], upi)):  # cache
+            self._RMIN = w, upi, threshold(self._v, w, upi, self.R, self.x0)
+
+        return self._RMIN[2]
+
     @property
     def eta(self) -> float:
         """Coding efficiency."""
@@ -3761,7 +5037,7 @@ class Fringes:
 
     # restrict instance attributes to the ones listed here
     # (commend the next line out to prevent this)
-    __slots__ = tuple("_" + k for k in defaults.keys() if k not in "HMTlAB") + ("logger", "_UMR", "_t")
+    __slots__ = tuple("_" + k for k in defaults.keys() if k not in "HMTlAB") + ("logger", "_UMR", "_LUT", "_RMIN", "_t")
 
     # continuing the class docstring following the NumPy style guide:
     # https://numpydoc.readthedocs.io/en/latest/format.html#class-docstring
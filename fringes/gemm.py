@@ -0,0 +1,354 @@
+import numpy as np
+
+# pure NumPy counterpart of `decoder.decode()`: it doesn't need numba, i.e. there is no compilation at all;
+# temporal demodulation is one matrix multiplication per block of pixels, which BLAS runs multi-threaded,
+# and the fringe orders are derived for all pixels of a block at once
+
+
+def decode(
+    I: np.ndarray,
+    N: np.ndarray,
+    v: np.ndarray,
+    f: np.ndarray,
+    R: np.ndarray,
+    UMR: np.ndarray,
+    x0: float,
+    p0: float,
+    Vmin: float,
+    bri: np.ndarray,
+    mod: np.ndarray,
+    phi: np.ndarray,
+    reg: np.ndarray,
+    res: np.ndarray,
+    buffers: tuple,
+    tiles: np.ndarray,
+    closedform: bool = True,
+    integer: bool = False,
+    crt: bool = False,
+    lut: np.ndarray = None,
+    count: np.ndarray = None,
+    pair: np.ndarray = None,
+    rlut: np.ndarray = None,
+    rmin: np.ndarray = None,
+    warm: bool = False,
+    prior: np.ndarray = None,
+    wu: np.ndarray = None,
+    noise: np.ndarray = None,
+    scale: float = 1.0,
+    precision: type = np.float64,
+    block: int = 65536,
+    summed: bool = False,
+) -> None:
+    """Temporal demodulation and spatial demodulation with NumPy, i.e. without compiling anything.
+
+    It takes the same arguments and fills the same outputs as `decoder.decode()`, cf. there.
+    The frames of a block of pixels are stacked into a matrix in shape (`T`, pixels * `C`),
+    which is multiplied by the matrix of the discrete complex filters of all sets
+    and the sums of the frames of all directions, in shape (`D` + 2 * `D` * `K`, `T`);
+    this matrix multiplication (GEMM) is run multi-threaded by BLAS.
+    Then the candidate fringe orders of the reference set are tried one after another
+    for all pixels of the block at once, and pixels whose phasor reaches `rmin` drop out of the search.
+
+    The arguments `closedform`, `integer`, `crt`, `lut`, `count`, `pair`, `rlut` and `warm` only select
+    faster code paths of the compiled decoder and are ignored, as are the CPU cycles in `stats`.
+    Statistics are accumulated in the first work item of each direction.
+
+    Parameters
+    ----------
+    block : int, default=65536
+        Number of pixels which are demodulated at once; it bounds the memory of the intermediate arrays.
+        Rectangular regions (i.e. whole frames or a rectangular mask) are processed in bands of whole rows.
+
+    summed : bool, default=False
+        If this is set to True, `I` doesn't contain the frames but the filtered sums of them,
+        i.e. the product of the matrix returned by `filters()` and the frames
+        (e.g. accumulated frame by frame while they are acquired),
+        in shape (`B` * (`D` + 2 * `D` * `K`), `Y`, `X`, `C`); then only the spatial demodulation remains.
+    """
+
+    PI2 = 2 * np.pi
+
+    unc, fid, vis, exp, regq16, regq32, modh, vish, fid8, fid16, stats, hist = buffers
+
+    Ts = int(np.sum(N))  # number of frames of each sequence of a batch
+    D, K = N.shape
+
+    L = np.max(R) + 2 * x0  # coding range
+    l = L / v  # lambda i.e. period lengths in [px]
+
+    # requested outputs
+    spatial = reg.size > 0 or regq16.size > 0 or regq32.size > 0
+    regq = regq16 if regq16.size > 0 else regq32
+    qmax = np.float64(np.iinfo(regq.dtype).max)  # marks invalid pixels of fixed point registration
+    fidi = fid8 if fid8.size > 0 else fid16
+
+    # noise model for the uncertainty and exposure
+    gain, var0, y0, Imax = noise
+
+    F = filters(N, f, p0).astype(precision)
+    Nd = np.sum(N, axis=1)  # number of frames of each direction
+    bscale = (2 / N).astype(precision)  # * 2: also add amplitudes of frequencies with opposite sign
+
+    # initial weights of phase averaging are their inverse variances (must be multiplied with b**2 later on)
+    w0 = (N * v**2).astype(precision)
+    vf = v.astype(precision)
+    irefs = np.argmin(v, axis=1)  # reference sets, as in `decoder.decode()`
+    vmax = np.ceil(v * ((R + 2 * x0) / L).reshape((D, 1))).astype(np.int_)
+
+    nt = tiles.shape[0]  # number of tiles
+    H = hist.shape[1]  # number of bins
+
+    for b, ys, xs, shape in _blocks(tiles, block):
+        C = I.shape[-1]
+        if summed:
+            S = len(F)
+            Z = I[b * S : (b + 1) * S, ys, xs].reshape((S, -1)).astype(precision, copy=False)
+        else:
+            # frames of the block as a contiguous matrix, in the precision of the computation
+            J = I[b * Ts : (b + 1) * Ts, ys, xs]
+            A = np.empty(J.shape, precision)
+            A[...] = J
+            Z = F @ A.reshape((Ts, -1))  # temporal demodulation of all sets at once
+
+        def put(out: np.ndarray, index: int, values: np.ndarray) -> None:
+            out[index, ys, xs] = values.reshape(shape + (C,))
+
+        for d in range(D):
+            do = b * D + d  # index of the direction in the outputs
+            iref = irefs[d]
+
+            zr = Z[D + d * K : D + (d + 1) * K]
+            zi = Z[D + D * K + d * K : D + D * K + (d + 1) * K]
+            a = Z[d] / Nd[d]  # mean over all sets
+            bd = np.sqrt(zr**2 + zi**2) * bscale[d].reshape((K, 1))
+            pd = np.arctan2(zi, zr) % PI2  # arctan2 maps to [-PI, PI], but we need [0, 2PI)
+            # phases which round to 2PI in single precision are zero, as in the kernel,
+            # else coordinates at the edge of the coding range would wrap around to its other end
+            pd[pd > PI2 * (1 - np.finfo(np.float32).eps)] = 0
+            Vi = bd / np.maximum(np.finfo(np.float64).eps, a)  # visibility (avoid division by zero)
+            Vlow = np.any(np.minimum(1, Vi) < Vmin, axis=0)
+
+            if bri.size > 0:
+                put(bri, do, a)
+            if exp.size > 0:
+                put(exp, do, a / Imax)  # relative average intensity
+            for i in range(K):
+                if mod.size > 0:
+                    put(mod, do * K + i, bd[i])
+                if modh.size > 0:
+                    put(modh, do * K + i, bd[i].astype(np.float16).view(np.uint16))
+                if phi.size > 0:
+                    put(phi, do * K + i, pd[i])
+                if vis.size > 0:
+                    put(vis, do * K + i, Vi[i])
+                if vish.size > 0:
+                    put(vish, do * K + i, Vi[i].astype(np.float16).view(np.uint16))
+
+            if unc.size > 0:
+                # intensity noise variance: shot noise (gain * brightness) and dark and quantization noise;
+                # the positional uncertainty follows by inverse variance weighting of the ones of the sets
+                wb = np.sum(wu[d].reshape((K, 1)) * bd.astype(np.float64) ** 2, axis=0)
+                ui2 = gain * np.maximum(a.astype(np.float64) - y0, 0) + var0
+                put(unc, do, np.where(wb > 0, np.sqrt(ui2 / np.where(wb > 0, wb, 1)), np.inf))
+
+            if not spatial:
+                continue  # skip spatial demodulation because registration isn't requested
+
+            # spatial demodulation i.e. unwrapping; pixels whose signal is too weak are skipped, i.e. invalid
+            xr = np.full(Vlow.shape, np.nan)
+            rs = np.full(Vlow.shape, np.nan)  # residuals
+            ok = np.flatnonzero(~Vlow)
+            if K == 1:
+                if v[d, 0] == 0:  # no spatial modulation
+                    if R[d] == 1:  # the only possible value
+                        xr[ok] = 0
+                        rs[ok] = 0
+                elif v[d, 0] <= 1:  # one period covers whole screen: no unwrapping required
+                    xr[ok] = pd[0, ok] / PI2 * l[d, 0] - x0  # change codomain from [0, PI2) to [0, L)
+                    rs[ok] = 0
+                else:  # spatial phase unwrapping (to be done in a later step)
+                    xr[ok] = pd[0, ok] - PI2 / l[d, 0] * x0
+            else:  # generalized temporal phase unwrapping
+                # fringe orders of the reference set to start from, i.e. the ones of the prior registration
+                ks = None
+                if prior.size > 0:
+                    ks = prior[do, ys, xs].reshape(-1)[ok]
+
+                xi, rmax, npx = _unwrap(pd[:, ok], bd[:, ok], w0[d], vf[d], iref, vmax[d, iref], rmin[d], ks)
+                xr[ok] = xi % PI2 / PI2 * L - x0  # change codomain from [-PI, PI] to [0, L)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    # circular standard deviation; rounding errors may push `rmax` slightly beyond one
+                    rs[ok] = np.sqrt(-2 * np.log(np.minimum(rmax, 1)))
+
+                if nt:
+                    stats[d * nt, 0] += np.sum(npx)
+                    stats[d * nt, 1] += len(ok)
+                    if H:
+                        hist[d * nt] += np.bincount(np.minimum(npx, H - 1), minlength=H)
+            if nt:
+                stats[d * nt, 2] += np.count_nonzero(Vlow)
+
+            xr = xr.astype(np.float32).astype(np.float64)  # as stored in 'reg'
+            valid = np.isfinite(xr)
+
+            if reg.size > 0:
+                put(reg, do, xr)
+            if res.size > 0:
+                put(res, do, rs)
+            if regq.size > 0:  # fixed point
+                xq = np.full(xr.shape, qmax)
+                xq[valid] = np.clip(np.rint(xr[valid] * scale), 0, qmax - 1)
+                put(regq, do, xq.astype(regq.dtype))
+            if fid.size > 0 or fidi.size > 0:  # fringe orders of the registration
+                for i in range(K):
+                    kf = np.full(xr.shape, -1, np.int_)
+                    kf[valid] = np.floor(xr[valid] / l[d, i])
+                    if fid.size > 0:
+                        put(fid, do * K + i, kf)
+                    if fid8.size > 0:
+                        put(fid8, do * K + i, np.where(valid, kf, np.iinfo(np.uint8).max).astype(np.uint8))
+                    elif fid16.size > 0:
+                        put(fid16, do * K + i, kf.astype(np.int16))
+
+
+def filters(N: np.ndarray, f: np.ndarray, p0: float) -> np.ndarray:
+    """Filter matrix of temporal demodulation, in shape (`D` + 2 * `D` * `K`, `T`):
+    the sums of the frames of each direction (for the brightness),
+    followed by the real parts and the imaginary parts of the discrete complex filters of all sets.
+
+    Parameters
+    ----------
+    N : np.ndarray
+        Number of phase shifts.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    f : np.ndarray
+        Temporal frequencies.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    p0 : float
+        Phase offset.
+
+    Returns
+    -------
+    F : np.ndarray
+        Filter matrix.
+    """
+
+    D, K = N.shape
+    F = np.zeros((D + 2 * D * K, np.sum(N)))
+    t = np.concatenate(([0], np.cumsum(N)))  # first frame of each set
+    for d in range(D):
+        F[d, t[d * K] : t[(d + 1) * K]] = 1
+        for i in range(K):
+            n = np.arange(N[d, i])
+            cf = np.exp(1j * (2 * np.pi * f[d, i] * n / N[d, i] + p0))  # complex filter
+            F[D + d * K + i, t[d * K + i] : t[d * K + i + 1]] = cf.real
+            F[D + D * K + d * K + i, t[d * K + i] : t[d * K + i + 1]] = cf.imag
+
+    return F
+
+
+def _blocks(tiles: np.ndarray, block: int):
+    """Blocks of the pixels of the work items `tiles`, each of at most `block` pixels (resp. whole rows):
+    the index of the sequence within the batch, the row and column indices (either slices or index arrays)
+    and the shape of the block."""
+
+    for b in np.unique(tiles[:, 3]):
+        y, xa, xb = tiles[tiles[:, 3] == b, :3].T
+        ya, yb = np.min(y), np.max(y) + 1
+        x0, x1 = np.min(xa), np.max(xb)
+
+        if np.sum(xb - xa) == (yb - ya) * (x1 - x0):  # tiles cover a rectangle, so it is sliced in bands of rows
+            h = max(1, block // (x1 - x0))
+            for y0 in range(ya, yb, h):
+                y1 = min(y0 + h, yb)
+                yield b, slice(y0, y1), slice(x0, x1), (y1 - y0, x1 - x0)
+        else:  # pixels are gathered
+            n = xb - xa
+            yy = np.repeat(y, n)
+            xx = np.repeat(xa, n) + np.arange(np.sum(n)) - np.repeat(np.cumsum(n) - n, n)
+            for s in range(0, len(yy), block):
+                yield b, yy[s : s + block], xx[s : s + block], (len(yy[s : s + block]),)
+
+
+def _unwrap(
+    p: np.ndarray,
+    b: np.ndarray,
+    w0: np.ndarray,
+    v: np.ndarray,
+    iref: int,
+    vmax: int,
+    rmin: float,
+    ks: np.ndarray = None,
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Generalized temporal phase unwrapping of the phases `p` and modulations `b` (in shape (`K`, pixels)),
+    in the same order of candidates as `decoder.decode()`.
+
+    The unit phasor of the coordinate `(k * 2PI + p) / v` of a set with fringe order `k`
+    is the product of `exp(1j * p / v)`, which is computed once per pixel, and `exp(1j * k * 2PI / v)`,
+    which is looked up from a table; so evaluating a candidate doesn't need any trigonometric functions.
+
+    Returns the angles of the phasors with maximal length, their lengths
+    and the number of evaluated candidates of each pixel."""
+
+    PI2 = 2 * np.pi
+    K, M = p.shape  # number of sets and pixels
+    v = v.reshape((K, 1))
+
+    # weighted unit phasors of the phases, with weights being the normalized inverse variances
+    w = w0.reshape((K, 1)) * b**2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w /= np.sum(w, axis=0)
+    e = w * np.exp(1j * (p / v))
+
+    # unit phasors of all fringe orders of each set (from -1 on, since phases are rounded), one table after another
+    kmax = int(np.ceil(vmax * np.max(v) / v[iref, 0])) + 2
+    table = np.exp(1j * PI2 * np.arange(-1, kmax) / v).astype(e.dtype).ravel()
+    offset = np.arange(K).reshape((K, 1)) * (kmax + 1) + 1
+
+    rmax = np.zeros(M, p.dtype)  # maximal phasor length
+    z = np.zeros(M, e.dtype)  # phasor with maximal length
+    npx = np.zeros(M, np.int_)  # number of evaluated candidates
+
+    def attempt(k0: int | np.ndarray, todo: np.ndarray, pt: np.ndarray, et: np.ndarray) -> np.ndarray:
+        """Evaluate the candidates `k0` of the pixels `todo` (whose phases and phasors are `pt` and `et`);
+        return the mask of the ones which are found."""
+        arg0 = (k0 * PI2 + pt[iref]) / v[iref]  # reference angles
+        ki = np.rint((arg0 * v - pt) / PI2).astype(np.int_)  # fringe orders of all sets
+        zk = np.sum(et * np.take(table, ki + offset, mode="clip"), axis=0)
+        r = np.abs(zk)
+        npx[todo] += 1
+        better = r >= rmax[todo]
+        rmax[todo[better]] = r[better]
+        z[todo[better]] = zk[better]
+        return better & (r > rmin)  # optimal solution found
+
+    if ks is not None and rmin < 1:  # else they could never be accepted
+        # try the fringe orders to start from and their neighbors first;
+        # accept them only if the phasor proves them to be correct, else fall back to the search
+        todo = np.flatnonzero(ks >= 0)
+        for k in range(3):
+            k0 = ks[todo] + (k + 1) // 2 * (-1 if k % 2 else 1)  # ks, ks - 1, ks + 1
+            inside = np.flatnonzero((0 <= k0) & (k0 < vmax))
+            found = np.zeros(len(todo), bool)
+            ti = todo[inside]
+            found[inside] = attempt(k0[inside].astype(p.dtype), ti, p[:, ti], e[:, ti])
+            todo = todo[~found]
+
+    # derive fringe orders from the reference set, i.e. the one with the least number of periods,
+    # trying the central fringe orders first and moving outwards;
+    # the pixels which are still searched for are compacted, so the found ones don't cost anything anymore
+    todo = np.flatnonzero(~(rmax > rmin))
+    pt, et = (p, e) if len(todo) == M else (p[:, todo], e[:, todo])
+    kc = (vmax - 1) // 2  # central fringe order
+    for k in range(vmax):
+        if len(todo) == 0:
+            break
+
+        k0 = kc - (k + 1) // 2 if k % 2 == 0 else kc + (k + 1) // 2
+        found = attempt(k0, todo, pt, et)
+        if np.any(found):
+            todo, pt, et = todo[~found], pt[:, ~found], et[:, ~found]
+
+    return np.angle(z), rmax, npx
@@ -0,0 +1,213 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .gemm import filters
+from .util import vshape
+
+
+class Decoder:
+    """Streaming decoder of a fringe pattern sequence, as returned by `Fringes.decoder()`.
+
+    The frames are fed one after another while they are acquired,
+    and each one is accumulated into the filtered sums of temporal demodulation right away,
+    i.e. the sums of the frames of each direction (for the brightness)
+    and the real and imaginary parts of the complex phasors of each set.
+    So only these `D` + 2 * `D` * `K` values per pixel are kept, independently of the number of frames `T`,
+    and after the last frame, only spatial demodulation (i.e. unwrapping) remains.
+
+    The parameters of the `Fringes` instance must not be changed while a sequence is streamed.
+    """
+
+    def __init__(self, fringes, precision: str = "float64", **kwargs):
+        self._fringes = fringes
+        self._precision = np.dtype(precision)
+        self._kwargs = kwargs  # arguments of `Fringes.decode()`
+
+        # filter matrix and the rows which are affected by each frame, i.e. the ones of its direction and set
+        self._F = filters(fringes._N, fringes._f * (-1 if fringes.reverse else 1), fringes.p0)
+        self._rows = [np.flatnonzero(self._F[:, t]) for t in range(self._F.shape[1])]
+
+        self._Z = None  # accumulators, allocated with the first frame
+        self._dtype = None  # data type of the frames
+        self.t = 0  # number of frames which have been fed
+
+    def __len__(self) -> int:
+        """Number of frames of the sequence."""
+        return self._F.shape[1]
+
+    def feed(self, frame: np.ndarray) -> None:
+        """Accumulate the next frame (or several consecutive frames) of the sequence.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            Frame in shape (height `Y`, width `X`[, color channels `C`]),
+            resp. frames in shape (frames, `Y`, `X`, `C`).
+            The frames of a sequence must share their shape and data type.
+
+        Raises
+        ------
+        AssertionError
+            If more frames than the `T` ones of the sequence are fed,
+            or if the shape or the data type of the frame doesn't match the previous ones.
+        """
+
+        frames = vshape(np.asarray(frame))
+        assert self.t + len(frames) <= len(self), f"The sequence consists of {len(self)} frames only."
+
+        if self._Z is None:
+            self._Z = np.zeros((len(self._F),) + frames.shape[1:], self._precision)
+            self._dtype = frames.dtype
+        assert frames.shape[1:] == self._Z.shape[1:], "Shape of frame doesn't match the previous ones."
+        assert frames.dtype == self._dtype, "Data type of frame doesn't match the previous ones."
+
+        y0 = self._fringes.y0
+        for It in frames:
+            # subtract dark signal, as in `Fringes.decode()` (on a copy, since the frame may be a camera buffer)
+            if y0 > 0:
+                It = It.copy()
+                It[It >= y0] = It[It >= y0] - y0
+                It[It < y0] = 0
+
+            A = It.astype(self._precision)
+            for r in self._rows[self.t]:
+                if self._F[r, self.t] == 1:
+                    self._Z[r] += A
+                else:
+                    self._Z[r] += self._F[r, self.t] * A
+
+            self.t += 1
+
+    def result(self) -> namedtuple:
+        """Decode the accumulated sequence, i.e. perform the spatial demodulation.
+
+        Returns
+        -------
+        decoded : namedtuple
+            Outputs as returned by `Fringes.decode()`.
+
+        Raises
+        ------
+        AssertionError
+            If not all frames of the sequence have been fed yet.
+        """
+
+        assert self.t == len(self), f"Only {self.t} of {len(self)} frames have been fed."
+
+        shape = self._Z.shape[1:]
+        return self._fringes._decode(
+            self._Z, [shape], precision=self._precision.name, summed=self._dtype, **self._kwargs
+        )
+
+    def reset(self) -> None:
+        """Discard the accumulated frames, so the next sequence can be fed."""
+
+        if self._Z is not None:
+            self._Z.fill(0)
+        self.t = 0
+
+
+class LineDecoder:
+    """Streaming decoder of the lines of a line-scan camera, as returned by `Fringes.line_decoder()`.
+
+    The camera captures the `T` frames of each row of the object one line after another
+    while the object moves by one row (cf. `Fringes.deinterlace()`),
+    so each group of `T` consecutive lines is one row of the fringe pattern sequence.
+    Incoming lines are kept in a buffer of `rows` * `T` lines until the groups of `rows` rows are complete,
+    which are decoded right away; so the memory is constant and the latency bounded,
+    however long the acquisition runs.
+
+    The parameters of the `Fringes` instance must not be changed while lines are streamed.
+    """
+
+    def __init__(self, fringes, rows: int = 1, mask: np.ndarray = None, **kwargs):
+        self._fringes = fringes
+        self._T = fringes.T
+        self._cap = max(1, rows) * self._T  # capacity of the buffer, in lines
+        self._mask = None if mask is None else np.asarray(mask, bool).reshape(-1)  # columns to decode
+        self._kwargs = kwargs  # arguments of `Fringes.decode()`
+
+        self._buf = None  # buffer of the lines of incomplete rows, allocated with the first lines
+        self._n = 0  # number of lines in the buffer
+        self.y = 0  # number of rows which have been decoded
+
+    def feed(self, lines: np.ndarray) -> namedtuple:
+        """Add the next lines (as many as have arrived) and decode the rows which they complete.
+
+        Parameters
+        ----------
+        lines : np.ndarray
+            Lines in shape (lines, width `X`[, color channels `C`]), resp. a single line in shape (`X`,).
+            All lines must share their width, color channels and data type.
+
+        Returns
+        -------
+        decoded : namedtuple or None
+            Outputs of the completed rows as returned by `Fringes.decode()`, i.e. in shape (`D`, rows, `X`, `C`);
+            they are the rows following the `y` ones decoded before.
+            None if no group of `rows` rows has been completed.
+
+        Raises
+        ------
+        AssertionError
+            If the width, color channels or data type of the lines don't match the previous ones.
+        """
+
+        lines = np.asarray(lines)
+        if lines.ndim == 1:  # single line
+            lines = lines.reshape((1, -1))
+        if lines.ndim == 2:  # monochrome
+            lines = lines.reshape(lines.shape + (1,))
+
+        if self._buf is None:
+            self._buf = np.empty((self._cap,) + lines.shape[1:], lines.dtype)
+        assert lines.shape[1:] == self._buf.shape[1:], "Shape of lines doesn't match the previous ones."
+        assert lines.dtype == self._buf.dtype, "Data type of lines doesn't match the previous ones."
+
+        n0 = self._n
+        total = n0 + len(lines)
+        k = total // self._cap * self._cap  # number of lines which complete groups of rows
+
+        if k == 0:  # no row is completed yet
+            self._buf[n0:total] = lines
+            self._n = total
+            return None
+
+        J = np.concatenate((self._buf[:n0], lines[: k - n0])) if n0 else lines[:k]
+        rest = lines[k - n0 :]  # lines of the next, incomplete rows
+        self._buf[: len(rest)] = rest
+        self._n = len(rest)
+
+        return self._decode(J)
+
+    def flush(self) -> namedtuple:
+        """Decode the complete rows in the buffer, even if they are less than `rows`, e.g. at the end of an acquisition.
+
+        Returns
+        -------
+        decoded : namedtuple or None
+            Outputs of the completed rows, cf. `feed()`; None if there are none.
+        """
+
+        k = self._n // self._T * self._T
+        if k == 0:
+            return None
+
+        J = self._buf[:k].copy()
+        self._buf[: self._n - k] = self._buf[k : self._n]
+        self._n -= k
+
+        return self._decode(J)
+
+    def _decode(self, J: np.ndarray) -> namedtuple:
+        """Deinterlace and decode the lines `J` of complete rows."""
+
+        Y = len(J) // self._T
+        X, C = J.shape[1:]
+        J = J.reshape((Y, self._T, X, C)).swapaxes(0, 1)  # deinterlace, i.e. in videoshape
+        mask = None if self._mask is None else np.broadcast_to(self._mask, (Y, X))
+        dec = self._fringes.decode(J, mask=mask, **self._kwargs)
+        self.y += Y
+
+        return dec
@@ -4,7 +4,6 @@ import typing as tp
 import itertools as it
 
 import numpy as np
-import numba as nb
 import scipy as sp
 
 # import sympy.ntheory.generate
@@ -285,110 +284,236 @@ def bilateral(I: np.ndarray, k: int = 7) -> np.ndarray:  # todo: test
     return out
 
 
-@nb.jit(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
-def _remap_legacy(
-    reg: np.ndarray,
-    mod: np.ndarray = np.ones(1),
-    scale: float = 1,
-    Y: int = 0,
-    X: int = 0,
-    C: int = 0,
-) -> np.ndarray:
-    if mod.ndim > 1:
-        assert reg.shape[1:] == mod.shape[1:]
+def tiles(Y: int, X: int, tile: int = 64, mask: np.ndarray = None, index: int = 0) -> np.ndarray:
+    """Work items of `decoder.decode()`: runs of pixels within a row, each at most `tile` pixels long.
 
-    if reg.shape[0] == 1:
-        # mod = np.vstack(mod, np.zeros_like(mod))
-        reg = np.vstack((reg, np.zeros_like(reg)))  # todo: axis
+    Parameters
+    ----------
+    Y : int
+        Height.
 
-    if X is None:
-        X = 0
+    X : int
+        Width.
 
-    if Y is None:
-        Y = 0
+    tile : int, default=64
+        Maximum number of pixels of a row which make up one work item of the parallel loop.
 
-    X = int(X)
-    Y = int(Y)
+    mask : np.ndarray, optional
+        Boolean array in shape (`Y`, `X`) of the pixels to decode.
+        The default is None, i.e. all pixels are decoded.
 
-    if scale <= 0:
-        scale = 1
+    index : int, default=0
+        Index of the sequence within a batch.
+        The work items of a batch are the concatenated ones of its sequences.
 
-    if Y <= 0:
-        Y = max(1, int(np.nanmax(reg[1]) * scale + 0.5))
-    else:
-        Y = int(Y * scale + 0.5)
+    Returns
+    -------
+    tiles : np.ndarray
+        Rows, first and last (exclusive) pixels and sequence indices of the tiles, in shape (number of tiles, 4).
+    """
 
-    if X <= 0:
-        X = max(1, int(np.nanmax(reg[0]) * scale + 0.5))
-    else:
-        X = int(X * scale + 0.5)
+    tile = min(max(1, tile), X)
 
-    if C not in [1, 3, 4]:
-        if reg.shape[-1] in [3, 4]:
-            C = reg.shape[-1]
-        else:
-            C = 1
-            # reg = reg.reshape([s for s in reg.shape] + [C])  # todo: how to get reg[..., 1] if C-axis doesn't exist?
-
-    src = np.zeros((Y, X, C), np.float32)
-
-    Xc = reg.shape[2]
-    Yc = reg.shape[1]
-    DK = mod.shape[0]
-    for xc in nb.prange(Xc):
-        for yc in nb.prange(Yc):
-            for c in nb.prange(C):
-                if not np.isnan(reg[0, yc, xc, c]):
-                    xs = int(reg[0, yc, xc, c] * scale + 0.5)  # i.e. rint()
-                    if xs < X:
-                        if not np.isnan(reg[1, yc, xc, c]):
-                            ys = int(reg[1, yc, xc, c] * scale + 0.5)  # i.e. rint()
-                            if ys < Y:
-                                for dk in nb.prange(DK):
-                                    if mod.ndim > 1:
-                                        m = mod[dk, yc, xc, c]
-                                        if not np.isnan(m):
-                                            src[ys, xs, c] += m
-                                    else:
-                                        src[ys, xs, c] += 1
-
-    mx = src.max()
-    if mx > 0:
-        src /= mx
-
-    return src
-
-
-@nb.jit(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)
-def _remap(
-    src: np.ndarray,
-    reg: np.ndarray,
-    mod: np.ndarray = np.ones(1),
+    if mask is None:  # whole rows
+        y = np.arange(Y)
+        start = np.zeros(Y, np.int_)
+        stop = np.full(Y, X, np.int_)
+    else:  # runs of consecutive pixels within the mask
+        edges = np.diff(np.pad(mask.astype(np.int8, copy=False), ((0, 0), (1, 1))), axis=1)
+        y, start = np.nonzero(edges == 1)
+        stop = np.nonzero(edges == -1)[1]  # in row-major order, so each stop belongs to the preceding start
+
+    # split runs into tiles
+    n = (stop - start + tile - 1) // tile  # number of tiles per run
+    first = np.repeat(np.cumsum(n) - n, n)  # index of the first tile of each run
+    xa = np.repeat(start, n) + (np.arange(np.sum(n)) - first) * tile
+    xb = np.minimum(xa + tile, np.repeat(stop, n))
+
+    return np.stack((np.repeat(y, n), xa, xb, np.full(len(xa), index)), axis=1).astype(np.int_, copy=False)
+
+
+def candidates(
+    v: np.ndarray, R: np.ndarray, x0: float, size: int = 8, u: np.ndarray = None, t: float = 3
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """Lookup table of the candidate fringe orders for `decoder.decode()`.
+
+    For each direction, the phases of the reference set (the one with the fewest periods)
+    and of the set with the next fewest periods are quantized into bins.
+    Each pair of bins is mapped to the fringe orders of the reference set which occur within it
+    or within its neighboring bins (to account for noise),
+    so only these few candidates have to be tried instead of all fringe orders of the reference set.
+    As the bins get narrower for larger frequencies, the neighborhood spans as many bins
+    as `t` times the phase uncertainties `u` cover.
+
+    Parameters
+    ----------
+    v : np.ndarray
+        Spatial frequencies.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    R : np.ndarray
+        Decoding range, i.e. length of fringe patterns for each direction.
+        Must be of length 'D'.
+
+    x0 : float
+        Coordinate offset.
+
+    size : int, default=8
+        Maximum number of candidates per pair of bins.
+
+    u : np.ndarray, optional
+        Phase uncertainties, i.e. standard deviations of the phases, in shape (`D`, `K`).
+        The default is None, i.e. the neighborhood consists of the adjacent bins only.
+
+    t : float, default=3
+        Bound of the phase errors, in multiples of their standard deviations.
+
+    Returns
+    -------
+    lut : np.ndarray
+        Candidate fringe orders of the reference set, in shape (`D`, bins, bins, `size`).
+
+    count : np.ndarray
+        Number of candidates of each pair of bins, in shape (`D`, bins, bins);
+        -1 if they exceed `size`, i.e. the fringe orders have to be searched for.
+
+    pair : np.ndarray
+        Index of the set whose phase is quantized along with the one of the reference set, of length `D`.
+    """
+
+    D, K = v.shape
+
+    if K < 2:  # no temporal phase unwrapping
+        return np.empty((0, 0, 0, 0), np.int_), np.empty((0, 0, 0), np.int_), np.empty(0, np.int_)
+
+    L = np.max(R) + 2 * x0  # coding range
+    irefs = np.argmin(v, axis=1)  # reference sets, as in `decoder.decode()`
+    pair = np.argsort(v, axis=1, kind="stable")[:, 1]  # sets with the next fewest periods
+
+    # number of bins: at least two per strand of the phase pairs in the unit torus
+    vs = v[np.arange(D), irefs] + v[np.arange(D), pair]
+    Q = int(min(max(8, 2 * np.ceil(np.max(vs))), 512))
+
+    lut = np.zeros((D, Q, Q, size), np.int_)
+    count = np.zeros((D, Q, Q), np.int_)
+    for d in range(D):
+        vi = v[d, irefs[d]]
+        vj = v[d, pair[d]]
+
+        # sample the coordinates such that the phases advance by less than half a bin
+        dx = L / (2 * Q * max(vi, vj, 1))
+        x = np.arange(0, R[d] + 2 * x0, dx)
+        k = np.floor(x * vi / L).astype(np.int_)  # fringe orders of the reference set
+        bi = np.floor(x * vi / L % 1 * Q).astype(np.int_) % Q
+        bj = np.floor(x * vj / L % 1 * Q).astype(np.int_) % Q
+
+        # add the fringe orders to the neighboring bins as well, i.e. to the ones within the bound of the phase errors
+        ni = 1 if u is None else max(1, int(np.ceil(t * u[d, irefs[d]] / (2 * np.pi) * Q)))
+        nj = 1 if u is None else max(1, int(np.ceil(t * u[d, pair[d]] / (2 * np.pi) * Q)))
+        kmax = int(np.max(k)) + 1
+        keys = np.concatenate(
+            [
+                ((bi + di) % Q * Q + (bj + dj) % Q) * kmax + k
+                for di in range(-ni, ni + 1)
+                for dj in range(-nj, nj + 1)
+            ]
+        )
+        keys = np.unique(keys)  # sorted
+        b = keys // kmax
+        k = keys % kmax
+
+        n = np.bincount(b, minlength=Q * Q)
+        pos = np.arange(len(b)) - np.repeat(np.cumsum(n) - n, n)  # position within its bin
+        valid = pos < size
+        lut[d].reshape(Q * Q, size)[b[valid], pos[valid]] = k[valid]
+        n[n > size] = -1  # too many candidates
+        count[d] = n.reshape(Q, Q)
+
+    return lut, count, pair.astype(np.int_, copy=False)
+
+
+def threshold(
+    v: np.ndarray, w: np.ndarray, u: np.ndarray, R: np.ndarray, x0: float, t: float = 3
 ) -> np.ndarray:
-    Ys, Xs, Cs = src.shape
-    Yc, Xc, Cc = reg.shape[1:]
-
-    for xc in nb.prange(Xc):
-        for yc in nb.prange(Yc):
-            for c in nb.prange(Cs):
-                if not np.isnan(reg[0, yc, xc, c]):
-                    xs = int(reg[0, yc, xc, c] + 0.5)  # i.e. rint()
-
-                    if xs < Xs:
-                        if not np.isnan(reg[1, yc, xc, c]):
-                            ys = int(reg[1, yc, xc, c] + 0.5)  # i.e. rint()
-
-                            if ys < Ys:
-                                # if mod.ndim > 1 and not np.isnan(mod[yc, xc, c]):  # todo: test shape
-                                #     m = mod[yc, xc, c]
-                                #     src[ys, xs, c] += m
-                                # else:
-                                #     src[ys, xs, c] += 1
-
-                                if not np.isnan(mod[yc, xc, c]):
-                                    m = mod[yc, xc, c]
-                                    src[ys, xs, c] += m
-    return src
+    """Minimal phasor length at which `decoder.decode()` stops searching for the fringe orders.
+
+    The phasor length `r` of a candidate combination of fringe orders corresponds to
+    the (circular) standard deviation `sqrt(-2 ln r)` of the coordinates which are derived from each set.
+    For noise-free phases, it is zero for the correct candidate.
+    A wrong candidate, whose fringe order of the reference set is off by `dk`,
+    has the fringe orders of the other sets off by `rint(dk * v / vref)` at every coordinate,
+    so its standard deviation doesn't depend on the coordinate and the smallest one `s` is computed exactly.
+    Phase errors change these standard deviations by at most the weighted quadratic mean `e` of the errors
+    (triangle inequality), so the returned phasor length corresponds to `min(s - t * e, s / 2)`:
+    a wrong candidate can't reach it unless `e` exceeds `t` times its value for the phase uncertainties `u`
+    as well as half of `s`, e.g. due to the deterministic errors of quantization.
+
+    Parameters
+    ----------
+    v : np.ndarray
+        Spatial frequencies.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    w : np.ndarray
+        Nominal weights of the sets, i.e. the inverse variances of their phases times the squared frequencies.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    u : np.ndarray
+        Phase uncertainties, i.e. standard deviations of the phases.
+        Must be in shape (number of directions 'D', number of sets 'K').
+
+    R : np.ndarray
+        Decoding range, i.e. length of fringe patterns for each direction.
+        Must be of length 'D'.
+
+    x0 : float
+        Coordinate offset.
+
+    t : float, default=3
+        Bound of the phase errors, in multiples of their standard deviations.
+
+    Returns
+    -------
+    rmin : np.ndarray
+        Minimal phasor length for each direction, of length `D`.
+        It is one if no candidate can be identified early.
+    """
+
+    D, K = v.shape
+    L = np.max(R) + 2 * x0  # coding range
+    rmin = np.ones(D)
+
+    for d in range(D):
+        valid = (v[d] > 0) & (w[d] > 0)
+        if K < 2 or not np.all(valid):  # no temporal phase unwrapping
+            continue
+
+        vd = v[d]
+        wd = w[d] / np.sum(w[d])
+        iref = np.argmin(vd)  # reference set, as in `decoder.decode()`
+        vmax = int(np.ceil(vd[iref] * (R[d] + 2 * x0) / L))  # number of fringe orders of the reference set
+        if vmax < 2:  # there are no wrong candidates
+            rmin[d] = 0
+            continue
+
+        # where the offsets of the other sets are close to a tie, phase errors may round them either way
+        e = t * (vd / vd[iref] * u[d, iref] + u[d]) / (2 * np.pi)  # bound of the errors of the rounded values
+        rmax = 0
+        for dk in range(1, vmax):  # the offsets -dk yield the conjugate phasors
+            q = dk * vd / vd[iref]
+            m = [(np.floor(qi), np.ceil(qi)) if abs(qi % 1 - 0.5) < ei else (np.rint(qi),) for qi, ei in zip(q, e)]
+            m[iref] = (dk,)
+            for mi in it.product(*m):  # offsets of the fringe orders of all sets
+                rmax = max(rmax, np.abs(np.sum(wd * np.exp(2j * np.pi * np.array(mi) / vd))))
+
+        # smallest standard deviation of the wrong candidates, reduced by the bound of the angular errors
+        # but at least halved, so it is closer to the correct candidate than to any wrong one
+        s = np.sqrt(-2 * np.log(min(rmax, 1)))
+        smin = min(s - t * np.sqrt(np.sum(wd * (u[d] / vd) ** 2)), s / 2)
+        if smin > 0:
+            rmin[d] = np.exp(-(smin**2) / 2)
+
+    return rmin
 
 
 # # @nb.jit(cache=True, nopython=True, nogil=True, parallel=True, fastmath=True)  # todo
@@ -4,11 +4,13 @@ import os
 import time
 import tempfile
 
+import cv2
 import numpy as np
 import pytest
 import subprocess
+import sys
 
-from fringes import Fringes, curvature, height, __version__
+from fringes import Fringes, Archive, curvature, height, __version__
 
 
 # def test_compile_time():  # todo: test_numba_compile_time
@@ -50,6 +52,33 @@ from fringes import Fringes, curvature, height, __version__
 #     assert T <= 1, f"Decoding takes {int(np.round(T * 1000))}ms > 1000ms."
 
 
+def test_compiled():
+    code = (
+        "import fringes; from fringes import decoder; "
+        "assert not decoder._kernels; assert not hasattr(decoder._remap, 'overloads')"
+    )
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__))).returncode == 0, \
+        "'decode()' or '_remap()' is compiled at import time."
+
+    from fringes import warmup
+    from fringes.decoder import _kernels, _precisions
+
+    warmup()
+    assert len(_kernels) == len(Fringes._dtypes) * (len(_precisions) + 1), \
+        "'decode()' and '_remap()' aren't compiled for all supported dtypes (and precisions)."
+
+
+def test_optional():
+    # numba is an optional dependency, i.e. without it, the pure NumPy backend is used
+    code = (
+        "import sys; sys.modules['numba'] = None; import numpy as np; from fringes import Fringes; "
+        "f = Fringes(Y=100); dec = f.decode(f.encode()); "
+        "assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1)"
+    )
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__))).returncode == 0, \
+        "Decoding requires numba."
+
+
 def test_logging():
     assert "fringes" in logging.Logger.manager.loggerDict
 
@@ -379,6 +408,532 @@ def test_deinterlacing():
         "Registration is off more than 0.1."
 
 
+def test_pixelmajor():
+    f = Fringes(Y=100)
+
+    I = f.encode()
+    I = np.ascontiguousarray(np.moveaxis(I, 0, 2))  # pixel-major, i.e. (Y, X, T, C)
+
+    dec = f.decode(I, pixelmajor=True)
+    assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+        "Registration is off more than 0.1."
+
+
+def test_schedule():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    for threads, chunk in ((1, 1), (0, 7), (0, f.X + 1)):
+        dec = f.decode(I, threads=threads, chunk=chunk)
+        assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+            f"Registration is off more than 0.1 with threads = {threads}, chunk = {chunk}."
+
+
+def test_precision():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    dec = f.decode(I, precision="float32")
+    assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+        "Registration is off more than 0.1."
+    assert np.allclose(dec.registration, f.decode(I).registration, rtol=0, atol=0.01), \
+        "Registration of single and double precision differ more than 0.01."
+
+
+def test_outputs():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    dec = f.decode(I, outputs=("modulation",))
+    assert dec._fields == ("modulation",), "Not only the requested output is returned."
+    assert np.array_equal(dec.modulation, f.decode(I).modulation), "Modulation differs from the default decoding."
+
+    dec = f.decode(I, outputs=("registration", "phase"))
+    assert dec._fields == ("registration", "phase"), "Outputs aren't returned in the order of '_verbose_output'."
+    assert np.array_equal(dec.phase, f.decode(I, verbose=True).phase), "Phase differs from the verbose decoding."
+    assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+        "Registration is off more than 0.1."
+
+
+def test_out():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    dec = f.decode(I, verbose=True)
+    dec2 = f.decode(I, verbose=True, out=dec)
+    for field in dec._fields:
+        assert getattr(dec2, field) is getattr(dec, field), f"Buffer of '{field}' isn't reused."
+
+    dec3 = f.decode(I, verbose=True)
+    for field in dec._fields:
+        assert np.array_equal(getattr(dec2, field), getattr(dec3, field), equal_nan=True), \
+            f"'{field}' differs when decoded into reused buffers."
+
+
+def test_mask():
+    f = Fringes(Y=100)
+    I = f.encode()
+    dec = f.decode(I)
+
+    mask = np.zeros((f.Y, f.X), bool)
+    mask[20:60, 10:90] = True
+    mask[70, ::3] = True
+    for m in (mask, [(10, 20, 80, 40), (0, 70, 1, 1)]):
+        decm = f.decode(I, mask=m)
+        m = mask if isinstance(m, np.ndarray) else np.isfinite(decm.registration[0, :, :, 0])
+        for field in dec._fields:
+            assert np.array_equal(getattr(decm, field)[:, m], getattr(dec, field)[:, m]), \
+                f"'{field}' differs inside the mask."
+            assert np.all(np.isnan(getattr(decm, field)[:, ~m])), f"'{field}' isn't NaN outside the mask."
+    assert np.sum(m) == 40 * 80 + 1, "Regions of interest don't match."
+
+
+def test_closedform():
+    for N in (3, 4):
+        f = Fringes(Y=100)
+        f.N = N
+        I = f.encode()
+
+        bri, mod, phi, reg, res = f._demodulate(I, f._verbose_output, closedform=True)
+        bri0, mod0, phi0, reg0, res0 = f._demodulate(I, f._verbose_output, closedform=False)
+        assert np.allclose(bri, bri0, rtol=0, atol=0.01), f"Brightness differs from generic path with N == {N}."
+        assert np.allclose(mod, mod0, rtol=0, atol=0.01), f"Modulation differs from generic path with N == {N}."
+        dphi = np.abs(phi - phi0)
+        assert np.all(np.minimum(dphi, 2 * np.pi - dphi) < 1e-4), f"Phase differs from generic path with N == {N}."
+        assert np.allclose(reg, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+            f"Registration is off more than 0.1 with N == {N}."
+
+
+def test_integer():
+    f = Fringes(Y=100)
+
+    for dtype in ("uint8", "uint16"):
+        f.dtype = dtype
+        for N in (3, 4, 5):
+            f.N = N
+            I = f.encode()
+
+            bri, mod, phi, reg, res = f._demodulate(I, f._verbose_output, integer=True)
+            bri0, mod0, phi0, reg0, res0 = f._demodulate(I, f._verbose_output, integer=False)
+            assert np.allclose(bri, bri0, rtol=1e-6, atol=0), f"Brightness differs with dtype {dtype} and N == {N}."
+            assert np.allclose(mod, mod0, rtol=1e-5, atol=1e-3), f"Modulation differs with dtype {dtype} and N == {N}."
+            dphi = np.abs(phi - phi0)
+            assert np.all(np.minimum(dphi, 2 * np.pi - dphi) < 1e-4), f"Phase differs with dtype {dtype} and N == {N}."
+
+
+def test_crt():
+    f = Fringes(Y=100)
+
+    for K in (2, 3, 4):
+        f.K = K
+        f.l = "close"  # integer wavelengths
+        I = f.encode()
+
+        dec = f.decode(I, crt=True)
+        assert np.allclose(dec.registration, f.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+            f"Registration is off more than 0.1 with K == {K}."
+        assert np.allclose(dec.registration, f.decode(I).registration, rtol=0, atol=1e-3), \
+            f"Registration differs from search with K == {K}."
+
+
+def test_lut():
+    f = Fringes(Y=100)
+
+    for K in (2, 3, 4):
+        f.K = K
+        I = f.encode()
+
+        dec = f.decode(I, lut=True)
+        assert np.allclose(dec.registration, f.decode(I).registration, rtol=0, atol=1e-3), \
+            f"Registration differs from search with K == {K}."
+
+    lut = f._candidates
+    f.v = f.v + 1
+    assert f._candidates is not lut, "Lookup table isn't invalidated."
+
+    # the noise model, from which the tolerance of the bins is derived, matches the simulated noise
+    f.gain = 0.038
+    f.dark = 13.7
+    f.y0 = 3.64
+    for v in ((60, 67, 71), (89, 97)):  # many periods, i.e. narrow bins
+        f.v = v
+        f.V = 0.8
+        I = f._simulate(f.encode(), PSF=0)
+        x = f.coordinates()[:, :, :, None]
+
+        dec = f.decode(I, lut=True)
+        ref = f.decode(I)
+        # only where the phase errors exceed the noise bound, the lookup may differ from the search
+        assert np.mean(np.abs(dec.registration - ref.registration) > 1e-3) < 1e-4, \
+            f"Registration differs from search with v == {v}."
+        assert np.mean(np.abs(dec.registration - x) > 1) <= np.mean(np.abs(ref.registration - x) > 1) + 1e-4, \
+            f"Lookup yields more outliers than the search with v == {v}."
+
+
+def test_rmin():
+    f = Fringes(Y=100)
+    f.gain = 0.038
+    f.dark = 13.7
+    f.y0 = 3.64
+    assert np.all(f._rmin < 1), "No early termination possible."
+    assert f._rmin is f._rmin, "Threshold isn't cached."
+
+    I = f._simulate(f.encode(), PSF=0)
+    dec = f.decode(I.copy(), rmin="auto")
+    # only where the phase errors exceed the noise bound, a wrong candidate may be accepted
+    assert np.mean(np.abs(dec.registration - f.decode(I.copy()).registration) > 1e-3) < 1e-4, \
+        "Registration differs from exhaustive search."
+
+    rmin = f._rmin
+    f.gain = 0.1
+    assert f._rmin is not rmin, "Threshold isn't updated with the noise model."
+    f.v = f.v + 1
+    assert f._rmin is not rmin, "Threshold isn't invalidated."
+
+    for X, Y in ((1000, 100), (100, 1000)):  # the bound mustn't depend on the default frame size
+        g = Fringes(X=X, Y=Y)
+        dec = g.decode(g.encode(), rmin="auto")
+        assert np.allclose(dec.registration, g.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+            f"Wrong candidates are accepted with X == {X} and Y == {Y}."
+
+
+def test_warm():
+    f = Fringes(Y=100)
+    f.gain = 0.038
+    f.dark = 13.7
+    f.y0 = 3.64
+
+    I = f._simulate(f.encode(), PSF=0)
+    dec, stats = f.decode(I.copy(), rmin="auto", warm=True, stats=True)
+    # only where the phase errors exceed the noise bound, a wrong candidate may be accepted
+    assert np.mean(np.abs(dec.registration - f.decode(I.copy()).registration) > 1e-3) < 1e-4, \
+        "Registration differs from exhaustive search."
+    assert stats.evaluated < f.decode(I.copy(), rmin="auto", stats=True)[1].evaluated, \
+        "Warm start doesn't reduce the number of evaluated candidates."
+    assert f.decode(I.copy(), warm=True, stats=True)[1].evaluated == f.decode(I.copy(), stats=True)[1].evaluated, \
+        "Warm start changes the number of evaluated candidates with the default 'rmin'."
+
+    g = Fringes(X=100, Y=1000)
+    I = g.encode()
+    for rmin in (1.0, "auto"):
+        dec = g.decode(I, rmin=rmin, warm=True)
+        assert np.allclose(dec.registration, g.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+            f"Warm start accepts wrong candidates with rmin == {rmin}."
+
+
+def test_prior():
+    f = Fringes(Y=100)
+    f.gain = 0.038
+    f.dark = 13.7
+    f.y0 = 3.64
+
+    I = f._simulate(f.encode(), PSF=0)
+    ref, cold = f.decode(I.copy(), rmin="auto", stats=True)
+    prior = f.coordinates()[:, :, :, None] + 0.5
+    dec, stats = f.decode(I.copy(), rmin="auto", prior=prior, stats=True)
+    # only where the phase errors exceed the noise bound, a wrong candidate may be accepted
+    assert np.mean(np.abs(dec.registration - f.decode(I.copy()).registration) > 1e-3) < 1e-4, \
+        "Registration differs from exhaustive search."
+    assert stats.evaluated < cold.evaluated, "Prior doesn't reduce the number of evaluated candidates."
+    assert f.decode(I.copy(), prior=prior, stats=True)[1].evaluated == f.decode(I.copy(), stats=True)[1].evaluated, \
+        "Prior changes the number of evaluated candidates with the default 'rmin'."
+
+    prior[:, : f.Y // 2] = np.nan  # no prior for the upper half
+    for backend in ("numba", "numpy"):
+        ref, cold = f.decode(I.copy(), rmin="auto", stats=True, backend=backend)
+        dec, stats = f.decode(I.copy(), rmin="auto", prior=prior, stats=True, backend=backend)
+        assert np.mean(np.abs(dec.registration - ref.registration) > 1e-3) < 1e-4, \
+            f"Registration differs where the prior is NaN ({backend})."
+        assert stats.evaluated < cold.evaluated, f"Prior doesn't reduce the number of evaluated candidates ({backend})."
+
+    g = Fringes(X=100, Y=1000)
+    I = g.encode()
+    prior = g.coordinates()[:, :, :, None] + 0.5
+    for rmin in (1.0, "auto"):
+        for backend in ("numba", "numpy"):
+            dec = g.decode(I, rmin=rmin, prior=prior, backend=backend)
+            assert np.allclose(dec.registration, g.coordinates()[:, :, :, None], rtol=0, atol=0.1), \
+                f"Prior leads to wrong candidates with rmin == {rmin} ({backend})."
+
+
+def test_stats():
+    f = Fringes(Y=100)
+    f.Vmin = 0.1
+    I = f.encode()
+    I[:, :10] = 0  # no modulation, so these pixels are skipped
+
+    dec, stats = f.decode(I, stats=True)
+    assert np.array_equal(dec.registration, f.decode(I).registration, equal_nan=True), "Instrumentation changes results."
+    assert stats.skipped == f.D * 10 * f.X, "Number of skipped pixels is wrong."
+    assert stats.unwrapped == f.D * 90 * f.X, "Number of unwrapped pixels is wrong."
+    assert np.sum(stats.histogram) == stats.unwrapped, "Histogram doesn't count all unwrapped pixels."
+    assert np.isclose(stats.evaluated, np.sum(stats.histogram * np.arange(len(stats.histogram))) / stats.unwrapped)
+    assert stats.temporal > 0 and stats.spatial > 0, "Time isn't measured."
+
+    def unavailable():
+        raise RuntimeError("Cycle counter is read.")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("fringes.decoder.cycles", unavailable)
+        f.decode(I)  # without statistics, no counters are read
+
+
+def test_residuals():
+    f = Fringes(Y=100)
+
+    for v in (f.v, (89, 97)):
+        f.v = v
+        I = f.encode()  # noise-free, so phasors of the correct fringe orders are of unit length up to rounding
+
+        for backend in ("numba", "numpy"):
+            dec = f.decode(I, verbose=True, backend=backend)
+            valid = np.isfinite(dec.registration)
+            assert np.all(np.isfinite(dec.residuals[valid])), f"Residuals are NaN with v == {v} ({backend})."
+            assert np.all(dec.residuals[valid] >= 0), f"Residuals are negative with v == {v} ({backend})."
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_fused():
+    f = Fringes(Y=100)
+    f.gain = 0.038
+    f.dark = 13.7
+    f.Vmin = 0.1
+    I = f._simulate(f.encode(), PSF=0)
+    I[:, :10] = 0  # no modulation, so these pixels are skipped
+
+    dec = f.decode(I, verbose=True)
+    unc, fid, vis, exp = f._verbose_(I, dec.brightness, dec.modulation, dec.registration)
+    assert np.allclose(dec.uncertainty, unc, rtol=1e-5, atol=0), "Uncertainty differs from '_verbose_()'."
+    assert np.array_equal(dec.orders[:, 10:], fid[:, 10:]), "Fringe orders differ from '_verbose_()'."
+    assert np.all(dec.orders[:, :10] == -1), "Fringe orders of skipped pixels aren't -1."
+    assert np.allclose(dec.visibility, vis, rtol=1e-5, atol=0), "Visibility differs from '_verbose_()'."
+    assert np.allclose(dec.exposure, exp, rtol=1e-5, atol=0), "Exposure differs from '_verbose_()'."
+
+
+def test_compact():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    dec = f.decode(I, verbose=True)
+    dtypes = {"registration": "uint16", "modulation": "float16", "orders": "uint8", "visibility": "float16"}
+    com = f.decode(I, verbose=True, dtypes=dtypes, scale=16)
+    assert all(getattr(com, o).dtype == t for o, t in dtypes.items()), "Outputs aren't of the requested data types."
+    assert np.allclose(com.registration / 16, dec.registration, rtol=0, atol=1 / 32 + 1e-4), \
+        "Fixed point registration is off more than its resolution."
+    assert np.allclose(com.modulation, dec.modulation, rtol=2**-10, atol=0), "Half precision modulation is off."
+    assert np.allclose(com.visibility, dec.visibility, rtol=2**-10, atol=0), "Half precision visibility is off."
+    assert np.array_equal(com.orders, dec.orders), "Fringe orders differ."
+
+    mask = np.zeros((f.Y, f.X), bool)
+    mask[10:20, 30:40] = True
+    com = f.decode(I, verbose=True, dtypes={"registration": "uint32", "orders": "int16"}, mask=mask)
+    assert np.all(com.registration[:, ~mask] == np.iinfo(np.uint32).max), "Invalid pixels aren't marked."
+    assert np.all(com.orders[:, ~mask] == -1), "Invalid pixels aren't marked."
+    assert np.array_equal(com.orders[:, mask], dec.orders[:, mask]), "Fringe orders differ."
+
+
+def test_batch():
+    f = Fringes(Y=100)
+    I = f.encode()
+    dec = f.decode(I)
+
+    bat = f.decode(np.stack((I, I)))
+    assert bat.registration.shape == (2,) + dec.registration.shape, "Outputs have no leading batch axis."
+    assert np.array_equal(bat.registration[1], dec.registration), "Registration differs from single decoding."
+
+    J = I[:, :60, :500]
+    mask = np.zeros((60, 500), bool)
+    mask[10:20, 30:40] = True
+    decs = f.decode([I, J, J], mask=[None, None, mask], verbose=True)
+    assert isinstance(decs, list) and len(decs) == 3, "Batch of sequences doesn't return a list."
+    assert np.array_equal(decs[0].registration, dec.registration), "Registration differs from single decoding."
+    assert decs[1].registration.shape == (f.D, 60, 500, 1), "Outputs aren't cropped to the shape of the sequence."
+    assert np.array_equal(decs[1].registration, dec.registration[:, :60, :500]), "Registration differs."
+    assert np.array_equal(decs[1].orders, f.decode(J, verbose=True).orders), "Fringe orders differ."
+    assert np.array_equal(decs[2].registration, f.decode(J, mask=mask).registration, equal_nan=True), \
+        "Mask isn't applied to its sequence."
+
+
+def test_backend():
+    f = Fringes(Y=100)
+    f.gain = 0.038
+    f.dark = 13.7
+    f.Vmin = 0.1
+    I = f._simulate(f.encode(), PSF=0)
+    I[:, :10] = 0  # no modulation, so these pixels are skipped
+
+    dec = f.decode(I, verbose=True)
+    gem = f.decode(I, verbose=True, backend="numpy")
+    for o in ("brightness", "modulation", "registration", "uncertainty", "visibility", "exposure"):
+        assert np.allclose(getattr(gem, o), getattr(dec, o), rtol=1e-5, atol=1e-5, equal_nan=True), \
+            f"'{o}' differs from the compiled decoder."
+    assert np.array_equal(gem.orders, dec.orders), "Fringe orders differ from the compiled decoder."
+
+    g = Fringes(X=300, Y=100)
+    for N in (3, 5):  # the phases at the edges of the coding range are zero up to rounding errors
+        g.N = N
+        J = g.encode()
+        for precision in ("float32", "float64"):
+            x = g.decode(J, precision=precision).registration
+            xg = g.decode(J, precision=precision, backend="numpy").registration
+            for edge in (np.s_[:, :, 0], np.s_[:, :, -1], np.s_[:, 0], np.s_[:, -1]):
+                assert np.allclose(xg[edge], x[edge], rtol=0, atol=1e-3), \
+                    f"Registration at the edges differs from the compiled decoder with N == {N} ({precision})."
+
+    prior = f.coordinates()[:, :, :, None] + 0.5
+    gem, stats = f.decode(I, backend="numpy", rmin="auto", prior=prior, stats=True)
+    assert np.mean(np.abs(gem.registration - dec.registration) > 1e-3) < 1e-4, "Registration differs."
+    assert stats.evaluated < 2, "Search doesn't start at the prior."
+
+    J = I[:, :60, :500]
+    mask = np.zeros((60, 500), bool)
+    mask[10:20, 30:40] = True
+    mask[25, 100:300] = True
+    dtypes = {"registration": "uint16", "modulation": "float16", "orders": "uint8"}
+    decs = f.decode([J, J], mask=[None, mask], verbose=True, dtypes=dtypes, scale=16)
+    gems = f.decode([J, J], mask=[None, mask], verbose=True, dtypes=dtypes, scale=16, backend="numpy")
+    for dec, gem in zip(decs, gems):
+        assert all(getattr(gem, o).dtype == t for o, t in dtypes.items()), "Outputs aren't of the requested types."
+        assert np.array_equal(gem.registration, dec.registration), "Fixed point registration differs."
+        assert np.array_equal(gem.orders, dec.orders), "Fringe orders differ."
+        assert np.allclose(gem.modulation, dec.modulation, rtol=2**-10, atol=0, equal_nan=True), "Modulation differs."
+
+
+def test_stream():
+    f = Fringes(Y=100)
+    I = f.encode()
+    dec = f.decode(I, verbose=True, backend="numpy")
+
+    stream = f.decoder(verbose=True)
+    for frame in I:
+        stream.feed(frame)
+    res = stream.result()
+    for o in dec._fields:
+        assert np.allclose(getattr(res, o), getattr(dec, o), rtol=1e-6, atol=1e-6, equal_nan=True), \
+            f"'{o}' differs from decoding the whole sequence."
+
+    stream.reset()
+    stream.feed(I[:5])  # several frames at once
+    with pytest.raises(AssertionError):
+        stream.result()  # not all frames have been fed yet
+    stream.feed(I[5:])
+    assert np.array_equal(stream.result().registration, res.registration), "Reset decoder differs."
+    with pytest.raises(AssertionError):
+        stream.feed(I[0])  # sequence is complete
+
+
+def test_large():
+    f = Fringes(Y=100)
+    I = f.encode()
+    dec = f.decode(I, verbose=True)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        fname = os.path.join(tempdir, "I.npy")
+        np.save(fname, I)
+        big = f.decode_large(fname, path=os.path.join(tempdir, "out"), budget=2**20, verbose=True)
+        assert all(isinstance(a, np.memmap) for a in big), "Outputs aren't memory-mapped."
+        assert all(os.path.isfile(os.path.join(tempdir, "out", f"{o}.npy")) for o in big._fields), "No files saved."
+        for o in dec._fields:
+            assert np.array_equal(getattr(big, o), getattr(dec, o), equal_nan=True), \
+                f"'{o}' differs from decoding in memory."
+
+        fname = os.path.join(tempdir, "I.raw")
+        I.tofile(fname)
+        mask = np.zeros((f.Y, f.X), bool)
+        mask[10:90, 30:40] = True
+        big = f.decode_large(fname, shape=I.shape, dtype=I.dtype, budget=2**21, mask=mask)
+        assert np.array_equal(big.registration, f.decode(I, mask=mask).registration, equal_nan=True), \
+            "Registration differs from decoding in memory."
+        del big  # release the memory-mapped files
+
+
+def test_linescan():
+    f = Fringes(Y=100)
+    I = f.encode()
+    dec = f.decode(I, verbose=True)
+    lines = I.swapaxes(0, 1).reshape(-1, f.X, f.C)  # interlaced, as captured by a line-scan camera
+
+    for rows in (1, 7):
+        stream = f.line_decoder(rows=rows, verbose=True)
+        res = []
+        for i in range(0, len(lines), 23):  # chunks of lines which don't align with the rows
+            r = stream.feed(lines[i : i + 23])
+            if r is not None:
+                res.append(r)
+        assert len(stream._buf) == rows * f.T, "Buffer exceeds the given rows."
+        r = stream.flush()
+        if r is not None:
+            res.append(r)
+        assert stream.y == f.Y, "Not all rows have been decoded."
+        for o in dec._fields:
+            assert np.array_equal(np.concatenate([getattr(r, o) for r in res], axis=1), getattr(dec, o), equal_nan=True), \
+                f"'{o}' differs from decoding the whole sequence."
+
+    stream = f.line_decoder()
+    assert all(stream.feed(line) is None for line in lines[: f.T - 1, :, 0]), "Incomplete row has been decoded."
+    assert stream.feed(lines[f.T - 1, :, 0]).registration.shape[1] == 1, "Completed row hasn't been decoded."
+    with pytest.raises(AssertionError):
+        stream.feed(lines[:1, :10])  # width differs
+
+
+def test_files():
+    f = Fringes(Y=100)
+    I = f.encode()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        for t, It in enumerate(I):
+            cv2.imwrite(os.path.join(tempdir, f"{t:02d}.png"), It)
+
+        J = f.load_sequence(tempdir)
+        assert J.shape == I.shape and J.dtype == I.dtype and np.array_equal(J, I), "Loaded sequence differs."
+        J = f.load_sequence(os.path.join(tempdir, "*.png"), pixelmajor=True, workers=1)
+        assert np.array_equal(J, np.moveaxis(I, 0, 2)), "Loaded pixel-major sequence differs."
+        assert np.array_equal(f.decode_files(tempdir).registration, f.decode(I).registration, equal_nan=True), \
+            "Registration differs from decoding the sequence."
+
+        cv2.imwrite(os.path.join(tempdir, "00.png"), np.zeros((f.Y, f.X, 3), np.uint8))
+        cv2.imwrite(os.path.join(tempdir, "01.png"), np.full((f.Y, f.X, 3), (0, 0, 255), np.uint8))  # red in BGR
+        J = f.load_sequence(sorted(glob.glob(os.path.join(tempdir, "*.png")))[:2] * (f.T // 2))
+        assert J.shape == (f.T, f.Y, f.X, 3) and np.all(J[1, :, :, 0] == 255), "Color images aren't in RGB order."
+
+        with pytest.raises(AssertionError):
+            f.load_sequence(tempdir)  # image shapes differ
+
+
+def test_archive():
+    f = Fringes(Y=100)
+    f.v = 9, 10, 11
+    dec = f.decode(f.encode(), verbose=True)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        for compression in ("zlib", "lzma", "none"):
+            fname = os.path.join(tempdir, f"decoded.{compression}")
+            f.save_decoded(fname, dec, rows=16, compression=compression)
+            res = f.load_decoded(fname)
+            assert res._fields == dec._fields, "Archived outputs differ."
+            for o in dec._fields:
+                assert getattr(res, o).dtype == getattr(dec, o).dtype, f"Data type of '{o}' differs."
+                assert np.array_equal(getattr(res, o), getattr(dec, o), equal_nan=True), f"'{o}' differs."
+
+        x, y, w, h = 100, 10, 50, 30  # overlapping chunks of rows
+        res = f.load_decoded(fname, outputs={"registration"}, roi=(x, y, w, h))
+        assert res._fields == ("registration",), "Other outputs have been loaded."
+        assert np.array_equal(res.registration, dec.registration[:, y : y + h, x : x + w], equal_nan=True), \
+            "Region of interest differs."
+
+        arc = Archive(fname)
+        assert arc.shape("orders") == dec.orders.shape, "Shape of output differs."
+        assert np.array_equal(arc.read("orders", roi=(f.X - 5, f.Y - 5, 10, 10)), dec.orders[:, -5:, -5:]), \
+            "Region of interest at the border differs."
+
+        g = Fringes()
+        g.load_decoded(fname, outputs=(), params=True)
+        assert np.array_equal(g.v, f.v), "Parameters haven't been embedded."
+
+        with pytest.raises(AssertionError):
+            arc.read("fringes")  # not archived
+
+
 def test_alpha():
     f = Fringes(X=1000, Y=1)
 